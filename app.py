@@ -4,17 +4,13 @@ A full-stack quant research tool for factor analysis and backtesting
 """
 
 import streamlit as st
-import pandas as pd
-import numpy as np
 from datetime import datetime, timedelta
-import io
 
-# Import custom modules
-from data.data_fetcher import DataFetcher
-from factors.factor_calculator import FactorCalculator
-from backtest.backtester import Backtester
-from plots.visualizations import create_performance_chart, create_correlation_heatmap, create_drawdown_chart, create_factor_scatter
-from utils.helpers import format_metrics, download_csv
+# Only light modules are imported up front so the welcome screen renders
+# without pandas, NumPy or Plotly. The analysis, backtest and chart modules
+# are imported by the sections that use them (see benchmarks/import_budget.py).
+from data.provider import get_data_fetcher, get_fundamentals_fetcher, get_provider_name
+from utils.result_store import config_hash, get_result_store
 
 # Page configuration
 st.set_page_config(
@@ -57,11 +53,23 @@ Analyze momentum, value, size, and quality factors across custom universes.
 # Sidebar - Configuration
 st.sidebar.header("⚙️ Configuration")
 
+if get_provider_name() == "synthetic":
+    st.sidebar.info("🧪 Offline mode: using deterministic synthetic market data")
+
 # Universe Selection
 st.sidebar.subheader("1️⃣ Select Universe")
+full_universe = st.sidebar.checkbox(
+    "Full universe mode",
+    value=False,
+    help="Analyze the full S&P 500 / Russell 1000 using compact float32 price and score panels"
+)
+if full_universe:
+    universe_options = ["S&P 500 (Full)", "Russell 1000 (Full)", "Custom Tickers", "Upload CSV"]
+else:
+    universe_options = ["S&P 500 (Top 50)", "Russell 1000 (Top 50)", "Custom Tickers", "Upload CSV"]
 universe_type = st.sidebar.radio(
     "Choose data source:",
-    ["S&P 500 (Top 50)", "Russell 1000 (Top 50)", "Custom Tickers", "Upload CSV"]
+    universe_options
 )
 
 custom_tickers = []
@@ -74,6 +82,8 @@ if universe_type == "Custom Tickers":
 elif universe_type == "Upload CSV":
     uploaded_file = st.sidebar.file_uploader("Upload CSV with 'ticker' column", type=['csv'])
     if uploaded_file is not None:
+        import pandas as pd
+
         df_upload = pd.read_csv(uploaded_file)
         if 'ticker' in df_upload.columns:
             custom_tickers = df_upload['ticker'].tolist()
@@ -107,31 +117,134 @@ else:
 
 # Advanced Options
 with st.sidebar.expander("⚙️ Advanced Options"):
-    rebalance_freq = st.selectbox("Rebalancing Frequency:", ["Monthly", "Quarterly"], index=0)
+    rebalance_freq = st.selectbox("Rebalancing Frequency:", ["Monthly", "Quarterly", "Weekly", "Daily"], index=0)
     top_percentile = st.slider("Long Portfolio Percentile:", 10, 30, 20, 5)
     bottom_percentile = st.slider("Short Portfolio Percentile:", 10, 30, 20, 5)
+    commission_bps = st.number_input(
+        "Commission (bps per trade):", min_value=0.0, max_value=100.0, value=5.0, step=1.0
+    )
+    spread_bps = st.number_input(
+        "Bid-ask spread (bps):", min_value=0.0, max_value=200.0, value=10.0, step=1.0,
+        help="Half the spread is paid on every trade; net metrics subtract commission and spread costs"
+    )
     include_benchmark = st.checkbox("Include SPY Benchmark", value=True)
+    enable_profiling = st.checkbox(
+        "Enable profiling",
+        value=False,
+        help="Record per-stage timings and show them in a Performance panel below the results"
+    )
+
+# Parameter Sweep
+with st.sidebar.expander("🧪 Parameter Sweep (Momentum)"):
+    sweep_percentiles = st.slider("Percentile range:", 10, 30, (10, 30), 5)
+    sweep_lookbacks = st.slider("Lookback range (months):", 3, 12, (3, 12), 1)
+    sweep_freqs = st.multiselect("Rebalancing frequencies:", ["Monthly", "Quarterly"], default=["Monthly", "Quarterly"])
+    run_sweep = st.button("🧪 Run Parameter Sweep", use_container_width=True)
 
 # Run Analysis Button
 run_analysis = st.sidebar.button("🚀 Run Analysis", type="primary", use_container_width=True)
 
+# Results are stored per configuration so that widget changes below the button
+# re-render from memory instead of refetching and recomputing everything
+analysis_config = {
+    'universe': universe_type,
+    'full_universe': full_universe,
+    'custom_tickers': custom_tickers,
+    'factors': selected_factors,
+    'start_date': start_date.strftime('%Y-%m-%d'),
+    'end_date': end_date.strftime('%Y-%m-%d'),
+    'rebalance_freq': rebalance_freq,
+    'top_percentile': top_percentile,
+    'bottom_percentile': bottom_percentile,
+    'commission_bps': commission_bps,
+    'spread_bps': spread_bps,
+    'include_benchmark': include_benchmark,
+    'profiling': enable_profiling
+}
+config_key = config_hash(analysis_config)
+result_store = get_result_store(st.session_state)
+
+sweep_config = {
+    'mode': 'sweep',
+    'universe': universe_type,
+    'custom_tickers': custom_tickers,
+    'start_date': start_date.strftime('%Y-%m-%d'),
+    'end_date': end_date.strftime('%Y-%m-%d'),
+    'percentiles': sweep_percentiles,
+    'lookbacks': sweep_lookbacks,
+    'rebalance_freqs': sweep_freqs
+}
+sweep_key = config_hash(sweep_config)
+
+
+def get_universe_tickers(fetcher):
+    """Resolve the selected universe to a list of tickers."""
+    if universe_type == "S&P 500 (Top 50)":
+        return fetcher.get_sp500_tickers()[:50]
+    elif universe_type == "Russell 1000 (Top 50)":
+        return fetcher.get_russell1000_tickers()[:50]
+    elif universe_type == "S&P 500 (Full)":
+        return fetcher.get_sp500_tickers()
+    elif universe_type == "Russell 1000 (Full)":
+        return fetcher.get_russell1000_tickers()
+    return custom_tickers
+
+
+def show_metric_card(factor, metrics):
+    """Render one factor's headline metrics."""
+    st.markdown(f"**{factor} Factor**")
+    st.metric("Total Return", f"{metrics['total_return']:.2%}")
+    st.metric("Sharpe Ratio", f"{metrics['sharpe_ratio']:.2f}")
+    st.metric("Net Sharpe", f"{metrics['net_sharpe_ratio']:.2f}",
+              delta=f"{metrics['net_sharpe_ratio'] - metrics['sharpe_ratio']:.2f}")
+    st.metric("Turnover (annual)", f"{metrics['annual_turnover']:.1f}x")
+    st.metric("Max Drawdown", f"{metrics['max_drawdown']:.2%}")
+    st.metric("Win Rate", f"{metrics['win_rate']:.2%}")
+
+
+def show_chart(fig):
+    """Render a figure through the large-series rendering policy and report what it sent."""
+    from plots.rendering import optimize_figure
+
+    fig, report = optimize_figure(fig)
+    st.plotly_chart(fig, use_container_width=True)
+    notes = []
+    if report['points_after'] < report['points_before']:
+        notes.append(
+            f"{report['points_after']:,} of {report['points_before']:,} points shown "
+            f"(max error {report['max_error']:.1%} of range)"
+        )
+    if report['webgl_traces']:
+        notes.append("WebGL")
+    if report['density_traces']:
+        notes.append("density view")
+    if notes:
+        notes.append(f"{report['payload_bytes'] / 1024:,.0f} KB")
+        st.caption(" • ".join(notes))
+
+
 # Main content area
 if run_analysis:
     if not selected_factors:
         st.error("⚠️ Please select at least one factor to analyze.")
     else:
         with st.spinner("🔄 Fetching data and computing factors..."):
+            from data.panel import PricePanel
+            from data.panel_store import PanelStore, panel_key
+            from factors.array_factors import calculate_factor_stack, stack_to_frame
+            from backtest.batch import BatchBacktester, rebalance_positions
+            from utils.resources import ResourceMonitor
+            from utils.profiler import PipelineProfiler
+
+            profiler = PipelineProfiler(enabled=enable_profiling).activate()
+            monitor = ResourceMonitor().start()
             try:
-                # Initialize data fetcher
-                fetcher = DataFetcher()
+                
+                # Initialize data fetcher (Yahoo prices are served from the on-disk cache)
+                fetcher = get_data_fetcher()
                 
                 # Get tickers based on universe selection
-                if universe_type == "S&P 500 (Top 50)":
-                    tickers = fetcher.get_sp500_tickers()[:50]
-                elif universe_type == "Russell 1000 (Top 50)":
-                    tickers = fetcher.get_russell1000_tickers()[:50]
-                else:
-                    tickers = custom_tickers
+                tickers = get_universe_tickers(fetcher)
                 
                 if not tickers:
                     st.error("No tickers available. Please check your selection.")
@@ -139,212 +252,664 @@ if run_analysis:
                 
                 st.info(f"📊 Analyzing {len(tickers)} tickers from {start_date.strftime('%Y-%m-%d')} to {end_date.strftime('%Y-%m-%d')}")
                 
-                # Fetch price data
-                price_data = fetcher.fetch_data(tickers, start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d'))
-                
-                if price_data.empty:
-                    st.error("❌ No data fetched. Please check your tickers and date range.")
-                    st.stop()
-                
-                # Fetch fundamental data for Value factor
-                fundamental_data = None
-                if "Value" in selected_factors:
-                    fundamental_data = fetcher.fetch_fundamentals(tickers)
-                
-                # Calculate factors
-                calculator = FactorCalculator(price_data, fundamental_data)
-                factor_scores = calculator.calculate_all_factors(selected_factors)
-                
-                if factor_scores.empty:
-                    st.error("❌ Failed to calculate factors. Please try different parameters.")
-                    st.stop()
-                
-                # Fetch benchmark data if needed
-                benchmark_data = None
+                # Start every fetch at once: prices (in chunks) and the benchmark on the
+                # price lane, fundamentals on their own lane. Results are collected below
+                # as each step needs them, so price-only factors are scored while
+                # fundamentals are still downloading
+                from data.acquisition import DataAcquisition, describe_progress
+
+                start_str, end_str = start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d')
+                factor_names = [factor.lower() for factor in selected_factors]
+                needs_fundamentals = "Value" in selected_factors or (
+                    full_universe and any(name != 'momentum' for name in factor_names)
+                )
+
+                panel = None
+                if full_universe:
+                    # Full-universe panels are kept in the memory-mapped panel store, so
+                    # server processes analyzing the same universe share one copy
+                    panel_store = PanelStore()
+                    key = panel_key(tickers, start_str, end_str, get_provider_name())
+                    panel = panel_store.get(key)
+
+                acquisition = DataAcquisition(fetcher)
+                if panel is None:
+                    acquisition.fetch_prices(tickers, start_str, end_str)
+                if needs_fundamentals:
+                    acquisition.fetch_fundamentals(get_fundamentals_fetcher(fetcher=fetcher), tickers)
                 if include_benchmark:
-                    benchmark_data = fetcher.fetch_data(['SPY'], start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d'))
+                    acquisition.fetch_benchmark('SPY', start_str, end_str)
+
+                progress_bar = st.progress(0.0, text="Fetching data...")
+                labels = {'prices': 'Prices', 'fundamentals': 'Fundamentals', 'benchmark': 'SPY'}
+
+                def show_progress(acquisition):
+                    progress_bar.progress(acquisition.fraction(), text=describe_progress(acquisition, labels))
+
+                fundamental_failures = {}
+
+                def wait_for_fundamentals():
+                    if not needs_fundamentals:
+                        return None
+                    with profiler.stage('fetch.fundamentals', rows=len(tickers)):
+                        fundamental_data, failures = acquisition.result('fundamentals', show_progress)
+                    fundamental_failures.update(failures)
+                    return fundamental_data
+
+                try:
+                    with profiler.stage('fetch.prices', rows=len(tickers)):
+                        if panel is None:
+                            price_data = acquisition.result('prices', show_progress)
+                            if full_universe and not price_data.empty:
+                                panel = panel_store.put(key, PricePanel.from_frame(price_data))
+                        if panel is not None:
+                            price_data = panel.to_frame()
+
+                    if price_data.empty:
+                        st.error("❌ No data fetched. Please check your tickers and date range.")
+                        st.stop()
+
+                    # Calculate factors
+                    engine_options = dict(
+                        top_pct=top_percentile,
+                        bottom_pct=bottom_percentile,
+                        rebalance_freq=rebalance_freq.lower(),
+                        commission_bps=commission_bps,
+                        spread_bps=spread_bps
+                    )
+                    with profiler.stage('factors', rows=price_data.size):
+                        if full_universe:
+                            # Array path: one contiguous float32 panel, no per-factor DataFrames.
+                            # Price-only factors are scored before waiting on fundamentals
+                            del price_data
+                            score_stack = calculate_factor_stack(panel, factor_names, wait_for_fundamentals)
+                            engine = BatchBacktester(score_stack, panel, factor_names, **engine_options)
+
+                            # Keep scores on rebalance dates only for the charts and downloads
+                            factor_scores = stack_to_frame(
+                                score_stack, panel.index, panel.columns, factor_names,
+                                rows=rebalance_positions(panel.index, rebalance_freq.lower())
+                            )
+                            del score_stack
+                            price_data = panel.to_frame()
+                        else:
+                            import pandas as pd
+                            from factors.factor_calculator import FactorCalculator
+
+                            price_factors = [factor for factor in selected_factors if factor != "Value"]
+                            frames = []
+                            if price_factors:
+                                frames.append(FactorCalculator(price_data, None).calculate_all_factors(price_factors))
+                            if "Value" in selected_factors:
+                                calculator = FactorCalculator(price_data, wait_for_fundamentals())
+                                frames.append(calculator.calculate_all_factors(["Value"]))
+                            factor_scores = pd.concat(frames, axis=1)
+                            factor_scores = factor_scores.loc[:, ~factor_scores.columns.duplicated()]
+                            engine = None
+
+                    if fundamental_failures:
+                        missing = sorted(fundamental_failures)
+                        st.warning(
+                            f"⚠️ Fundamentals unavailable for {len(missing)} tickers: "
+                            f"{', '.join(missing[:10])}{' ...' if len(missing) > 10 else ''}"
+                        )
+
+                    if factor_scores.empty:
+                        st.error("❌ Failed to calculate factors. Please try different parameters.")
+                        st.stop()
+
+                    # Benchmark data (usually already downloaded behind the prices)
+                    benchmark_data = None
+                    if include_benchmark:
+                        with profiler.stage('fetch.benchmark', rows=1):
+                            benchmark_data = acquisition.result('benchmark', show_progress)
+                finally:
+                    acquisition.shutdown()
+                    progress_bar.empty()
                 
                 st.success(f"✅ Successfully calculated {len(selected_factors)} factors for {len(tickers)} tickers!")
                 
-                # Run backtests for each factor
-                st.header("📈 Factor Performance Analysis")
-                
+                # One batched pass backtests every factor; the metric cards and charts
+                # are drawn from the stored results below
                 results = {}
-                for factor in selected_factors:
-                    with st.spinner(f"Backtesting {factor} factor..."):
-                        backtester = Backtester(
-                            factor_scores=factor_scores,
-                            price_data=price_data,
-                            factor_name=factor.lower(),
-                            top_pct=top_percentile,
-                            bottom_pct=bottom_percentile,
-                            rebalance_freq=rebalance_freq.lower()
+                with profiler.stage('backtest', rows=price_data.size):
+                    if engine is None:
+                        engine = BatchBacktester.from_factor_scores(
+                            factor_scores, price_data, factor_names, **engine_options
                         )
-                        
-                        portfolio_returns = backtester.run_backtest()
-                        metrics = backtester.calculate_metrics()
-                        
+                    engine.run_backtest()
+                    for factor in selected_factors:
+                        backtester = engine.view(factor.lower())
                         results[factor] = {
-                            'returns': portfolio_returns,
-                            'metrics': metrics,
+                            'returns': backtester.run_backtest(),
+                            'metrics': backtester.calculate_metrics(),
                             'backtester': backtester
                         }
                 
-                # Display metrics
-                st.subheader("📊 Performance Metrics")
+                monitor.stop()
                 
-                cols = st.columns(len(selected_factors))
-                for idx, factor in enumerate(selected_factors):
-                    with cols[idx]:
-                        st.markdown(f"**{factor} Factor**")
-                        metrics = results[factor]['metrics']
-                        
-                        st.metric("Total Return", f"{metrics['total_return']:.2%}")
-                        st.metric("Sharpe Ratio", f"{metrics['sharpe_ratio']:.2f}")
-                        st.metric("Max Drawdown", f"{metrics['max_drawdown']:.2%}")
-                        st.metric("Win Rate", f"{metrics['win_rate']:.2%}")
+                result_store.put(config_key, {
+                    'tickers': tickers,
+                    'price_data': price_data,
+                    'factor_scores': factor_scores,
+                    'benchmark_data': benchmark_data,
+                    'results': results,
+                    'resources': monitor.summary(),
+                    'profiler': profiler
+                })
                 
-                # Performance Chart
-                st.subheader("📈 Cumulative Returns")
-                returns_dict = {factor: results[factor]['returns'] for factor in selected_factors}
+            except Exception as e:
+                st.error(f"❌ An error occurred: {str(e)}")
+                st.exception(e)
+            finally:
+                # Early st.stop() calls and errors skip the normal stop above; never
+                # leave the sampling thread running in the server process
+                monitor.stop()
+                profiler.deactivate()
+
+elif run_sweep:
+    if not sweep_freqs:
+        st.error("⚠️ Please select at least one rebalancing frequency for the sweep.")
+    else:
+        with st.spinner("🧪 Running parameter sweep..."):
+            from backtest.sweep import run_parameter_sweep
+
+            try:
+                fetcher = get_data_fetcher()
+                tickers = get_universe_tickers(fetcher)
                 
-                fig_performance = create_performance_chart(
-                    returns_dict,
-                    benchmark_data['SPY'] if benchmark_data is not None else None
-                )
-                st.plotly_chart(fig_performance, use_container_width=True)
+                if not tickers:
+                    st.error("No tickers available. Please check your selection.")
+                    st.stop()
                 
-                # Rolling Sharpe Ratio
-                st.subheader("📊 Rolling 12-Month Sharpe Ratio")
+                price_data = fetcher.fetch_data(tickers, start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d'))
                 
-                rolling_sharpe_data = {}
-                for factor in selected_factors:
-                    backtester = results[factor]['backtester']
-                    rolling_sharpe = backtester.calculate_rolling_sharpe(window=252)
-                    rolling_sharpe_data[factor] = rolling_sharpe
+                if price_data.empty:
+                    st.error("❌ No data fetched. Please check your tickers and date range.")
+                    st.stop()
                 
-                # Create rolling Sharpe chart
-                import plotly.graph_objects as go
-                fig_rolling = go.Figure()
+                sweep_results = run_parameter_sweep(
+                    price_data,
+                    percentiles=range(sweep_percentiles[0], sweep_percentiles[1] + 1, 5),
+                    rebalance_freqs=[freq.lower() for freq in sweep_freqs],
+                    lookbacks=range(sweep_lookbacks[0], sweep_lookbacks[1] + 1)
+                )
+                result_store.put(sweep_key, sweep_results)
                 
-                for factor, rolling_sharpe in rolling_sharpe_data.items():
+            except Exception as e:
+                st.error(f"❌ An error occurred: {str(e)}")
+                st.exception(e)
+
+analysis = result_store.get(config_key) if selected_factors else None
+sweep_results = result_store.get(sweep_key) if sweep_freqs else None
+
+if analysis is not None:
+    import pandas as pd
+    from plots.visualizations import create_performance_chart, create_correlation_heatmap, create_drawdown_chart, create_factor_scatter
+    from utils.export import build_export_archive
+    from utils.profiler import PipelineProfiler
+
+    price_data = analysis['price_data']
+    factor_scores = analysis['factor_scores']
+    benchmark_data = analysis['benchmark_data']
+    results = analysis['results']
+    profiler = analysis['profiler']
+    # Chart builds run on every rerun, so they are timed by a fresh profiler each time
+    render_profiler = PipelineProfiler(enabled=profiler.enabled).activate()
+    
+    try:
+        st.header("📈 Factor Performance Analysis")
+        st.caption(f"⏱️ {len(analysis['tickers'])} tickers • {analysis['resources']}")
+        
+        # Display metrics
+        st.subheader("📊 Performance Metrics")
+        
+        cols = st.columns(len(selected_factors))
+        for idx, factor in enumerate(selected_factors):
+            with cols[idx]:
+                show_metric_card(factor, results[factor]['metrics'])
+        
+        # Performance Chart
+        st.subheader("📈 Cumulative Returns")
+        returns_dict = {factor: results[factor]['returns'] for factor in selected_factors}
+        
+        with render_profiler.stage('plots.performance_chart'):
+            fig_performance = create_performance_chart(
+                returns_dict,
+                benchmark_data['SPY'] if benchmark_data is not None else None
+            )
+        show_chart(fig_performance)
+        
+        # Rolling statistics: every window and statistic comes from one shared engine
+        st.subheader("📊 Rolling Performance")
+        
+        window_options = {"3M": 63, "6M": 126, "12M": 252, "24M": 504}
+        statistic_options = {
+            "Sharpe Ratio": 'sharpe',
+            "Sortino Ratio": 'sortino',
+            "Volatility": 'volatility',
+            "Drawdown": 'drawdown'
+        }
+        col1, col2 = st.columns([1, 2])
+        with col1:
+            rolling_statistic = st.selectbox("Statistic:", list(statistic_options))
+        with col2:
+            rolling_windows = st.multiselect("Windows:", list(window_options), default=["12M"])
+        
+        rolling_stats = results[selected_factors[0]]['backtester'].engine.rolling_stats()
+        statistic = statistic_options[rolling_statistic]
+        
+        # Create rolling statistics chart
+        import plotly.graph_objects as go
+        fig_rolling = go.Figure()
+        
+        with render_profiler.stage('backtest.rolling_stats', rows=len(selected_factors) * len(rolling_windows)):
+            for label in rolling_windows:
+                values = getattr(rolling_stats, statistic)(window_options[label])
+                for factor in selected_factors:
+                    series = values[factor.lower()].dropna()
                     fig_rolling.add_trace(go.Scatter(
-                        x=rolling_sharpe.index,
-                        y=rolling_sharpe.values,
+                        x=series.index,
+                        y=series.values,
                         mode='lines',
-                        name=f"{factor} Factor",
+                        name=f"{factor} ({label})",
                         line=dict(width=2)
                     ))
-                
-                fig_rolling.add_hline(y=0, line_dash="dash", line_color="gray", annotation_text="Zero Line")
-                fig_rolling.update_layout(
-                    title="Rolling 12-Month Sharpe Ratio",
-                    xaxis_title="Date",
-                    yaxis_title="Sharpe Ratio",
-                    hovermode='x unified',
-                    template='plotly_white',
-                    height=400
+        
+        if statistic in ('sharpe', 'sortino'):
+            fig_rolling.add_hline(y=0, line_dash="dash", line_color="gray", annotation_text="Zero Line")
+        fig_rolling.update_layout(
+            title=f"Rolling {rolling_statistic}",
+            xaxis_title="Date",
+            yaxis_title=rolling_statistic,
+            yaxis_tickformat='.0%' if statistic in ('volatility', 'drawdown') else None,
+            hovermode='x unified',
+            template='plotly_white',
+            height=400
+        )
+        show_chart(fig_rolling)
+        
+        # Drawdown Analysis
+        st.subheader("📉 Drawdown Analysis")
+        
+        drawdown_data = {}
+        for factor in selected_factors:
+            backtester = results[factor]['backtester']
+            drawdown_data[factor] = backtester.portfolio_returns
+        
+        with render_profiler.stage('plots.drawdown_chart'):
+            fig_drawdown = create_drawdown_chart(drawdown_data)
+        show_chart(fig_drawdown)
+        
+        # Correlation Analysis
+        if len(selected_factors) > 1:
+            st.subheader("🔗 Factor Correlation Analysis")
+            
+            # Create correlation matrix of factor returns
+            returns_df = pd.DataFrame({
+                factor: results[factor]['returns'] 
+                for factor in selected_factors
+            })
+            
+            with render_profiler.stage('plots.correlation_heatmap'):
+                fig_corr = create_correlation_heatmap(returns_df, title="Factor Returns Correlation")
+            show_chart(fig_corr)
+            
+            # Factor score correlations
+            score_cols = [f"{factor.lower()}_score" for factor in selected_factors]
+            available_cols = [col for col in score_cols if col in factor_scores.columns]
+            
+            if len(available_cols) > 1:
+                st.subheader("📊 Factor Score Correlations")
+                score_corr_data = factor_scores[available_cols].copy()
+                score_corr_data.columns = [col.replace('_score', '').title() for col in available_cols]
+                
+                with render_profiler.stage('plots.score_correlation_heatmap', rows=len(score_corr_data)):
+                    fig_score_corr = create_correlation_heatmap(score_corr_data, title="Factor Score Correlation")
+                show_chart(fig_score_corr)
+        
+        # Composite portfolios: every weight mix of the selected factors, backtested in one
+        # pass. Opt-in, since the grid grows quickly with the number of factors
+        if len(selected_factors) > 1:
+            st.subheader("🧩 Composite Portfolios")
+            run_composites = st.checkbox(
+                "Backtest composite portfolios", value=False,
+                help="Backtests every long-only weight mix of the selected factors on the chosen grid"
+            )
+        
+        if len(selected_factors) > 1 and run_composites:
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                composite_step = st.selectbox("Weight step:", ["25%", "20%", "10%"], index=2)
+            with col2:
+                composite_method = st.selectbox("Normalization:", ["Z-score", "Rank"])
+            with col3:
+                composite_winsor = st.checkbox("Winsorize 1% tails", value=True, disabled=composite_method == "Rank")
+            
+            composite_options = {
+                'step': int(composite_step.rstrip('%')) / 100,
+                'method': 'zscore' if composite_method == "Z-score" else 'rank',
+                'winsor': 0.01 if composite_winsor else None
+            }
+            composite_key = config_hash({'composites': config_key, **composite_options})
+            composites = result_store.get(composite_key)
+            if composites is None:
+                from factors.composite import backtest_composites, weight_grid
+                
+                engine = results[selected_factors[0]]['backtester'].engine
+                with st.spinner("Backtesting composites..."), render_profiler.stage('factors.composites'):
+                    composite_engine, composite_weights = backtest_composites(
+                        engine.scores, engine.price_data, engine.factor_names,
+                        top_pct=engine.top_pct,
+                        bottom_pct=engine.bottom_pct,
+                        rebalance_freq=engine.rebalance_freq,
+                        commission_bps=engine.commission_bps,
+                        spread_bps=engine.spread_bps,
+                        **composite_options
+                    )
+                    composites = {
+                        'returns': composite_engine.run_backtest(),
+                        'metrics': composite_engine.calculate_metrics(),
+                        'weights': composite_weights,
+                        'grid_size': len(weight_grid(len(engine.factor_names), composite_options['step']))
+                    }
+                result_store.put(composite_key, composites)
+            
+            if len(composites['weights']) < composites['grid_size']:
+                st.warning(
+                    f"⚠️ {composites['grid_size']} weight mixes would not fit in memory for this universe and "
+                    f"date range; {len(composites['weights'])} evenly spaced mixes (including every single-factor "
+                    f"portfolio) were backtested. Use a coarser weight step for the full grid."
                 )
-                st.plotly_chart(fig_rolling, use_container_width=True)
-                
-                # Drawdown Analysis
-                st.subheader("📉 Drawdown Analysis")
-                
-                drawdown_data = {}
-                for factor in selected_factors:
-                    backtester = results[factor]['backtester']
-                    drawdown_data[factor] = backtester.portfolio_returns
-                
-                fig_drawdown = create_drawdown_chart(drawdown_data)
-                st.plotly_chart(fig_drawdown, use_container_width=True)
-                
-                # Correlation Analysis
-                if len(selected_factors) > 1:
-                    st.subheader("🔗 Factor Correlation Analysis")
-                    
-                    # Create correlation matrix of factor returns
-                    returns_df = pd.DataFrame({
-                        factor: results[factor]['returns'] 
-                        for factor in selected_factors
-                    })
-                    
-                    fig_corr = create_correlation_heatmap(returns_df, title="Factor Returns Correlation")
-                    st.plotly_chart(fig_corr, use_container_width=True)
-                    
-                    # Factor score correlations
-                    score_cols = [f"{factor.lower()}_score" for factor in selected_factors]
-                    available_cols = [col for col in score_cols if col in factor_scores.columns]
-                    
-                    if len(available_cols) > 1:
-                        st.subheader("📊 Factor Score Correlations")
-                        score_corr_data = factor_scores[available_cols].copy()
-                        score_corr_data.columns = [col.replace('_score', '').title() for col in available_cols]
-                        
-                        fig_score_corr = create_correlation_heatmap(score_corr_data, title="Factor Score Correlation")
-                        st.plotly_chart(fig_score_corr, use_container_width=True)
-                
-                # Factor Scatter Plot (Score vs Future Returns)
-                st.subheader("🎯 Factor Predictive Power")
-                st.markdown("*Relationship between factor scores and subsequent returns*")
-                
-                scatter_factor = st.selectbox("Select factor for scatter analysis:", selected_factors)
-                
-                fig_scatter = create_factor_scatter(
-                    factor_scores=factor_scores,
-                    price_data=price_data,
-                    factor_name=scatter_factor.lower()
+            ranked = composites['metrics'].sort_values('sharpe_ratio', ascending=False)
+            st.markdown(f"*{len(ranked)} composites evaluated — top 10 by Sharpe ratio*")
+            top = composites['weights'].loc[ranked.index[:10]].join(
+                ranked[['sharpe_ratio', 'net_sharpe_ratio', 'annual_turnover', 'annualized_return', 'max_drawdown']]
+            )
+            top.columns = [col.title() if col in composites['weights'].columns else col for col in top.columns]
+            st.dataframe(top.style.format({
+                **{col.title(): '{:.0%}' for col in composites['weights'].columns},
+                'sharpe_ratio': '{:.2f}',
+                'net_sharpe_ratio': '{:.2f}',
+                'annual_turnover': '{:.1f}',
+                'annualized_return': '{:.2%}',
+                'max_drawdown': '{:.2%}'
+            }), use_container_width=True)
+            
+            with render_profiler.stage('plots.composite_chart'):
+                fig_composites = create_performance_chart(
+                    {label: composites['returns'][label] for label in ranked.index[:5]},
+                    benchmark_data['SPY'] if benchmark_data is not None else None
                 )
-                st.plotly_chart(fig_scatter, use_container_width=True)
-                
-                # Detailed Metrics Table
-                st.subheader("📋 Detailed Performance Metrics")
-                
-                metrics_df = pd.DataFrame({
-                    factor: results[factor]['metrics']
-                    for factor in selected_factors
-                }).T
-                
-                st.dataframe(metrics_df.style.format({
-                    'total_return': '{:.2%}',
-                    'annualized_return': '{:.2%}',
-                    'annualized_volatility': '{:.2%}',
-                    'sharpe_ratio': '{:.2f}',
-                    'sortino_ratio': '{:.2f}',
-                    'max_drawdown': '{:.2%}',
-                    'calmar_ratio': '{:.2f}',
-                    'win_rate': '{:.2%}'
-                }), use_container_width=True)
-                
-                # Download Results
-                st.subheader("💾 Download Results")
-                
-                col1, col2 = st.columns(2)
-                
-                with col1:
-                    # Download factor scores
-                    csv_scores = factor_scores.to_csv(index=True)
-                    st.download_button(
-                        label="📥 Download Factor Scores",
-                        data=csv_scores,
-                        file_name=f"factor_scores_{datetime.now().strftime('%Y%m%d')}.csv",
-                        mime="text/csv"
-                    )
-                
-                with col2:
-                    # Download metrics
-                    csv_metrics = metrics_df.to_csv(index=True)
-                    st.download_button(
-                        label="📥 Download Performance Metrics",
-                        data=csv_metrics,
-                        file_name=f"performance_metrics_{datetime.now().strftime('%Y%m%d')}.csv",
-                        mime="text/csv"
+            show_chart(fig_composites)
+        
+        # Walk-forward: out-of-sample folds sliced from the single full-range backtest
+        st.subheader("🔁 Walk-Forward Evaluation")
+        st.markdown("*Each fold holds the factor with the best training-window Sharpe through its test window*")
+        
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            walk_mode = st.selectbox("Training window:", ["Rolling", "Expanding"])
+        with col2:
+            walk_folds = st.slider("Folds:", min_value=2, max_value=40, value=10)
+        with col3:
+            walk_train_months = st.slider("Training months:", min_value=3, max_value=36, value=12)
+        
+        walk_options = {'n_folds': walk_folds, 'train_days': walk_train_months * 21, 'expanding': walk_mode == "Expanding"}
+        walk_key = config_hash({'walk_forward': config_key, **walk_options})
+        walk = result_store.get(walk_key)
+        if walk is None:
+            from backtest.walk_forward import walk_forward
+            
+            engine = results[selected_factors[0]]['backtester'].engine
+            try:
+                with render_profiler.stage('backtest.walk_forward'):
+                    walk = walk_forward(engine.portfolio_returns, **walk_options)
+            except ValueError as e:
+                st.warning(f"⚠️ {e}.")
+            else:
+                result_store.put(walk_key, walk)
+        
+        if walk is not None:
+            display_names = {factor.lower(): factor for factor in selected_factors}
+            display_names['selected'] = "Best-in-train"
+            walk_metrics = walk['metrics'].rename(index=display_names)
+            st.dataframe(walk_metrics[['total_return', 'annualized_return', 'sharpe_ratio', 'max_drawdown', 'win_rate']].style.format({
+                'total_return': '{:.2%}',
+                'annualized_return': '{:.2%}',
+                'sharpe_ratio': '{:.2f}',
+                'max_drawdown': '{:.2%}',
+                'win_rate': '{:.2%}'
+            }), use_container_width=True)
+            
+            with render_profiler.stage('plots.walk_forward_chart'):
+                fig_walk = create_performance_chart(
+                    {display_names[name]: walk['returns'][name] for name in walk['returns'].columns},
+                    benchmark_data['SPY'].loc[walk['returns'].index[0]:] if benchmark_data is not None else None
+                )
+            show_chart(fig_walk)
+            
+            with st.expander("Per-fold results"):
+                fold_sharpe = walk['folds'].pivot(index='fold', columns='strategy', values='test_sharpe')
+                fold_sharpe = fold_sharpe[[name for name in walk['returns'].columns if name in fold_sharpe.columns]]
+                fold_sharpe = fold_sharpe.rename(columns=display_names)
+                fold_sharpe.insert(0, 'Test Start', walk['folds'].groupby('fold')['test_start'].first().dt.date)
+                fold_sharpe['Selected'] = walk['selection'].map(display_names).reindex(fold_sharpe.index).fillna(
+                    "Skipped (no training Sharpe)"
+                )
+                st.dataframe(fold_sharpe.style.format(
+                    '{:.2f}', subset=[display_names[name] for name in walk['metrics'].index if name != 'selected']
+                ), use_container_width=True)
+                st.caption("Test-window Sharpe ratio per fold" + (
+                    "; skipped folds are left out of the stitched returns" if walk['skipped'] else ""
+                ))
+        
+        # Factor Scatter Plot (Score vs Future Returns)
+        st.subheader("🎯 Factor Predictive Power")
+        st.markdown("*Relationship between factor scores and subsequent returns*")
+        
+        scatter_factor = st.selectbox("Select factor for scatter analysis:", selected_factors)
+        
+        with render_profiler.stage('plots.factor_scatter', rows=len(factor_scores)):
+            fig_scatter = create_factor_scatter(
+                factor_scores=factor_scores,
+                price_data=price_data,
+                factor_name=scatter_factor.lower()
+            )
+        show_chart(fig_scatter)
+        
+        # Holdings: expanded on demand from the engine's compact long/short bitsets
+        st.subheader("🧾 Holdings")
+        
+        holdings_factor = st.selectbox("Factor:", selected_factors, key="holdings_factor")
+        backtester = results[holdings_factor]['backtester']
+        with render_profiler.stage('backtest.holdings'):
+            holdings = backtester.holdings()
+            events = backtester.holding_events()
+            contributions = backtester.contributions()
+        
+        if holdings.empty:
+            st.info("No holdings: the backtest has no rebalance dates.")
+        else:
+            latest = holdings[holdings['date'] == holdings['date'].max()]
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.markdown(f"**Current portfolio** ({latest['date'].iloc[0]:%Y-%m-%d})")
+                st.dataframe(
+                    latest.sort_values('weight', ascending=False)[['ticker', 'weight']]
+                    .style.format({'weight': '{:.2%}'}),
+                    hide_index=True, use_container_width=True
+                )
+            with col2:
+                st.markdown("**Latest entries and exits**")
+                recent = events[events['date'] == events['date'].max()]
+                st.dataframe(recent[['ticker', 'side', 'event']], hide_index=True, use_container_width=True)
+            with col3:
+                st.markdown("**Contribution to return**")
+                by_name = contributions.groupby('ticker')['contribution'].sum().sort_values(ascending=False)
+                top_names = pd.concat([by_name.head(5), by_name.tail(5)]).drop_duplicates()
+                st.dataframe(top_names.to_frame().style.format({'contribution': '{:.2%}'}), use_container_width=True)
+            st.caption(f"{len(events):,} entries and exits over {holdings['date'].nunique():,} rebalances")
+        
+        # Detailed Metrics Table
+        st.subheader("📋 Detailed Performance Metrics")
+        
+        metrics_df = pd.DataFrame({
+            factor: results[factor]['metrics']
+            for factor in selected_factors
+        }).T
+        
+        # Stationary bootstrap of the daily returns: intervals and Sharpe p-values
+        if st.checkbox("Bootstrap confidence intervals (95%, 10,000 resamples)"):
+            bootstrap_key = config_hash({'bootstrap': config_key})
+            bootstrap = result_store.get(bootstrap_key)
+            if bootstrap is None:
+                from backtest.bootstrap import bootstrap_metrics
+                
+                with st.spinner("Resampling returns..."), render_profiler.stage('backtest.bootstrap'):
+                    bootstrap = bootstrap_metrics(pd.DataFrame(returns_dict), n_resamples=10000, seed=0)
+                result_store.put(bootstrap_key, bootstrap)
+            metrics_df = metrics_df.join(bootstrap)
+            st.caption("Intervals are block-bootstrap percentiles (21-day mean block). "
+                       "The p-value tests whether the Sharpe ratio is above zero.")
+        
+        st.dataframe(metrics_df.style.format({
+            'total_return': '{:.2%}',
+            'annualized_return': '{:.2%}',
+            'annualized_volatility': '{:.2%}',
+            'sharpe_ratio': '{:.2f}',
+            'sortino_ratio': '{:.2f}',
+            'max_drawdown': '{:.2%}',
+            'calmar_ratio': '{:.2f}',
+            'win_rate': '{:.2%}',
+            'turnover': '{:.2f}',
+            'annual_turnover': '{:.1f}',
+            'cost_drag': '{:.2%}',
+            'net_annualized_return': '{:.2%}',
+            'net_sharpe_ratio': '{:.2f}',
+            'net_max_drawdown': '{:.2%}',
+            'sharpe_ci_low': '{:.2f}',
+            'sharpe_ci_high': '{:.2f}',
+            'sharpe_p_value': '{:.3f}',
+            'max_drawdown_ci_low': '{:.2%}',
+            'max_drawdown_ci_high': '{:.2%}',
+            'total_return_ci_low': '{:.2%}',
+            'total_return_ci_high': '{:.2%}'
+        }), use_container_width=True)
+        
+        # Download Results
+        st.subheader("💾 Download Results")
+        
+        export_formats = {"Parquet (zstd)": 'parquet', "Arrow IPC (zstd)": 'arrow', "CSV (zip)": 'csv'}
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            # Bundle scores, returns, holdings and metrics into one archive, built on demand
+            export_format = export_formats[st.selectbox("Export format:", list(export_formats))]
+            export_key = config_hash({'export': config_key, 'format': export_format})
+            if st.button("📦 Prepare Export Bundle"):
+                engine = results[selected_factors[0]]['backtester'].engine
+                with st.spinner("Building export..."), render_profiler.stage('export.bundle'):
+                    result_store.put(export_key, build_export_archive({
+                        'factor_scores': factor_scores,
+                        'daily_returns': pd.DataFrame(returns_dict),
+                        'net_daily_returns': engine.net_returns,
+                        'turnover': engine.turnover,
+                        'holdings': engine.holdings(),
+                        'holding_events': engine.holding_events(),
+                        'metrics': metrics_df
+                    }, fmt=export_format))
+            
+            export = result_store.get(export_key)
+            if export is not None:
+                archive, export_report = export
+                st.download_button(
+                    label="📥 Download Results Bundle",
+                    data=archive,
+                    file_name=f"factor_results_{export_format}_{datetime.now().strftime('%Y%m%d')}.zip",
+                    mime="application/zip"
+                )
+                st.caption(
+                    f"{export_report['bytes'] / 1e6:,.1f} MB in {export_report['seconds']:.2f}s • "
+                    + ", ".join(f"{name} ({size / 1e6:,.1f} MB)" for name, _, size in export_report['files'])
+                )
+        
+        with col2:
+            # Download metrics
+            csv_metrics = metrics_df.to_csv(index=True)
+            st.download_button(
+                label="📥 Download Performance Metrics",
+                data=csv_metrics,
+                file_name=f"performance_metrics_{datetime.now().strftime('%Y%m%d')}.csv",
+                mime="text/csv"
+            )
+        
+        # Stage timings (only recorded when profiling is enabled)
+        if profiler.enabled:
+            timing_format = {
+                'start': '{:.3f}s',
+                'wall_time': '{:.3f}s',
+                'cpu_time': '{:.3f}s',
+                'rows': '{:,.0f}',
+                'memory_delta': lambda b: '' if pd.isna(b) else f"{b / 1e6:+.1f} MB"
+            }
+            with st.expander("⏱️ Performance"):
+                st.markdown("**Pipeline stages** (recorded when the analysis ran)")
+                st.dataframe(profiler.to_frame().style.format(timing_format, na_rep=''), use_container_width=True)
+                st.markdown("**Rendering stages** (this rerun)")
+                st.dataframe(render_profiler.to_frame().style.format(timing_format, na_rep=''), use_container_width=True)
+                if get_provider_name() != "synthetic":
+                    from data.shared_cache import get_shared_cache
+                    cache_stats = get_shared_cache().stats()
+                    st.markdown(
+                        f"**Shared data cache** (all sessions): {cache_stats['hits']:,} hits, "
+                        f"{cache_stats['misses']:,} misses, {cache_stats['coalesced']:,} coalesced, "
+                        f"{cache_stats['evictions']:,} evictions, {cache_stats['upstream_calls']:,} upstream calls, "
+                        f"{cache_stats['bytes'] / 1e6:,.1f} / {cache_stats['max_bytes'] / 1e6:,.0f} MB"
                     )
-                
-            except Exception as e:
-                st.error(f"❌ An error occurred: {str(e)}")
-                st.exception(e)
+                st.download_button(
+                    label="📥 Download Trace (chrome://tracing)",
+                    data=profiler.to_chrome_trace(),
+                    file_name=f"pipeline_trace_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
+                    mime="application/json"
+                )
+        
+    except Exception as e:
+        st.error(f"❌ An error occurred: {str(e)}")
+        st.exception(e)
+    finally:
+        render_profiler.deactivate()
 
-else:
+if sweep_results is not None:
+    from backtest.sweep import sweep_surface
+    from plots.sweep_charts import create_sweep_heatmap
+
+    st.header("🧪 Momentum Parameter Sweep")
+    st.markdown(f"*{len(sweep_results)} configurations evaluated*")
+    
+    for freq in sweep_freqs:
+        st.subheader(f"{freq} Rebalancing")
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            fig_sharpe_surface = create_sweep_heatmap(
+                sweep_surface(sweep_results, 'sharpe_ratio', freq.lower()),
+                title="Sharpe Ratio Surface"
+            )
+            st.plotly_chart(fig_sharpe_surface, use_container_width=True)
+        
+        with col2:
+            fig_dd_surface = create_sweep_heatmap(
+                sweep_surface(sweep_results, 'max_drawdown', freq.lower()),
+                title="Max Drawdown Surface",
+                value_format=".1%",
+                zmid=None
+            )
+            st.plotly_chart(fig_dd_surface, use_container_width=True)
+    
+    st.dataframe(sweep_results, use_container_width=True)
+
+if analysis is None and sweep_results is None and not (run_analysis or run_sweep):
     # Welcome screen
     st.info("👈 Configure your analysis in the sidebar and click **Run Analysis** to begin!")
     
@@ -0,0 +1,516 @@
+"""
+Batch Backtest Module
+Vectorized long-short backtest engine for many factors at once.
+
+All factor score panels are stacked into one (factor x date x ticker) array.
+The return matrix, rebalance calendar and quantile masks are computed once
+and shared across factors, instead of once per factor as with a separate
+Backtester per factor.
+"""
+
+import numpy as np
+import pandas as pd
+
+from backtest.holdings import HoldingsHistory
+from backtest.selection import quantile_masks
+from utils.profiler import profiled
+
+
+TRADING_DAYS = 252
+
+_FREQ_ALIASES = {
+    'daily': 'D',
+    'd': 'D',
+    'weekly': 'W',
+    'w': 'W',
+    'monthly': 'M',
+    'm': 'M',
+    'me': 'M',
+    'quarterly': 'Q',
+    'q': 'Q',
+    'qe': 'Q'
+}
+
+
+def _as_fraction(pct):
+    """Accept percentiles either as fractions (0.2) or as percents (20)."""
+    return pct / 100.0 if pct > 1 else float(pct)
+
+
+def rebalance_positions(dates, freq='monthly'):
+    """
+    Find the row positions of rebalance dates (last trading day of each period).
+
+    Args:
+        dates: DatetimeIndex of trading days
+        freq: 'daily' / 'weekly' / 'monthly' / 'quarterly' (or pandas-style
+            'D' / 'W' / 'M' / 'Q')
+
+    Returns:
+        Integer array of row positions into ``dates``
+    """
+    code = _FREQ_ALIASES.get(str(freq).lower())
+    if code is None:
+        raise ValueError(f"Unsupported rebalance frequency: {freq}")
+
+    periods = pd.DatetimeIndex(dates).to_period(code).asi8
+    # A date is a period end when the next date belongs to a new period
+    return np.flatnonzero(periods[:-1] != periods[1:])
+
+
+def stack_factor_scores(factor_scores, price_data, factor_names):
+    """
+    Stack factor score panels into a (factor x date x ticker) array.
+
+    Args:
+        factor_scores: Either a dict of wide DataFrames (dates x tickers) keyed
+            by factor name, or the long-format output of
+            ``FactorCalculator.calculate_all_factors`` (rows indexed by
+            (date, ticker) with ``<factor>_score`` columns)
+        price_data: DataFrame of prices (dates x tickers) to align to
+        factor_names: Factor names in stacking order (e.g. ['momentum', 'value'])
+
+    Returns:
+        Float array of shape (n_factors, n_dates, n_tickers)
+    """
+    panels = []
+    for name in factor_names:
+        if isinstance(factor_scores, dict):
+            panel = factor_scores[name]
+        else:
+            if not isinstance(factor_scores.index, pd.MultiIndex):
+                raise ValueError(
+                    "factor_scores must be a dict of wide panels or be indexed by (date, ticker)"
+                )
+            panel = factor_scores[f"{name}_score"].unstack(level=-1)
+
+        panel = panel.reindex(columns=price_data.columns)
+        panel = panel.reindex(price_data.index, method='ffill')
+        panels.append(panel.to_numpy(dtype=float))
+
+    return np.stack(panels)
+
+
+def turnover_matrix(weights):
+    """
+    Traded notional at each rebalance from weight differences.
+
+    The first rebalance trades into the initial book from cash. Weights are
+    held constant between rebalances, matching the return model of the
+    engine, so the trade at rebalance k is ``|w_k - w_{k-1}|``.
+
+    Args:
+        weights: Array (..., n_rebalances, n_tickers) of portfolio weights
+
+    Returns:
+        Array (..., n_rebalances) of traded notional as a fraction of capital
+        (a full long-short book replacement is 4.0)
+    """
+    return np.abs(np.diff(weights, axis=-2, prepend=0)).sum(axis=-1)
+
+
+def transaction_costs(turnover, commission_bps=0.0, spread_bps=0.0):
+    """
+    Cost of trading a given notional: commission plus half the bid-ask spread.
+
+    Args:
+        turnover: Array of traded notional (see ``turnover_matrix``)
+        commission_bps: Commission and fees per unit traded, in basis points
+        spread_bps: Quoted bid-ask spread in basis points (half is paid per trade)
+
+    Returns:
+        Array of costs as a fraction of capital, shaped like ``turnover``
+    """
+    return turnover * (commission_bps + spread_bps / 2) / 1e4
+
+
+@profiled('backtest.metrics')
+def calculate_metrics_matrix(returns):
+    """
+    Compute performance metrics for many return series at once.
+
+    Args:
+        returns: Array (n_dates, n_strategies) of daily returns
+
+    Returns:
+        Dictionary mapping metric name to an array of length n_strategies
+    """
+    returns = np.asarray(returns, dtype=float)
+    n = returns.shape[0]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        wealth = np.cumprod(1 + returns, axis=0)
+        total_return = wealth[-1] - 1
+        annualized_return = (1 + total_return) ** (TRADING_DAYS / n) - 1
+
+        mean = returns.mean(axis=0)
+        std = returns.std(axis=0, ddof=1)
+        annualized_volatility = std * np.sqrt(TRADING_DAYS)
+        sharpe_ratio = np.where(std > 0, mean / std * np.sqrt(TRADING_DAYS), 0.0)
+
+        downside = np.sqrt(np.mean(np.minimum(returns, 0) ** 2, axis=0))
+        sortino_ratio = np.where(downside > 0, mean / downside * np.sqrt(TRADING_DAYS), 0.0)
+
+        running_peak = np.maximum.accumulate(np.maximum(wealth, 1.0), axis=0)
+        max_drawdown = (wealth / running_peak - 1).min(axis=0)
+        calmar_ratio = np.where(max_drawdown < 0, annualized_return / np.abs(max_drawdown), 0.0)
+
+        gains = np.where(returns > 0, returns, 0).sum(axis=0)
+        losses = np.abs(np.where(returns < 0, returns, 0).sum(axis=0))
+        profit_factor = np.where(losses > 0, gains / losses, np.inf)
+
+    return {
+        'total_return': total_return,
+        'annualized_return': annualized_return,
+        'annualized_volatility': annualized_volatility,
+        'sharpe_ratio': sharpe_ratio,
+        'sortino_ratio': sortino_ratio,
+        'max_drawdown': max_drawdown,
+        'calmar_ratio': calmar_ratio,
+        'win_rate': (returns > 0).mean(axis=0),
+        'profit_factor': profit_factor
+    }
+
+
+class BatchBacktester:
+    """
+    Long-short backtest for a stack of factor score panels in one pass.
+
+    Each factor goes long the top ``top_pct`` and short the bottom
+    ``bottom_pct`` of each cross-section, equal-weighted, rebalanced at the
+    end of every month or quarter. Scores observed on a rebalance date set the
+    holdings from the next trading day onwards.
+    """
+
+    def __init__(self, scores, price_data, factor_names, top_pct=20, bottom_pct=20,
+                 rebalance_freq='monthly', score_rows=None, commission_bps=0.0, spread_bps=0.0):
+        """
+        Initialize the engine.
+
+        Args:
+            scores: Array (n_factors, n_dates, n_tickers) aligned to ``price_data``
+                (see ``stack_factor_scores``), or (n_factors, len(score_rows),
+                n_tickers) when ``score_rows`` is given
+            price_data: DataFrame of prices (dates x tickers) or a PricePanel
+            factor_names: Factor names, one per leading slice of ``scores``
+            top_pct: Long percentile (fraction or percent)
+            bottom_pct: Short percentile (fraction or percent)
+            rebalance_freq: 'daily', 'weekly', 'monthly' or 'quarterly'
+            score_rows: Sorted row positions of ``price_data`` that ``scores``
+                covers (default: every row). Only rebalance dates are read, so
+                scores computed on those rows alone are enough.
+            commission_bps: Commission per unit traded, in basis points
+            spread_bps: Bid-ask spread in basis points (half is paid per trade)
+        """
+        scores = np.asarray(scores)
+        n_rows = price_data.shape[0] if score_rows is None else len(score_rows)
+        if scores.shape[1:] != (n_rows, price_data.shape[1]):
+            raise ValueError(
+                f"scores shape {scores.shape[1:]} does not match ({n_rows}, {price_data.shape[1]})"
+            )
+
+        self.scores = scores
+        self.score_rows = None if score_rows is None else np.asarray(score_rows)
+        self.price_data = price_data
+        self.factor_names = list(factor_names)
+        self.top_pct = _as_fraction(top_pct)
+        self.bottom_pct = _as_fraction(bottom_pct)
+        self.rebalance_freq = rebalance_freq
+        self.commission_bps = commission_bps
+        self.spread_bps = spread_bps
+        self.portfolio_returns = None
+        self.net_returns = None
+        self.turnover = None
+        self.holdings_history = None
+        self.rebalance_dates = None
+        self._rolling = None
+
+    @classmethod
+    def from_factor_scores(cls, factor_scores, price_data, factor_names, **kwargs):
+        """
+        Build an engine from FactorCalculator output or a dict of wide panels.
+
+        Args:
+            factor_scores: See ``stack_factor_scores``
+            price_data: DataFrame of prices (dates x tickers)
+            factor_names: Factor names (e.g. ['momentum', 'value'])
+            **kwargs: Passed to the constructor
+
+        Returns:
+            BatchBacktester instance
+        """
+        scores = stack_factor_scores(factor_scores, price_data, factor_names)
+        return cls(scores, price_data, factor_names, **kwargs)
+
+    def _asset_returns(self):
+        """Prices and simple daily returns (0 where not computable)."""
+        # Keep the panel dtype (float32 panels stay float32)
+        prices = self.price_data.to_numpy()
+        if not np.issubdtype(prices.dtype, np.floating):
+            prices = prices.astype(float)
+        asset_returns = np.zeros_like(prices)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            asset_returns[1:] = prices[1:] / prices[:-1] - 1
+        asset_returns[~np.isfinite(asset_returns)] = 0.0
+        return prices, asset_returns
+
+    def _rebalance_scores(self, rebalances):
+        """Scores on the rebalance rows as float64 (NaN where not covered)."""
+        if self.score_rows is None:
+            return self.scores[:, rebalances, :].astype(float)
+        if len(self.score_rows) == 0:
+            return np.full((self.scores.shape[0], len(rebalances), self.scores.shape[2]), np.nan)
+        pos = np.minimum(np.searchsorted(self.score_rows, rebalances), len(self.score_rows) - 1)
+        out = self.scores[:, pos, :].astype(float)
+        out[:, self.score_rows[pos] != rebalances, :] = np.nan
+        return out
+
+    @profiled('backtest.batch_run')
+    def run_backtest(self):
+        """
+        Run the long-short backtest for every factor.
+
+        Returns:
+            DataFrame of daily portfolio returns (dates x factors)
+        """
+        prices, asset_returns = self._asset_returns()
+
+        rebalances = rebalance_positions(self.price_data.index, self.rebalance_freq)
+        if len(rebalances) == 0:
+            self.portfolio_returns = pd.DataFrame(columns=self.factor_names, dtype=float)
+            self.net_returns = self.portfolio_returns
+            self.turnover = self.portfolio_returns
+            return self.portfolio_returns
+
+        # Names without a price on the rebalance date cannot be traded
+        rebalance_scores = self._rebalance_scores(rebalances)
+        rebalance_scores[:, np.isnan(prices[rebalances])] = np.nan
+
+        long_mask, short_mask = quantile_masks(rebalance_scores, self.top_pct, self.bottom_pct)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            long_w = long_mask / long_mask.sum(axis=-1, keepdims=True)
+            short_w = short_mask / short_mask.sum(axis=-1, keepdims=True)
+        weights = np.nan_to_num(long_w) - np.nan_to_num(short_w)  # (factor, rebalance, ticker)
+
+        n_factors = len(self.factor_names)
+        boundaries = np.append(rebalances, len(prices) - 1)
+        out = np.empty((len(prices) - rebalances[0] - 1, n_factors))
+
+        # One matrix product per holding period covers every factor at once
+        offset = 0
+        for k in range(len(rebalances)):
+            block = asset_returns[boundaries[k] + 1:boundaries[k + 1] + 1]
+            out[offset:offset + len(block)] = block @ weights[:, k, :].T
+            offset += len(block)
+
+        # Costs are charged on the first day of each holding period
+        turnover = turnover_matrix(weights)  # (factor, rebalance)
+        net = out.copy()
+        net[rebalances - rebalances[0]] -= transaction_costs(
+            turnover, self.commission_bps, self.spread_bps
+        ).T
+
+        self.rebalance_dates = self.price_data.index[rebalances]
+        self.holdings_history = HoldingsHistory.from_masks(
+            long_mask, short_mask, self.factor_names, self.rebalance_dates, rebalances,
+            self.price_data.columns, len(prices)
+        )
+        self._rolling = None
+        dates = self.price_data.index[rebalances[0] + 1:]
+        self.portfolio_returns = pd.DataFrame(out, index=dates, columns=self.factor_names)
+        self.net_returns = pd.DataFrame(net, index=dates, columns=self.factor_names)
+        self.turnover = pd.DataFrame(turnover.T, index=self.rebalance_dates, columns=self.factor_names)
+        return self.portfolio_returns
+
+    def calculate_metrics(self):
+        """
+        Calculate performance metrics for every factor.
+
+        Returns:
+            DataFrame of metrics (factors x metric names)
+        """
+        if self.portfolio_returns is None:
+            self.run_backtest()
+        if self.portfolio_returns.empty:
+            return pd.DataFrame(index=self.factor_names)
+
+        metrics = calculate_metrics_matrix(self.portfolio_returns.to_numpy())
+        metrics.update(self._cost_metrics())
+        return pd.DataFrame(metrics, index=self.factor_names)
+
+    def _cost_metrics(self):
+        """
+        Turnover and net-of-cost metrics for every factor.
+
+        Returns:
+            Dictionary mapping metric name to an array of length n_factors
+        """
+        turnover = self.turnover.to_numpy()
+        net = calculate_metrics_matrix(self.net_returns.to_numpy())
+        years = len(self.portfolio_returns) / TRADING_DAYS
+        gross_total = (1 + self.portfolio_returns).prod().to_numpy()
+        net_total = (1 + self.net_returns).prod().to_numpy()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cost_drag = 1 - (net_total / gross_total) ** (1 / years)
+        return {
+            'turnover': turnover.mean(axis=0),
+            'annual_turnover': turnover.sum(axis=0) / years,
+            'cost_drag': cost_drag,
+            'net_annualized_return': net['annualized_return'],
+            'net_sharpe_ratio': net['sharpe_ratio'],
+            'net_max_drawdown': net['max_drawdown']
+        }
+
+    def rolling_stats(self):
+        """
+        Get the shared rolling-statistics engine over all factor returns.
+
+        Returns:
+            RollingStats instance (built once per backtest run)
+        """
+        from backtest.rolling import RollingStats
+
+        if self.portfolio_returns is None:
+            self.run_backtest()
+        if self._rolling is None:
+            self._rolling = RollingStats(self.portfolio_returns)
+        return self._rolling
+
+    def holdings(self, factor_name=None):
+        """
+        Portfolio weights on each rebalance date, in long format.
+
+        Holdings are kept as packed long/short bitsets (``holdings_history``)
+        and expanded here on request.
+
+        Args:
+            factor_name: Factor to list (default: all)
+
+        Returns:
+            DataFrame with columns factor, date, ticker, weight (non-zero
+            positions only; positive = long, negative = short)
+        """
+        history = self._holdings_history()
+        if history is None:
+            return pd.DataFrame(columns=['factor', 'date', 'ticker', 'weight'])
+        return history.to_frame(factor_name)
+
+    def holding_events(self, factor_name=None):
+        """
+        Names entering and leaving each leg at every rebalance.
+
+        Args:
+            factor_name: Factor to list (default: all)
+
+        Returns:
+            DataFrame with columns factor, date, ticker, side, event
+            (see ``HoldingsHistory.events``)
+        """
+        history = self._holdings_history()
+        if history is None:
+            return pd.DataFrame(columns=['factor', 'date', 'ticker', 'side', 'event'])
+        return history.events(factor_name)
+
+    def contributions(self, factor_name=None):
+        """
+        Each held name's contribution to return over each holding period.
+
+        Args:
+            factor_name: Factor to attribute (default: all)
+
+        Returns:
+            DataFrame with columns factor, date, ticker, weight, contribution
+            (see ``HoldingsHistory.contributions``)
+        """
+        history = self._holdings_history()
+        if history is None:
+            return pd.DataFrame(columns=['factor', 'date', 'ticker', 'weight', 'contribution'])
+        return history.contributions(self._asset_returns()[1], factor_name)
+
+    def _holdings_history(self):
+        if self.holdings_history is None and self.portfolio_returns is None:
+            self.run_backtest()
+        return self.holdings_history
+
+    def view(self, factor_name):
+        """
+        Get a single-factor view with the Backtester interface.
+
+        Args:
+            factor_name: One of ``factor_names``
+
+        Returns:
+            BacktestView for the factor
+        """
+        return BacktestView(self, factor_name)
+
+
+class BacktestView:
+    """
+    Single-factor view over a BatchBacktester.
+
+    Exposes the Backtester interface (``run_backtest``, ``calculate_metrics``,
+    ``calculate_rolling_sharpe``, ``portfolio_returns``) and the factor's
+    holdings history without recomputing anything per factor.
+    """
+
+    def __init__(self, engine, factor_name):
+        if factor_name not in engine.factor_names:
+            raise KeyError(f"Unknown factor: {factor_name}")
+        self.engine = engine
+        self.factor_name = factor_name
+
+    @property
+    def portfolio_returns(self):
+        if self.engine.portfolio_returns is None:
+            self.engine.run_backtest()
+        return self.engine.portfolio_returns[self.factor_name]
+
+    def run_backtest(self):
+        """
+        Return the factor's daily long-short returns.
+
+        Returns:
+            Series of daily portfolio returns
+        """
+        return self.portfolio_returns
+
+    def calculate_metrics(self):
+        """
+        Calculate performance metrics for the factor.
+
+        Returns:
+            Dictionary of metrics
+        """
+        returns = self.portfolio_returns
+        if returns.empty:
+            return {}
+        metrics = calculate_metrics_matrix(returns.to_numpy()[:, None])
+        metrics = {name: float(values[0]) for name, values in metrics.items()}
+        position = self.engine.factor_names.index(self.factor_name)
+        metrics.update({name: float(values[position]) for name, values in self.engine._cost_metrics().items()})
+        return metrics
+
+    def calculate_rolling_sharpe(self, window=252):
+        """
+        Calculate rolling annualized Sharpe ratio.
+
+        Args:
+            window: Rolling window in trading days
+
+        Returns:
+            Series of rolling Sharpe ratios
+        """
+        return self.engine.rolling_stats().sharpe(window)[self.factor_name].dropna()
+
+    def holdings(self):
+        """Portfolio weights on each rebalance date (see ``BatchBacktester.holdings``)."""
+        return self.engine.holdings(self.factor_name)
+
+    def holding_events(self):
+        """Entries and exits at each rebalance (see ``BatchBacktester.holding_events``)."""
+        return self.engine.holding_events(self.factor_name)
+
+    def contributions(self):
+        """Per-name contribution to return (see ``BatchBacktester.contributions``)."""
+        return self.engine.contributions(self.factor_name)
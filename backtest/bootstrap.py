@@ -0,0 +1,187 @@
+"""
+Bootstrap Module
+Stationary bootstrap confidence intervals and p-values for strategy metrics.
+
+Resamples are drawn as whole index matrices (resample x day) with the
+stationary bootstrap of Politis and Romano: blocks start at random days and
+have geometrically distributed lengths, which keeps the autocorrelation and
+volatility clustering of daily returns. The same indices are applied to
+every strategy, so cross-strategy correlation is preserved too.
+
+Sharpe ratio, max drawdown and total return are computed for thousands of
+resamples at once. Resamples are processed in fixed shards, each with its
+own seed, so results depend only on ``seed`` and not on how many worker
+processes share the shards. Worker processes are spawned rather than
+forked, since the app runs inside the threaded Streamlit server.
+"""
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from backtest.batch import TRADING_DAYS
+from utils.profiler import profiled
+
+
+SHARD_SIZE = 500
+METRICS = ('sharpe_ratio', 'max_drawdown', 'total_return')
+
+
+def stationary_indices(n_obs, n_resamples, mean_block=21, rng=None):
+    """
+    Draw stationary-bootstrap index matrices.
+
+    Args:
+        n_obs: Length of the series being resampled
+        n_resamples: Number of resamples
+        mean_block: Expected block length in days
+        rng: numpy Generator (default: a fresh unseeded one)
+
+    Returns:
+        int32 array (n_resamples, n_obs) of row positions
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    starts = rng.integers(0, n_obs, size=(n_resamples, n_obs), dtype=np.int32)
+    new_block = rng.random((n_resamples, n_obs), dtype=np.float32) < 1 / mean_block
+    new_block[:, 0] = True
+
+    # Each day continues the block that began at the last new-block day, wrapping around
+    t = np.arange(n_obs, dtype=np.int32)
+    block_start = np.maximum.accumulate(np.where(new_block, t, 0), axis=1)
+    positions = np.take_along_axis(starts, block_start, axis=1) + t - block_start
+    positions[positions >= n_obs] -= n_obs
+    return positions
+
+
+def _shard_metrics(returns, n_resamples, mean_block, seed):
+    """
+    Metrics of one shard of resamples.
+
+    Returns:
+        Dictionary mapping metric name to an array (n_resamples, n_strategies)
+    """
+    rng = np.random.default_rng(seed)
+    idx = stationary_indices(len(returns), n_resamples, mean_block, rng)
+    n_obs = len(returns)
+
+    # Strategy-major layout keeps every resampled path contiguous in memory
+    sample = returns.T[:, idx]  # (strategy, resample, day)
+    mean = sample @ np.full(n_obs, 1 / n_obs)
+    variance = (np.einsum('...i,...i->...', sample, sample) - n_obs * mean ** 2) / (n_obs - 1)
+    std = np.sqrt(np.maximum(variance, 0.0))
+
+    # Wealth in log space: a cumulative sum instead of a cumulative product
+    log_wealth = np.take(np.log1p(returns).T, idx, axis=1, out=sample)
+    np.cumsum(log_wealth, axis=-1, out=log_wealth)
+    peak = np.maximum.accumulate(log_wealth, axis=-1)
+    np.maximum(peak, 0.0, out=peak)
+    worst = np.subtract(log_wealth, peak, out=peak).min(axis=-1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sharpe = np.where(std > 0, mean / std * np.sqrt(TRADING_DAYS), 0.0)
+    return {
+        'sharpe_ratio': sharpe.T,
+        'max_drawdown': np.expm1(worst).T,
+        'total_return': np.expm1(log_wealth[..., -1]).T
+    }
+
+
+def _as_matrix(returns):
+    """Daily returns as a float (n_dates, n_strategies) array plus strategy names."""
+    if isinstance(returns, pd.Series):
+        returns = returns.to_frame()
+    if isinstance(returns, pd.DataFrame):
+        names = list(returns.columns)
+        values = returns.dropna(how='all').fillna(0.0).to_numpy(dtype=float)
+    else:
+        values = np.asarray(returns, dtype=float)
+        if values.ndim == 1:
+            values = values[:, None]
+        names = list(range(values.shape[1]))
+        values = np.nan_to_num(values)
+    return values, names
+
+
+@profiled('backtest.bootstrap')
+def bootstrap_distributions(returns, n_resamples=10000, mean_block=21, seed=None, max_workers=None):
+    """
+    Bootstrap distributions of Sharpe ratio, max drawdown and total return.
+
+    Args:
+        returns: DataFrame (dates x strategies), Series or array of daily returns
+        n_resamples: Number of resamples
+        mean_block: Expected block length in days
+        seed: Seed for reproducible draws
+        max_workers: Worker processes for the shards (default: CPU count; 1 runs in-process)
+
+    Returns:
+        Dictionary mapping metric name to an array (n_resamples, n_strategies)
+    """
+    values, _ = _as_matrix(returns)
+    if len(values) < 2:
+        raise ValueError("At least two days of returns are needed to bootstrap")
+
+    sizes = [SHARD_SIZE] * (n_resamples // SHARD_SIZE)
+    if n_resamples % SHARD_SIZE:
+        sizes.append(n_resamples % SHARD_SIZE)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+
+    max_workers = min(max_workers or os.cpu_count() or 1, len(sizes))
+    if max_workers <= 1:
+        shards = [_shard_metrics(values, size, mean_block, s) for size, s in zip(sizes, seeds)]
+    else:
+        with ProcessPoolExecutor(
+            max_workers=max_workers, mp_context=multiprocessing.get_context('spawn')
+        ) as executor:
+            shards = list(executor.map(
+                _shard_metrics, [values] * len(sizes), sizes, [mean_block] * len(sizes), seeds
+            ))
+    return {metric: np.concatenate([shard[metric] for shard in shards]) for metric in METRICS}
+
+
+def bootstrap_metrics(returns, n_resamples=10000, mean_block=21, confidence=0.95, seed=None, max_workers=None):
+    """
+    Confidence intervals and p-values for each strategy's metrics.
+
+    Intervals are bootstrap percentiles. The Sharpe p-value tests
+    Sharpe <= 0 against Sharpe > 0, using the bootstrap distribution
+    recentred on zero.
+
+    Args:
+        returns: DataFrame (dates x strategies), Series or array of daily returns
+        n_resamples: Number of resamples
+        mean_block: Expected block length in days
+        confidence: Interval coverage (e.g. 0.95)
+        seed: Seed for reproducible draws
+        max_workers: Worker processes for the shards
+
+    Returns:
+        DataFrame indexed by strategy with columns sharpe_ci_low,
+        sharpe_ci_high, sharpe_p_value, max_drawdown_ci_low,
+        max_drawdown_ci_high, total_return_ci_low, total_return_ci_high
+    """
+    values, names = _as_matrix(returns)
+    distributions = bootstrap_distributions(values, n_resamples, mean_block, seed, max_workers)
+
+    alpha = (1 - confidence) / 2
+    columns = {}
+    for metric, short in (('sharpe_ratio', 'sharpe'), ('max_drawdown', 'max_drawdown'),
+                          ('total_return', 'total_return')):
+        low, high = np.quantile(distributions[metric], [alpha, 1 - alpha], axis=0)
+        columns[f'{short}_ci_low'] = low
+        columns[f'{short}_ci_high'] = high
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = values.mean(axis=0)
+        std = values.std(axis=0, ddof=1)
+        sharpe = np.where(std > 0, mean / std * np.sqrt(TRADING_DAYS), 0.0)
+    boot = distributions['sharpe_ratio']
+    # Share of recentred resamples at least as large as the observed Sharpe (+1 smoothing)
+    exceed = ((boot - sharpe) >= sharpe).sum(axis=0)
+    columns['sharpe_p_value'] = (exceed + 1) / (len(boot) + 1)
+
+    order = ['sharpe_ci_low', 'sharpe_ci_high', 'sharpe_p_value', 'max_drawdown_ci_low',
+             'max_drawdown_ci_high', 'total_return_ci_low', 'total_return_ci_high']
+    return pd.DataFrame(columns, index=names)[order]
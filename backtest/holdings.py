@@ -0,0 +1,198 @@
+"""
+Holdings Module
+Compact holdings history for long-short backtests.
+
+Each leg is equal-weighted, so a rebalance is fully described by which names
+are long and which are short. Both legs are stored as packed bitsets (one
+bit per ticker) of shape (factor x rebalance x ticker / 8), e.g. about 3.8 MB
+per factor for 3000 names rebalanced daily over 20 years, against 480 MB for
+the equivalent dense float64 weights. Weights, entry/exit events and per-name
+contributions are expanded from the bitsets only when asked for.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+class HoldingsHistory:
+    """
+    Long and short members of every strategy on every rebalance date.
+    """
+
+    def __init__(self, long_bits, short_bits, factor_names, rebalance_dates, rebalance_rows, tickers, n_dates):
+        """
+        Initialize the history (see ``from_masks``).
+
+        Args:
+            long_bits: uint8 array (n_factors, n_rebalances, ceil(n_tickers / 8))
+            short_bits: uint8 array shaped like ``long_bits``
+            factor_names: Strategy names
+            rebalance_dates: DatetimeIndex of rebalance dates
+            rebalance_rows: Row of each rebalance date in the price panel
+            tickers: Ticker symbols (price panel columns)
+            n_dates: Rows in the price panel (the last holding period ends there)
+        """
+        self.long_bits = long_bits
+        self.short_bits = short_bits
+        self.factor_names = list(factor_names)
+        self.rebalance_dates = pd.DatetimeIndex(rebalance_dates)
+        self.rebalance_rows = np.asarray(rebalance_rows)
+        self.tickers = pd.Index(tickers)
+        self.n_dates = n_dates
+
+    @classmethod
+    def from_masks(cls, long_mask, short_mask, factor_names, rebalance_dates, rebalance_rows, tickers, n_dates):
+        """
+        Pack boolean leg masks (n_factors, n_rebalances, n_tickers).
+
+        Returns:
+            HoldingsHistory instance
+        """
+        return cls(
+            np.packbits(long_mask, axis=-1), np.packbits(short_mask, axis=-1),
+            factor_names, rebalance_dates, rebalance_rows, tickers, n_dates
+        )
+
+    @classmethod
+    def concat(cls, histories):
+        """Stack the strategies of histories that share rebalance dates and tickers."""
+        first = histories[0]
+        return cls(
+            np.concatenate([h.long_bits for h in histories]),
+            np.concatenate([h.short_bits for h in histories]),
+            [name for h in histories for name in h.factor_names],
+            first.rebalance_dates, first.rebalance_rows, first.tickers, first.n_dates
+        )
+
+    @property
+    def nbytes(self):
+        """Memory held by the bitsets, in bytes."""
+        return self.long_bits.nbytes + self.short_bits.nbytes
+
+    def _positions(self, factor_name):
+        if factor_name is None:
+            return slice(None)
+        return [self.factor_names.index(factor_name)]
+
+    def masks(self, factor_name=None, rebalances=slice(None)):
+        """
+        Unpack boolean leg masks.
+
+        Args:
+            factor_name: Strategy to unpack (default: all)
+            rebalances: Index or slice of rebalance positions
+
+        Returns:
+            Tuple of (long mask, short mask), each (n_factors, n_rebalances, n_tickers)
+            (the rebalance axis is dropped for an integer index)
+        """
+        f = self._positions(factor_name)
+        n = len(self.tickers)
+        long_mask = np.unpackbits(self.long_bits[f][:, rebalances], axis=-1, count=n).astype(bool)
+        short_mask = np.unpackbits(self.short_bits[f][:, rebalances], axis=-1, count=n).astype(bool)
+        return long_mask, short_mask
+
+    def weights(self, factor_name=None, rebalances=slice(None)):
+        """
+        Dense portfolio weights (positive = long, negative = short).
+
+        Args:
+            factor_name: Strategy to expand (default: all)
+            rebalances: Index or slice of rebalance positions; e.g. -1 for the
+                current portfolio
+
+        Returns:
+            Float array (n_factors, n_rebalances, n_tickers), without the
+            rebalance axis for an integer index
+        """
+        long_mask, short_mask = self.masks(factor_name, rebalances)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            long_w = long_mask / long_mask.sum(axis=-1, keepdims=True)
+            short_w = short_mask / short_mask.sum(axis=-1, keepdims=True)
+        return np.nan_to_num(long_w) - np.nan_to_num(short_w)
+
+    def to_frame(self, factor_name=None):
+        """
+        Holdings on each rebalance date, in long format.
+
+        Args:
+            factor_name: Strategy to list (default: all)
+
+        Returns:
+            DataFrame with columns factor, date, ticker, weight (non-zero
+            positions only; positive = long, negative = short)
+        """
+        weights = self.weights(factor_name)
+        names = np.asarray(self.factor_names if factor_name is None else [factor_name])
+        f, k, n = np.nonzero(weights)
+        return pd.DataFrame({
+            'factor': names[f],
+            'date': self.rebalance_dates[k],
+            'ticker': np.asarray(self.tickers)[n],
+            'weight': weights[f, k, n]
+        })
+
+    def events(self, factor_name=None):
+        """
+        Names entering and leaving each leg at every rebalance.
+
+        The first rebalance counts every held name as an entry.
+
+        Args:
+            factor_name: Strategy to list (default: all)
+
+        Returns:
+            DataFrame with columns factor, date, ticker, side ('long' or
+            'short') and event ('entry' or 'exit')
+        """
+        f = self._positions(factor_name)
+        names = np.asarray(self.factor_names if factor_name is None else [factor_name])
+        frames = []
+        for side, bits in (('long', self.long_bits[f]), ('short', self.short_bits[f])):
+            # Set differences on the packed bytes; only the changes are unpacked
+            previous = np.zeros_like(bits)
+            previous[:, 1:] = bits[:, :-1]
+            for event, changed in (('entry', bits & ~previous), ('exit', previous & ~bits)):
+                fi, k, n = np.nonzero(np.unpackbits(changed, axis=-1, count=len(self.tickers)))
+                frames.append(pd.DataFrame({
+                    'factor': names[fi],
+                    'date': self.rebalance_dates[k],
+                    'ticker': np.asarray(self.tickers)[n],
+                    'side': side,
+                    'event': event
+                }))
+        return pd.concat(frames, ignore_index=True).sort_values(['factor', 'date', 'side', 'event'], kind='stable').reset_index(drop=True)
+
+    def contributions(self, asset_returns, factor_name=None):
+        """
+        Each held name's contribution to return over each holding period.
+
+        A contribution is the name's weight times the sum of its daily
+        returns in the period, so a period's contributions add up to the sum
+        of the strategy's daily returns over that period.
+
+        Args:
+            asset_returns: Array (n_dates, n_tickers) of daily asset returns on
+                the price panel's rows (row t is the return into day t)
+            factor_name: Strategy to attribute (default: all)
+
+        Returns:
+            DataFrame with columns factor, date (rebalance date), ticker,
+            weight, contribution
+        """
+        rows = self.rebalance_rows
+        if len(rows) == 0:
+            return pd.DataFrame(columns=['factor', 'date', 'ticker', 'weight', 'contribution'])
+        # Period k holds from the day after rebalance k through rebalance k + 1
+        held = np.asarray(asset_returns, dtype=float)[rows[0] + 1:self.n_dates]
+        offsets = rows - rows[0]
+        started = offsets < len(held)  # a rebalance on the last day has no holding period yet
+        period_sums = np.zeros((len(rows), len(self.tickers)))
+        if started.any():
+            period_sums[started] = np.add.reduceat(held, offsets[started], axis=0)
+
+        holdings = self.to_frame(factor_name)
+        k = self.rebalance_dates.get_indexer(holdings['date'])
+        n = self.tickers.get_indexer(holdings['ticker'])
+        holdings['contribution'] = holdings['weight'].to_numpy() * period_sums[k, n]
+        return holdings
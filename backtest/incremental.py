@@ -0,0 +1,492 @@
+"""
+Incremental Backtest Module
+Daily update mode for the array factor scores and the batch backtest.
+
+A full run recomputes factor scores and portfolio returns over the whole
+history. ``IncrementalBacktest`` keeps the state needed to extend a finished
+run by a few bars instead:
+
+- the price history, in an append-only buffer (the momentum window only ever
+  reads its tail);
+- the weights set at the most recent rebalance;
+- running metric accumulators (Welford mean/variance, wealth, peak,
+  drawdown, gains/losses) for gross and net-of-cost returns, plus the
+  turnover traded so far.
+
+An update computes asset returns for the new bars only. It scores and
+rebalances only on new rebalance dates and applies the held weights to the
+new days. Every factor score depends only on data up to its own date, so
+cost is O(new days x tickers), and results match a full recompute to
+floating-point tolerance.
+
+Transaction costs follow ``BatchBacktester``: commission plus half the
+spread on the notional traded at each rebalance, charged on the first day
+of the holding period.
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+
+from backtest.batch import (TRADING_DAYS, BatchBacktester, _as_fraction, _FREQ_ALIASES,
+                            transaction_costs)
+from backtest.selection import quantile_masks
+from factors.array_factors import (TRADING_DAYS_PER_MONTH, calculate_factor_stack,
+                                   momentum_scores, quality_scores, size_scores, value_scores)
+
+
+FUNDAMENTAL_FIELDS = ('bookValue', 'priceToBook', 'marketCap', 'sharesOutstanding',
+                      'currentPrice', 'returnOnEquity')
+
+# Momentum reads prices up to 12 months back (see factors.array_factors.momentum_scores)
+_MOMENTUM_WINDOW = 12 * TRADING_DAYS_PER_MONTH
+
+
+def _datetimes(dates):
+    """Dates as a datetime64[ns] array (independent of the index resolution)."""
+    return np.asarray(pd.DatetimeIndex(dates).values, dtype='datetime64[ns]')
+
+
+class _RowBuffer:
+    """Append-only array with amortized O(rows appended) growth."""
+
+    def __init__(self, values):
+        values = np.asarray(values)
+        self._data = np.array(values, copy=True)
+        self._size = len(values)
+
+    @property
+    def values(self):
+        return self._data[:self._size]
+
+    def __len__(self):
+        return self._size
+
+    def append(self, rows):
+        rows = np.asarray(rows, dtype=self._data.dtype)
+        needed = self._size + len(rows)
+        if needed > len(self._data):
+            grown = np.empty((max(needed, 2 * len(self._data)),) + self._data.shape[1:], dtype=self._data.dtype)
+            grown[:self._size] = self.values
+            self._data = grown
+        self._data[self._size:needed] = rows
+        self._size = needed
+
+
+class RunningMetrics:
+    """
+    Performance metrics accumulated block by block.
+
+    Produces the same values as ``backtest.batch.calculate_metrics_matrix``
+    over all returns seen so far.
+    """
+
+    def __init__(self, n_strategies):
+        self.n = 0
+        self.mean = np.zeros(n_strategies)
+        self.m2 = np.zeros(n_strategies)
+        self.down_sq = np.zeros(n_strategies)
+        self.wealth = np.ones(n_strategies)
+        self.peak = np.ones(n_strategies)
+        self.max_drawdown = np.zeros(n_strategies)
+        self.gains = np.zeros(n_strategies)
+        self.losses = np.zeros(n_strategies)
+        self.wins = np.zeros(n_strategies)
+
+    def update(self, returns):
+        """
+        Add a block of returns.
+
+        Args:
+            returns: Array (n_new_dates, n_strategies)
+        """
+        returns = np.asarray(returns, dtype=float)
+        m = len(returns)
+        if m == 0:
+            return
+
+        # Chan et al. merge of the block's mean and M2 into the running values
+        block_mean = returns.mean(axis=0)
+        block_m2 = ((returns - block_mean) ** 2).sum(axis=0)
+        total = self.n + m
+        delta = block_mean - self.mean
+        self.mean = self.mean + delta * m / total
+        self.m2 = self.m2 + block_m2 + delta ** 2 * self.n * m / total
+        self.n = total
+
+        self.down_sq += (np.minimum(returns, 0) ** 2).sum(axis=0)
+        wealth = self.wealth * np.cumprod(1 + returns, axis=0)
+        peak = np.maximum(self.peak, np.maximum.accumulate(wealth, axis=0))
+        self.max_drawdown = np.minimum(self.max_drawdown, (wealth / peak - 1).min(axis=0))
+        self.wealth = wealth[-1]
+        self.peak = peak[-1]
+
+        self.gains += np.where(returns > 0, returns, 0).sum(axis=0)
+        self.losses += np.abs(np.where(returns < 0, returns, 0).sum(axis=0))
+        self.wins += (returns > 0).sum(axis=0)
+
+    def metrics(self):
+        """
+        Current metrics.
+
+        Returns:
+            Dictionary mapping metric name to an array of length n_strategies
+        """
+        n = self.n
+        with np.errstate(divide='ignore', invalid='ignore'):
+            total_return = self.wealth - 1
+            annualized_return = (1 + total_return) ** (TRADING_DAYS / n) - 1
+            std = np.sqrt(self.m2 / (n - 1)) if n > 1 else np.full_like(self.mean, np.nan)
+            downside = np.sqrt(self.down_sq / n)
+            calmar = np.where(self.max_drawdown < 0, annualized_return / np.abs(self.max_drawdown), 0.0)
+            return {
+                'total_return': total_return,
+                'annualized_return': annualized_return,
+                'annualized_volatility': std * np.sqrt(TRADING_DAYS),
+                'sharpe_ratio': np.where(std > 0, self.mean / std * np.sqrt(TRADING_DAYS), 0.0),
+                'sortino_ratio': np.where(downside > 0, self.mean / downside * np.sqrt(TRADING_DAYS), 0.0),
+                'max_drawdown': self.max_drawdown.copy(),
+                'calmar_ratio': calmar,
+                'win_rate': self.wins / n,
+                'profit_factor': np.where(self.losses > 0, self.gains / self.losses, np.inf)
+            }
+
+
+class IncrementalBacktest:
+    """
+    Long-short backtest state that can be extended bar by bar.
+
+    Build it from a finished history with ``from_history``, then call
+    ``update`` (or ``refresh``) with new bars.
+    """
+
+    def __init__(self, prices, dates, tickers, factor_names, fundamental_data=None,
+                 top_pct=20, bottom_pct=20, rebalance_freq='monthly', commission_bps=0.0, spread_bps=0.0):
+        """
+        Initialize an empty state over a price history. Prefer ``from_history``.
+
+        Args:
+            prices: Array (n_dates, n_tickers); its dtype is kept (float32 panels stay float32)
+            dates: DatetimeIndex, one per row
+            tickers: Ticker symbols, one per column
+            factor_names: Lower-case factor names
+            fundamental_data: DataFrame of fundamentals indexed by ticker
+            top_pct: Long percentile (fraction or percent)
+            bottom_pct: Short percentile (fraction or percent)
+            rebalance_freq: 'daily', 'weekly', 'monthly' or 'quarterly'
+            commission_bps: Commission per unit traded, in basis points
+            spread_bps: Bid-ask spread in basis points (half is paid per trade)
+        """
+        prices = np.asarray(prices)
+        if not np.issubdtype(prices.dtype, np.floating):
+            prices = prices.astype(float)
+        self.tickers = pd.Index(tickers)
+        self.factor_names = list(factor_names)
+        self.top_pct = _as_fraction(top_pct)
+        self.bottom_pct = _as_fraction(bottom_pct)
+        self.rebalance_freq = rebalance_freq
+        self.commission_bps = commission_bps
+        self.spread_bps = spread_bps
+        self._period_code = _FREQ_ALIASES[str(rebalance_freq).lower()]
+
+        if fundamental_data is not None:
+            fields = [f for f in FUNDAMENTAL_FIELDS if f in fundamental_data.columns]
+            fundamental_data = fundamental_data.reindex(self.tickers)[fields].astype(float)
+        self.fundamental_data = fundamental_data
+
+        self._prices = _RowBuffer(prices)
+        self._dates = _RowBuffer(_datetimes(dates))
+        self._returns = _RowBuffer(np.empty((0, len(self.factor_names))))
+        self._net_returns = _RowBuffer(np.empty((0, len(self.factor_names))))
+        self._return_dates = _RowBuffer(_datetimes([]))
+        self.weights = None
+        self.metrics_state = RunningMetrics(len(self.factor_names))
+        self.net_metrics_state = RunningMetrics(len(self.factor_names))
+        self.turnover_sum = np.zeros(len(self.factor_names))
+        self.n_rebalances = 0
+
+    @classmethod
+    def from_history(cls, price_data, factor_names, fundamental_data=None, **kwargs):
+        """
+        Run the full backtest once and keep the state for later updates.
+
+        Args:
+            price_data: DataFrame of prices (dates x tickers) or a PricePanel
+            factor_names: Lower-case factor names
+            fundamental_data: DataFrame of fundamentals indexed by ticker
+            **kwargs: top_pct, bottom_pct, rebalance_freq, commission_bps, spread_bps
+
+        Returns:
+            IncrementalBacktest instance
+        """
+        state = cls(price_data.to_numpy(), price_data.index, price_data.columns,
+                    factor_names, fundamental_data, **kwargs)
+        engine = state._full_engine(state.factor_names)
+        returns = engine.run_backtest()
+        if engine.holdings_history is not None:
+            state.weights = engine.holdings_history.weights(rebalances=-1)
+        net = engine.net_returns.to_numpy(dtype=float)
+        state._returns.append(returns.to_numpy(dtype=float))
+        state._net_returns.append(net)
+        state._return_dates.append(_datetimes(returns.index))
+        state.metrics_state.update(returns.to_numpy(dtype=float))
+        state.net_metrics_state.update(net)
+        state.turnover_sum += engine.turnover.to_numpy(dtype=float).sum(axis=0)
+        state.n_rebalances = len(engine.turnover)
+        return state
+
+    @property
+    def prices(self):
+        return self._prices.values
+
+    @property
+    def dates(self):
+        return pd.DatetimeIndex(self._dates.values)
+
+    @property
+    def portfolio_returns(self):
+        """Daily long-short returns so far, before costs (dates x factors)."""
+        return pd.DataFrame(self._returns.values, index=pd.DatetimeIndex(self._return_dates.values),
+                            columns=self.factor_names)
+
+    @property
+    def net_returns(self):
+        """Daily long-short returns so far, net of transaction costs (dates x factors)."""
+        return pd.DataFrame(self._net_returns.values, index=pd.DatetimeIndex(self._return_dates.values),
+                            columns=self.factor_names)
+
+    def _full_engine(self, factor_names):
+        """BatchBacktester over the whole stored history."""
+        prices = self.prices
+        panel = pd.DataFrame(prices, index=self.dates, columns=self.tickers, copy=False)
+        stack = calculate_factor_stack(panel, factor_names, self.fundamental_data)
+        return BatchBacktester(stack, panel, factor_names, top_pct=self.top_pct,
+                               bottom_pct=self.bottom_pct, rebalance_freq=self.rebalance_freq,
+                               commission_bps=self.commission_bps, spread_bps=self.spread_bps)
+
+    def scores_at(self, row):
+        """
+        Factor scores on one stored date, from the prices up to that date.
+
+        Args:
+            row: Row position into the stored history
+
+        Returns:
+            Array (n_factors, n_tickers) in the price dtype
+        """
+        prices = self.prices
+        window = prices[max(row - _MOMENTUM_WINDOW, 0):row + 1]
+        today = prices[row:row + 1]
+        scores = np.empty((len(self.factor_names), prices.shape[1]), dtype=prices.dtype)
+        for i, name in enumerate(self.factor_names):
+            if name == 'momentum':
+                scores[i] = momentum_scores(window)[-1]
+            elif name == 'value':
+                scores[i] = value_scores(today, self.fundamental_data, self.tickers)[0]
+            elif name == 'quality':
+                scores[i] = quality_scores(today, self.fundamental_data, self.tickers)[0]
+            elif name == 'size':
+                scores[i] = size_scores(today, self.fundamental_data, self.tickers)[0]
+            else:
+                raise ValueError(f"Unknown factor: {name}")
+        return scores
+
+    def latest_scores(self):
+        """
+        Factor scores on the latest stored date.
+
+        Returns:
+            DataFrame (tickers x factors)
+        """
+        scores = self.scores_at(len(self._prices) - 1)
+        return pd.DataFrame(scores.T, index=self.tickers, columns=self.factor_names)
+
+    def _rebalance_weights(self, row):
+        """Long-short weights from the scores on a rebalance row (same rules as BatchBacktester)."""
+        scores = self.scores_at(row).astype(float)
+        scores[:, np.isnan(self.prices[row])] = np.nan
+        long_mask, short_mask = quantile_masks(scores, self.top_pct, self.bottom_pct)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            long_w = long_mask / long_mask.sum(axis=-1, keepdims=True)
+            short_w = short_mask / short_mask.sum(axis=-1, keepdims=True)
+        return np.nan_to_num(long_w) - np.nan_to_num(short_w)
+
+    def update(self, new_prices):
+        """
+        Append new bars and extend scores, returns and metrics.
+
+        Args:
+            new_prices: DataFrame of prices (dates x tickers) for dates after the
+                last stored date; missing tickers are treated as unpriced
+
+        Returns:
+            DataFrame of the new daily portfolio returns before costs (dates x
+            factors); the net returns are appended to ``net_returns``
+        """
+        new_prices = new_prices.loc[_datetimes(new_prices.index) > self._dates.values[-1]]
+        if new_prices.empty:
+            return pd.DataFrame(columns=self.factor_names, dtype=float)
+
+        new_prices = new_prices.sort_index().reindex(columns=self.tickers)
+        values = new_prices.to_numpy(dtype=self.prices.dtype)
+        start = len(self._prices)
+        previous = self.prices[-1:]
+        self._prices.append(values)
+        self._dates.append(_datetimes(new_prices.index))
+        end = len(self._prices)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            asset_returns = values / np.concatenate([previous, values[:-1]]) - 1
+        asset_returns[~np.isfinite(asset_returns)] = 0.0
+
+        # The previous last date becomes a rebalance date if the new bars start a new period
+        periods = pd.DatetimeIndex(self._dates.values[start - 1:]).to_period(self._period_code).asi8
+        rebalances = start - 1 + np.flatnonzero(periods[:-1] != periods[1:])
+
+        out = np.empty((end - start, len(self.factor_names)))
+        costs = np.zeros_like(out)
+        held = np.zeros(end - start, dtype=bool)
+        cursor = start
+        for row in list(rebalances) + [end - 1]:
+            if self.weights is not None and row >= cursor:
+                block = slice(cursor - start, row - start + 1)
+                out[block] = asset_returns[block] @ self.weights.T
+                held[block] = True
+            cursor = max(cursor, row + 1)
+            if row < end - 1:
+                weights = self._rebalance_weights(row)
+                previous_weights = self.weights if self.weights is not None else np.zeros_like(weights)
+                turnover = np.abs(weights - previous_weights).sum(axis=-1)
+                # Charged on the first day of the holding period, as in BatchBacktester
+                costs[row + 1 - start] = transaction_costs(turnover, self.commission_bps, self.spread_bps)
+                self.turnover_sum += turnover
+                self.n_rebalances += 1
+                self.weights = weights
+
+        new_dates = _datetimes(new_prices.index)[held]
+        new_returns = out[held]
+        new_net = new_returns - costs[held]
+        self._returns.append(new_returns)
+        self._net_returns.append(new_net)
+        self._return_dates.append(new_dates)
+        self.metrics_state.update(new_returns)
+        self.net_metrics_state.update(new_net)
+
+        return pd.DataFrame(new_returns, index=pd.DatetimeIndex(new_dates), columns=self.factor_names)
+
+    def refresh(self, fetcher, end_date=None):
+        """
+        Fetch bars after the last stored date and apply them.
+
+        Args:
+            fetcher: Object with ``fetch_data(tickers, start_date, end_date)``
+                (a cached fetcher only downloads the missing days)
+            end_date: Last date to fetch (default: today)
+
+        Returns:
+            DataFrame of the new daily portfolio returns
+        """
+        start = (self.dates[-1] + pd.Timedelta(days=1)).strftime('%Y-%m-%d')
+        end = pd.Timestamp(end_date or pd.Timestamp.now().normalize()).strftime('%Y-%m-%d')
+        if start > end:
+            return pd.DataFrame(columns=self.factor_names, dtype=float)
+        return self.update(fetcher.fetch_data(list(self.tickers), start, end))
+
+    def calculate_metrics(self):
+        """
+        Current performance metrics for every factor.
+
+        Gross metrics come first, followed by the same turnover and
+        net-of-cost columns as ``BatchBacktester.calculate_metrics``.
+
+        Returns:
+            DataFrame of metrics (factors x metric names)
+        """
+        if self.metrics_state.n == 0:
+            return pd.DataFrame(index=self.factor_names)
+        metrics = self.metrics_state.metrics()
+        net = self.net_metrics_state.metrics()
+        years = self.metrics_state.n / TRADING_DAYS
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cost_drag = 1 - (self.net_metrics_state.wealth / self.metrics_state.wealth) ** (1 / years)
+            turnover = self.turnover_sum / self.n_rebalances if self.n_rebalances \
+                else np.full(len(self.factor_names), np.nan)
+        metrics.update({
+            'turnover': turnover,
+            'annual_turnover': self.turnover_sum / years,
+            'cost_drag': cost_drag,
+            'net_annualized_return': net['annualized_return'],
+            'net_sharpe_ratio': net['sharpe_ratio'],
+            'net_max_drawdown': net['max_drawdown']
+        })
+        return pd.DataFrame(metrics, index=self.factor_names)
+
+    def save(self, path):
+        """
+        Store the state in a single .npz file.
+
+        Args:
+            path: Destination path
+        """
+        arrays = {
+            'prices': self.prices,
+            'dates': self._dates.values,
+            'returns': self._returns.values,
+            'net_returns': self._net_returns.values,
+            'return_dates': self._return_dates.values,
+            'turnover_sum': self.turnover_sum,
+            'n_rebalances': np.asarray(self.n_rebalances),
+            'tickers': np.asarray(self.tickers, dtype=str),
+            'weights': self.weights if self.weights is not None else np.empty(0),
+            'meta': np.array(json.dumps({
+                'factor_names': self.factor_names,
+                'top_pct': self.top_pct,
+                'bottom_pct': self.bottom_pct,
+                'rebalance_freq': self.rebalance_freq,
+                'commission_bps': self.commission_bps,
+                'spread_bps': self.spread_bps,
+                'fundamental_fields': list(self.fundamental_data.columns)
+                if self.fundamental_data is not None else None
+            }))
+        }
+        if self.fundamental_data is not None:
+            arrays['fundamentals'] = self.fundamental_data.to_numpy(dtype=float)
+        for prefix, metrics in (('metrics', self.metrics_state), ('net_metrics', self.net_metrics_state)):
+            for name, value in vars(metrics).items():
+                arrays[f'{prefix}_{name}'] = np.asarray(value)
+        np.savez(path, **arrays)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Restore a state written by ``save``.
+
+        Args:
+            path: Path to the .npz file
+
+        Returns:
+            IncrementalBacktest instance
+        """
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data['meta']))
+            tickers = data['tickers']
+            fundamental_data = None
+            if meta['fundamental_fields'] is not None:
+                fundamental_data = pd.DataFrame(data['fundamentals'], index=tickers,
+                                                columns=meta['fundamental_fields'])
+            state = cls(data['prices'], pd.DatetimeIndex(data['dates']), tickers, meta['factor_names'],
+                        fundamental_data, top_pct=meta['top_pct'], bottom_pct=meta['bottom_pct'],
+                        rebalance_freq=meta['rebalance_freq'], commission_bps=meta['commission_bps'],
+                        spread_bps=meta['spread_bps'])
+            state._returns.append(data['returns'])
+            state._net_returns.append(data['net_returns'])
+            state._return_dates.append(data['return_dates'])
+            state.weights = data['weights'] if data['weights'].size else None
+            state.turnover_sum = data['turnover_sum'].copy()
+            state.n_rebalances = int(data['n_rebalances'])
+            for prefix, metrics in (('metrics', state.metrics_state), ('net_metrics', state.net_metrics_state)):
+                for name in vars(metrics):
+                    value = data[f'{prefix}_{name}']
+                    setattr(metrics, name, int(value) if name == 'n' else value.copy())
+        return state
@@ -0,0 +1,368 @@
+"""
+Pipeline Module
+Headless version of the app.py analysis pipeline for batch jobs.
+
+Each configuration runs the same flow as the Streamlit app (fetch prices and
+fundamentals, compute factor scores, backtest every factor, compute metrics).
+``run_batch`` spreads configurations across worker processes. Before the
+workers start, the parent resolves every universe, warms the shared on-disk
+price cache for the union of tickers and dates, and fetches fundamentals
+once. Workers then read prices from the cache instead of the network.
+Full-universe configs go one step further: the parent writes each distinct
+price panel to a memory-mapped panel store (see ``data.panel_store``) and
+workers open it read-only, so all workers share one copy of the prices.
+
+Configuration keys (all but ``universe`` and ``factors`` are optional)::
+
+    name:            label used in the output (default: universe and factors)
+    universe:        'sp500', 'russell1000', 'sp500:50' (top N) or a ticker list
+    factors:         e.g. ['Momentum', 'Value']
+    start_date:      YYYY-MM-DD (default: three years before end_date)
+    end_date:        YYYY-MM-DD (default: today)
+    rebalance_freq:  'daily', 'weekly', 'monthly' or 'quarterly'
+    top_pct:         long percentile (default 20)
+    bottom_pct:      short percentile (default 20)
+    commission_bps:  commission per unit traded in bps (default 0)
+    spread_bps:      bid-ask spread in bps, half paid per trade (default 0)
+    full_universe:   use the float32 array path (default False)
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from backtest.batch import BatchBacktester
+from utils.result_store import config_hash
+
+
+DEFAULT_CONFIG = {
+    'start_date': None,
+    'end_date': None,
+    'rebalance_freq': 'monthly',
+    'top_pct': 20,
+    'bottom_pct': 20,
+    'commission_bps': 0.0,
+    'spread_bps': 0.0,
+    'full_universe': False
+}
+
+# Per-worker state set up once by _init_worker
+_WORKER_STATE = {}
+
+
+def load_configs(path):
+    """
+    Load a configuration list from a JSON or YAML file.
+
+    The file holds either a list of configurations or a mapping with a
+    ``configs`` list and optional ``defaults`` applied to every entry.
+
+    Args:
+        path: Path to a .json, .yaml or .yml file
+
+    Returns:
+        List of configuration dictionaries
+    """
+    with open(path) as f:
+        if path.endswith(('.yaml', '.yml')):
+            try:
+                import yaml
+            except ImportError as e:
+                raise ImportError("YAML configs require PyYAML (pip install pyyaml)") from e
+            data = yaml.safe_load(f)
+        else:
+            data = json.load(f)
+
+    if isinstance(data, dict):
+        defaults = data.get('defaults', {})
+        return [{**defaults, **config} for config in data.get('configs', [])]
+    return list(data)
+
+
+def normalize_config(config):
+    """
+    Fill defaults and derive the name and id of a configuration.
+
+    Args:
+        config: Configuration dictionary
+
+    Returns:
+        New dictionary with every key set, plus 'config_id'
+    """
+    if 'universe' not in config or not config.get('factors'):
+        raise ValueError("Each config needs a 'universe' and a non-empty 'factors' list")
+
+    config = {**DEFAULT_CONFIG, **config}
+    config['factors'] = [factor.title() for factor in config['factors']]
+    end = pd.Timestamp(config['end_date'] or pd.Timestamp.now().normalize())
+    start = pd.Timestamp(config['start_date'] or end - pd.DateOffset(years=3))
+    config['end_date'] = end.strftime('%Y-%m-%d')
+    config['start_date'] = start.strftime('%Y-%m-%d')
+    config['rebalance_freq'] = config['rebalance_freq'].lower()
+
+    if not config.get('name'):
+        universe = config['universe'] if isinstance(config['universe'], str) else f"{len(config['universe'])}_tickers"
+        config['name'] = f"{universe}_{'_'.join(f.lower() for f in config['factors'])}"
+    config['config_id'] = config_hash({k: v for k, v in config.items() if k != 'name'})[:12]
+    return config
+
+
+def resolve_universe(universe, fetcher):
+    """
+    Resolve a universe spec to a list of tickers.
+
+    Args:
+        universe: 'sp500' / 'russell1000', optionally ':N' for the top N, or a
+            list of tickers
+        fetcher: DataFetcher used for index constituents
+
+    Returns:
+        List of ticker symbols
+    """
+    if not isinstance(universe, str):
+        return [str(ticker).strip().upper() for ticker in universe]
+
+    name, _, top = universe.lower().partition(':')
+    if name in ('sp500', 's&p500'):
+        tickers = fetcher.get_sp500_tickers()
+    elif name in ('russell1000', 'r1000'):
+        tickers = fetcher.get_russell1000_tickers()
+    else:
+        raise ValueError(f"Unknown universe '{universe}'. Use 'sp500', 'russell1000' or a ticker list")
+    return tickers[:int(top)] if top else tickers
+
+
+def needs_fundamentals(config):
+    """Whether a configuration needs fundamental data (same rule as the app)."""
+    factor_names = [factor.lower() for factor in config['factors']]
+    return 'value' in factor_names or (
+        config['full_universe'] and any(name != 'momentum' for name in factor_names)
+    )
+
+
+def run_analysis(config, tickers, fetcher, fundamental_data=None, panel=None):
+    """
+    Run the app pipeline for one configuration.
+
+    Args:
+        config: Normalized configuration (see ``normalize_config``)
+        tickers: Resolved ticker list
+        fetcher: DataFetcher for prices
+        fundamental_data: Fundamentals indexed by ticker (fetched if needed and None)
+        panel: Prices as a PricePanel for full-universe configs (fetched if None)
+
+    Returns:
+        Tuple of (metrics DataFrame indexed by factor, daily returns DataFrame)
+    """
+    if panel is None:
+        price_data = fetcher.fetch_data(tickers, config['start_date'], config['end_date'])
+        if price_data.empty:
+            raise ValueError("No price data fetched")
+
+    if fundamental_data is None and needs_fundamentals(config):
+        from data.provider import get_fundamentals_fetcher
+        fundamental_data, _ = get_fundamentals_fetcher(fetcher=fetcher).fetch(tickers)
+    elif fundamental_data is not None:
+        fundamental_data = fundamental_data.reindex(
+            [ticker for ticker in tickers if ticker in fundamental_data.index]
+        )
+
+    factor_names = [factor.lower() for factor in config['factors']]
+    engine_options = dict(
+        top_pct=config['top_pct'],
+        bottom_pct=config['bottom_pct'],
+        rebalance_freq=config['rebalance_freq'],
+        commission_bps=config['commission_bps'],
+        spread_bps=config['spread_bps']
+    )
+    if config['full_universe']:
+        from data.panel import PricePanel
+        from factors.array_factors import calculate_factor_stack
+
+        if panel is None:
+            panel = PricePanel.from_frame(price_data)
+            del price_data
+        score_stack = calculate_factor_stack(panel, factor_names, fundamental_data)
+        engine = BatchBacktester(score_stack, panel, factor_names, **engine_options)
+    else:
+        from factors.factor_calculator import FactorCalculator
+
+        factor_scores = FactorCalculator(price_data, fundamental_data).calculate_all_factors(config['factors'])
+        if factor_scores.empty:
+            raise ValueError("Failed to calculate factors")
+        engine = BatchBacktester.from_factor_scores(factor_scores, price_data, factor_names, **engine_options)
+
+    returns = engine.run_backtest()
+    metrics = engine.calculate_metrics()
+    metrics.index = config['factors']
+    returns.columns = config['factors']
+    return metrics, returns
+
+
+def _store_panel(config, tickers, fetcher, panel_dir):
+    """
+    Write the price panel of a full-universe config to the batch panel store.
+
+    Configs over the same tickers and dates share one stored panel.
+
+    Returns:
+        Path of the stored panel, or None if no prices were fetched
+    """
+    from data.panel import PricePanel
+    from data.panel_store import panel_key, write_panel
+
+    path = os.path.join(panel_dir, panel_key(tickers, config['start_date'], config['end_date']))
+    if not os.path.exists(path):
+        price_data = fetcher.fetch_data(tickers, config['start_date'], config['end_date'])
+        if price_data.empty:
+            return None
+        write_panel(PricePanel.from_frame(price_data), path)
+    return path
+
+
+def _init_worker(provider, cache_dir, fundamental_data, output_dir):
+    """Build the per-process fetcher once."""
+    from data.provider import get_data_fetcher
+
+    _WORKER_STATE['fetcher'] = get_data_fetcher(provider, cache_dir=cache_dir)
+    _WORKER_STATE['fundamentals'] = fundamental_data
+    _WORKER_STATE['output_dir'] = output_dir
+
+
+def _run_one(config, tickers, panel_path=None):
+    """Run one configuration in a worker and write its returns to Parquet."""
+    started = time.perf_counter()
+    base = {
+        'config_id': config['config_id'],
+        'name': config['name'],
+        'n_tickers': len(tickers),
+        'start_date': config['start_date'],
+        'end_date': config['end_date'],
+        'rebalance_freq': config['rebalance_freq'],
+        'top_pct': config['top_pct'],
+        'bottom_pct': config['bottom_pct'],
+        'commission_bps': config['commission_bps'],
+        'spread_bps': config['spread_bps']
+    }
+    try:
+        fundamentals = _WORKER_STATE['fundamentals'] if needs_fundamentals(config) else None
+        panel = None
+        if panel_path is not None:
+            from data.panel_store import open_panel
+            panel = open_panel(panel_path)
+        metrics, returns = run_analysis(config, tickers, _WORKER_STATE['fetcher'], fundamentals, panel)
+    except Exception as e:
+        return [{**base, 'factor': None, 'status': 'error', 'error': f"{type(e).__name__}: {e}",
+                 'seconds': time.perf_counter() - started}]
+
+    returns.to_parquet(os.path.join(_WORKER_STATE['output_dir'], 'returns', f"{config['config_id']}.parquet"))
+    seconds = time.perf_counter() - started
+    return [
+        {**base, 'factor': factor, 'status': 'ok', 'error': None, 'seconds': seconds, **row}
+        for factor, row in metrics.to_dict(orient='index').items()
+    ]
+
+
+def run_batch(configs, output_dir, max_workers=None, provider=None, cache_dir=None, verbose=True):
+    """
+    Run many configurations in parallel and write the results to Parquet.
+
+    Output layout::
+
+        <output_dir>/metrics.parquet           one row per (config, factor)
+        <output_dir>/returns/<config_id>.parquet  daily returns per config
+        <output_dir>/summary.json              timings and throughput
+
+    Args:
+        configs: List of configuration dictionaries
+        output_dir: Directory for the results
+        max_workers: Worker processes (default: CPU count; 1 runs in-process)
+        provider: Data provider name (default: from the environment)
+        cache_dir: Shared price cache directory (default: $FMV_CACHE_DIR)
+        verbose: Print progress
+
+    Returns:
+        Tuple of (metrics DataFrame, summary dictionary)
+    """
+    from data.provider import get_data_fetcher, get_fundamentals_fetcher
+
+    started = time.perf_counter()
+    os.makedirs(os.path.join(output_dir, 'returns'), exist_ok=True)
+    configs = [normalize_config(config) for config in configs]
+
+    # Resolve universes and warm the shared cache once in the parent
+    fetcher = get_data_fetcher(provider, cache_dir=cache_dir)
+    universes = [resolve_universe(config['universe'], fetcher) for config in configs]
+    all_tickers = sorted({ticker for tickers in universes for ticker in tickers})
+    first_start = min(config['start_date'] for config in configs)
+    last_end = max(config['end_date'] for config in configs)
+    if hasattr(fetcher, 'cache'):
+        fetcher.fetch_data(all_tickers, first_start, last_end)
+
+    fundamental_data = None
+    fundamental_tickers = sorted({
+        ticker for config, tickers in zip(configs, universes) if needs_fundamentals(config)
+        for ticker in tickers
+    })
+    if fundamental_tickers:
+        fundamental_data, _ = get_fundamentals_fetcher(provider, fetcher=fetcher).fetch(fundamental_tickers)
+
+    # One memory-mapped panel per distinct full-universe (tickers, dates), opened by the workers
+    panel_dir = tempfile.mkdtemp(prefix="fmv_batch_panels_")
+    panel_paths = [_store_panel(config, tickers, fetcher, panel_dir) if config['full_universe'] else None
+                   for config, tickers in zip(configs, universes)]
+    prepared = time.perf_counter()
+    if verbose:
+        print(f"Prepared {len(configs)} configs over {len(all_tickers)} tickers "
+              f"in {time.perf_counter() - started:.1f}s")
+
+    max_workers = min(max_workers or os.cpu_count() or 1, len(configs))
+    init_args = (provider, cache_dir, fundamental_data, output_dir)
+    jobs = list(zip(configs, universes, panel_paths))
+    rows = []
+    try:
+        if max_workers <= 1:
+            _init_worker(*init_args)
+            try:
+                for job in jobs:
+                    rows.extend(_run_one(*job))
+            finally:
+                _WORKER_STATE.clear()
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                     initargs=init_args) as executor:
+                futures = [executor.submit(_run_one, *job) for job in jobs]
+                for i, future in enumerate(futures, 1):
+                    rows.extend(future.result())
+                    if verbose:
+                        print(f"  {i}/{len(futures)} configs done")
+    finally:
+        shutil.rmtree(panel_dir, ignore_errors=True)
+
+    metrics = pd.DataFrame(rows)
+    metrics.to_parquet(os.path.join(output_dir, 'metrics.parquet'), index=False)
+
+    elapsed = time.perf_counter() - started
+    run_seconds = time.perf_counter() - prepared
+    failed = int(metrics.loc[metrics['status'] == 'error', 'config_id'].nunique()) if len(metrics) else 0
+    summary = {
+        'configs': len(configs),
+        'failed': failed,
+        'workers': max_workers,
+        'tickers': len(all_tickers),
+        'seconds': elapsed,
+        'configs_per_minute': len(configs) / elapsed * 60 if elapsed > 0 else None,
+        'run_configs_per_minute': len(configs) / run_seconds * 60 if run_seconds > 0 else None
+    }
+    with open(os.path.join(output_dir, 'summary.json'), 'w') as f:
+        json.dump(summary, f, indent=2)
+
+    if verbose:
+        print(f"Finished {len(configs)} configs ({failed} failed) in {elapsed:.1f}s: "
+              f"{summary['configs_per_minute']:.1f} configs/minute")
+    return metrics, summary
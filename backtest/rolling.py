@@ -0,0 +1,184 @@
+"""
+Rolling Statistics Module
+Rolling Sharpe, Sortino, volatility and drawdown for many strategies and
+windows at once.
+
+Returns are held as one (date x strategy) matrix. Prefix sums of the returns,
+squared returns and squared downside returns are built once, and every
+window's rolling mean and variance is then a difference of two prefix-sum
+rows, so adding a window costs O(n_dates x n_strategies) regardless of its
+length. Returns are centered on each strategy's mean before summing to keep
+the variance differences numerically stable.
+"""
+
+import numpy as np
+import pandas as pd
+
+from backtest.batch import TRADING_DAYS
+from utils.profiler import profiled
+
+
+DEFAULT_WINDOWS = (63, 126, 252, 504)
+STATISTICS = ('sharpe', 'sortino', 'volatility', 'drawdown')
+
+
+class RollingStats:
+    """
+    Multi-window rolling statistics over a returns matrix.
+
+    Results are memoized per (statistic, window), so switching windows in the
+    UI only computes windows that have not been requested before.
+    """
+
+    def __init__(self, returns):
+        """
+        Build the shared prefix sums.
+
+        Args:
+            returns: DataFrame of daily returns (dates x strategies), or a Series
+        """
+        if isinstance(returns, pd.Series):
+            returns = returns.to_frame()
+        self.index = returns.index
+        self.columns = returns.columns
+
+        values = returns.to_numpy(dtype=float)
+        self._values = values
+        self._shift = values.mean(axis=0) if len(values) else np.zeros(values.shape[1])
+        centered = values - self._shift
+
+        # Row i holds the sum of the first i observations
+        self._sum = self._prefix(centered)
+        self._sum_sq = self._prefix(centered ** 2)
+        self._down_sq = self._prefix(np.minimum(values, 0.0) ** 2)
+        self._wealth = None
+        self._cache = {}
+
+    @staticmethod
+    def _prefix(values):
+        out = np.zeros((values.shape[0] + 1, values.shape[1]))
+        np.cumsum(values, axis=0, out=out[1:])
+        return out
+
+    def _window_sums(self, prefix, window):
+        """Trailing-window sums aligned to dates (NaN until the window is full)."""
+        out = np.full(self._values.shape, np.nan)
+        if window <= len(self._values):
+            out[window - 1:] = prefix[window:] - prefix[:-window]
+        return out
+
+    def _moments(self, window):
+        """Rolling mean and sample standard deviation for a window."""
+        key = ('moments', window)
+        if key not in self._cache:
+            if window < 2:
+                raise ValueError("window must be at least 2")
+            s = self._window_sums(self._sum, window)
+            sq = self._window_sums(self._sum_sq, window)
+            var = (sq - s * s / window) / (window - 1)
+            # Constant windows leave only rounding error behind
+            var[var <= 1e-12 * sq / (window - 1)] = 0.0
+            self._cache[key] = (self._shift + s / window, np.sqrt(var))
+        return self._cache[key]
+
+    def _frame(self, values):
+        return pd.DataFrame(values, index=self.index, columns=self.columns)
+
+    def _get(self, statistic, window):
+        key = (statistic, window)
+        if key not in self._cache:
+            self._cache[key] = getattr(self, f'_compute_{statistic}')(window)
+        return self._cache[key]
+
+    def _compute_sharpe(self, window):
+        mean, std = self._moments(window)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            values = np.where(std > 0, mean / std, np.nan) * np.sqrt(TRADING_DAYS)
+        return self._frame(values)
+
+    def _compute_sortino(self, window):
+        mean, _ = self._moments(window)
+        downside = np.sqrt(self._window_sums(self._down_sq, window).clip(min=0) / window)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            values = np.where(downside > 0, mean / downside, np.nan) * np.sqrt(TRADING_DAYS)
+        return self._frame(values)
+
+    def _compute_volatility(self, window):
+        _, std = self._moments(window)
+        return self._frame(std * np.sqrt(TRADING_DAYS))
+
+    def _compute_drawdown(self, window):
+        # Drawdown from the highest wealth seen within the trailing window
+        if self._wealth is None:
+            self._wealth = pd.DataFrame(np.cumprod(1 + self._values, axis=0),
+                                        index=self.index, columns=self.columns)
+        peak = self._wealth.rolling(window, min_periods=window).max()
+        return self._wealth / peak - 1
+
+    def sharpe(self, window=252):
+        """
+        Rolling annualized Sharpe ratio.
+
+        Args:
+            window: Rolling window in trading days
+
+        Returns:
+            DataFrame (dates x strategies), NaN until the window is full
+        """
+        return self._get('sharpe', window)
+
+    def sortino(self, window=252):
+        """
+        Rolling annualized Sortino ratio (downside deviation around zero).
+
+        Args:
+            window: Rolling window in trading days
+
+        Returns:
+            DataFrame (dates x strategies), NaN until the window is full
+        """
+        return self._get('sortino', window)
+
+    def volatility(self, window=252):
+        """
+        Rolling annualized volatility.
+
+        Args:
+            window: Rolling window in trading days
+
+        Returns:
+            DataFrame (dates x strategies), NaN until the window is full
+        """
+        return self._get('volatility', window)
+
+    def drawdown(self, window=252):
+        """
+        Drawdown from the trailing-window peak of cumulative wealth.
+
+        Args:
+            window: Rolling window in trading days
+
+        Returns:
+            DataFrame (dates x strategies) of non-positive values
+        """
+        return self._get('drawdown', window)
+
+    @profiled('backtest.rolling_stats')
+    def compute(self, windows=DEFAULT_WINDOWS, statistics=STATISTICS):
+        """
+        Compute several statistics for several windows.
+
+        Args:
+            windows: Rolling windows in trading days
+            statistics: Names from STATISTICS
+
+        Returns:
+            DataFrame with (statistic, window, strategy) column levels
+        """
+        frames = {}
+        for statistic in statistics:
+            if statistic not in STATISTICS:
+                raise ValueError(f"Unknown statistic '{statistic}'. Choose from: {', '.join(STATISTICS)}")
+            for window in windows:
+                frames[(statistic, window)] = self._get(statistic, window)
+        return pd.concat(frames, axis=1, names=['statistic', 'window', 'strategy'])
@@ -0,0 +1,145 @@
+"""
+Selection Module
+Partition-based quantile selection on whole score matrices.
+
+Long/short legs and quantile buckets only need to know, for each name,
+whether its rank in the cross-section is above a few cut points. Instead
+of ranking every name with a full sort (O(n log n) per cross-section),
+the cut-point values are found with one ``np.partition`` call over the
+whole (... x ticker) array, which is O(n) per cross-section. Each name is
+then compared with those values.
+
+NaN marks names that cannot be held; they are never selected. Ties are
+broken by column order, exactly as a stable sort would: among equal scores
+the earlier column ranks lower.
+"""
+
+import numpy as np
+
+
+def _ranks_at_least(values, valid, n_valid, cuts):
+    """
+    Test ``stable_rank >= cut`` for several cut points with one partition.
+
+    Args:
+        values: Float array (..., n_tickers); NaN sorts last
+        valid: ~isnan(values)
+        n_valid: Valid names per cross-section, shape (..., 1)
+        cuts: List of integer arrays shaped like ``n_valid`` (rank cut points)
+
+    Returns:
+        List of boolean arrays shaped like ``values``, one per cut
+    """
+    shape = values.shape
+    n = shape[-1]
+    if n == 0 or values.size == 0:
+        # No names (or no cross-sections): nothing clears any cut
+        return [np.zeros(shape, dtype=bool) for _ in cuts]
+    # Work on a 2-D (cross-section x ticker) view
+    values = values.reshape(-1, n)
+    valid = valid.reshape(-1, n)
+    n_valid = n_valid.reshape(-1, 1)
+    cuts = [cut.reshape(-1, 1) for cut in cuts]
+
+    clipped = [np.clip(cut, 0, n - 1) for cut in cuts]
+    kth = np.unique(np.concatenate([c.ravel() for c in clipped]))
+    partitioned = np.partition(values, kth, axis=-1)
+
+    masks = []
+    for cut, position in zip(cuts, clipped):
+        # The value that sits at rank ``cut``: names above it qualify, and so do
+        # tied names whose column order puts their stable rank at or past the cut
+        pivot = np.take_along_axis(partitioned, position, axis=-1)
+        tied = values == pivot
+        below = (values < pivot).sum(axis=-1, keepdims=True)
+        mask = values > pivot
+
+        # Usually the pivot is the only name with its score. Elsewhere, rank the
+        # tied names by column order: nonzero lists them row by row, left to right
+        has_ties = tied.sum(axis=-1) > 1
+        mask |= tied & ~has_ties[:, None] & (below >= cut)
+        if has_ties.any():
+            row, col = np.nonzero(tied & has_ties[:, None])
+            tie_rank = np.arange(len(row)) - np.searchsorted(row, row)
+            keep = below[row, 0] + tie_rank >= cut[row, 0]
+            mask[row[keep], col[keep]] = True
+        masks.append((mask & valid & (cut < n_valid)).reshape(shape))
+    return masks
+
+
+def quantile_masks(scores, top_pct, bottom_pct):
+    """
+    Build long/short membership masks for a batch of cross-sections.
+
+    The long leg is the top ``int(n_valid * top_pct)`` names and the short leg
+    the bottom ``int(n_valid * bottom_pct)`` (at least one each); cross-sections
+    with fewer than two valid names hold nothing.
+
+    Args:
+        scores: Array (..., n_tickers); NaN marks names that cannot be held
+        top_pct: Fraction of valid names held long
+        bottom_pct: Fraction of valid names held short
+
+    Returns:
+        Tuple of boolean arrays (long_mask, short_mask) shaped like ``scores``
+    """
+    values = np.asarray(scores, dtype=float)
+    valid = ~np.isnan(values)
+    n_valid = valid.sum(axis=-1, keepdims=True)
+
+    n_long = np.maximum((n_valid * top_pct).astype(int), 1)
+    n_short = np.maximum((n_valid * bottom_pct).astype(int), 1)
+    enough = n_valid >= 2
+
+    long_mask, not_short = _ranks_at_least(values, valid, n_valid, [n_valid - n_long, n_short])
+    return long_mask & enough, valid & ~not_short & enough
+
+
+def _bucket_dtype(n_buckets):
+    """Smallest signed integer type holding bucket numbers and -1."""
+    return np.min_scalar_type(-max(n_buckets, 1))
+
+
+def quantile_buckets(scores, n_buckets=5):
+    """
+    Assign every name to a cross-sectional quantile bucket.
+
+    Bucket ``b`` holds stable ranks ``floor(b * n_valid / n_buckets)`` up to
+    (excluding) ``floor((b + 1) * n_valid / n_buckets)``, so bucket 0 has the
+    lowest scores and ``n_buckets - 1`` the highest (e.g. quintiles with 5,
+    deciles with 10).
+
+    Args:
+        scores: Array (..., n_tickers); NaN marks names left out
+        n_buckets: Number of buckets
+
+    Returns:
+        Integer array shaped like ``scores`` (int8 up to 128 buckets, wider
+        beyond): bucket number, or -1 for NaN
+    """
+    values = np.asarray(scores, dtype=float)
+    valid = ~np.isnan(values)
+    n_valid = valid.sum(axis=-1, keepdims=True)
+
+    cuts = [(n_valid * b) // n_buckets for b in range(1, n_buckets)]
+    buckets = np.zeros(values.shape, dtype=_bucket_dtype(n_buckets))
+    if cuts:
+        for mask in _ranks_at_least(values, valid, n_valid, cuts):
+            buckets += mask
+    buckets[~valid] = -1
+    return buckets
+
+
+def bucket_masks(scores, n_buckets=5):
+    """
+    Membership masks for every quantile bucket.
+
+    Args:
+        scores: Array (..., n_tickers); NaN marks names left out
+        n_buckets: Number of buckets
+
+    Returns:
+        Boolean array (n_buckets, ..., n_tickers), lowest bucket first
+    """
+    buckets = quantile_buckets(scores, n_buckets)
+    return buckets[None] == np.arange(n_buckets, dtype=buckets.dtype).reshape((-1,) + (1,) * buckets.ndim)
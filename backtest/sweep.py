@@ -0,0 +1,142 @@
+"""
+Parameter Sweep Module
+Evaluate the momentum long-short strategy over a grid of parameters in parallel.
+
+The grid spans long/short percentiles, rebalance frequencies and momentum
+lookbacks. The price panel is written once to a memory-mapped panel store
+(see ``data.panel_store``) that every worker opens read-only, so it is never
+pickled per task and all workers share one copy. Workers are spawned rather
+than forked, since the sweep runs inside the threaded Streamlit server.
+"""
+
+import itertools
+import multiprocessing
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from backtest.batch import BatchBacktester, _as_fraction, calculate_metrics_matrix
+from data.panel import PricePanel
+from data.panel_store import open_panel, write_panel
+from factors.array_factors import momentum_scores
+
+
+# Per-worker state set up once by _init_worker
+_WORKER_PANEL = None
+
+
+def _init_worker(panel_path):
+    """Open the shared price panel in a worker process."""
+    global _WORKER_PANEL
+    _WORKER_PANEL = open_panel(panel_path)
+
+
+def _evaluate_cell_group(lookback_months, skip_months, rebalance_freq, percentiles):
+    """
+    Evaluate every percentile for one (lookback, frequency) pair.
+
+    Momentum scores and the engine are built once per group; only the
+    percentile changes between runs.
+    """
+    panel = _WORKER_PANEL
+    # Scores straight from the shared array, already aligned to the panel's rows and columns
+    stacked = momentum_scores(panel.to_numpy(), lookback_months, skip_months)[None]
+
+    engine = BatchBacktester(stacked, panel, ['momentum'], rebalance_freq=rebalance_freq)
+
+    rows = []
+    for pct in percentiles:
+        engine.top_pct = engine.bottom_pct = _as_fraction(pct)
+        returns = engine.run_backtest()
+        row = {
+            'lookback_months': lookback_months,
+            'rebalance_freq': rebalance_freq,
+            'percentile': pct
+        }
+        if returns.empty:
+            row.update({'sharpe_ratio': np.nan, 'max_drawdown': np.nan, 'total_return': np.nan})
+        else:
+            metrics = calculate_metrics_matrix(returns.to_numpy())
+            row.update({
+                'sharpe_ratio': float(metrics['sharpe_ratio'][0]),
+                'max_drawdown': float(metrics['max_drawdown'][0]),
+                'total_return': float(metrics['total_return'][0])
+            })
+        rows.append(row)
+    return rows
+
+
+def run_parameter_sweep(price_data, percentiles=(10, 15, 20, 25, 30),
+                        rebalance_freqs=('monthly', 'quarterly'),
+                        lookbacks=(3, 6, 9, 12), skip_months=1, max_workers=None):
+    """
+    Run the momentum long-short backtest over a parameter grid.
+
+    Args:
+        price_data: DataFrame of prices (dates x tickers) or a PricePanel
+        percentiles: Long/short percentiles to test (same for both legs)
+        rebalance_freqs: Rebalance frequencies to test
+        lookbacks: Momentum lookbacks in months
+        skip_months: Most recent months skipped by the momentum signal
+        max_workers: Worker processes (default: CPU count; 1 runs in-process)
+
+    Returns:
+        DataFrame with one row per grid cell and columns lookback_months,
+        rebalance_freq, percentile, sharpe_ratio, max_drawdown, total_return
+    """
+    global _WORKER_PANEL
+
+    groups = list(itertools.product(lookbacks, rebalance_freqs))
+    max_workers = max_workers or os.cpu_count() or 1
+    max_workers = min(max_workers, len(groups))
+
+    panel = price_data if isinstance(price_data, PricePanel) else PricePanel.from_frame(price_data, dtype=np.float64)
+
+    if max_workers <= 1:
+        _WORKER_PANEL = panel
+        try:
+            rows = [_evaluate_cell_group(lb, skip_months, freq, percentiles) for lb, freq in groups]
+        finally:
+            _WORKER_PANEL = None
+    else:
+        tmp_dir = tempfile.mkdtemp(prefix="fmv_sweep_")
+        try:
+            panel_path = os.path.join(tmp_dir, "prices")
+            write_panel(panel, panel_path)
+            del panel
+
+            with ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_worker,
+                initargs=(panel_path,)
+            ) as executor:
+                futures = [
+                    executor.submit(_evaluate_cell_group, lb, skip_months, freq, list(percentiles))
+                    for lb, freq in groups
+                ]
+                rows = [future.result() for future in futures]
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    return pd.DataFrame([row for group in rows for row in group])
+
+
+def sweep_surface(sweep_results, metric='sharpe_ratio', rebalance_freq='monthly'):
+    """
+    Pivot sweep results into a (lookback x percentile) surface.
+
+    Args:
+        sweep_results: Output of ``run_parameter_sweep``
+        metric: Metric column to pivot
+        rebalance_freq: Frequency slice to show
+
+    Returns:
+        DataFrame with lookbacks as index and percentiles as columns
+    """
+    subset = sweep_results[sweep_results['rebalance_freq'] == rebalance_freq]
+    return subset.pivot(index='lookback_months', columns='percentile', values=metric).sort_index()
@@ -0,0 +1,137 @@
+"""
+Walk-Forward Module
+Out-of-sample evaluation of factor strategies over train/test folds.
+
+Scores are point-in-time (a rebalance only uses data up to its own date),
+so the daily returns of one backtest over the whole range are exactly the
+returns each fold would see. Folds are therefore slices of that single
+return matrix: nothing is recomputed per fold, and 40 folds cost a few
+metric evaluations on top of one backtest.
+
+In every fold the strategy with the best training-window metric is
+selected and held through the test window. Its stitched test returns are
+a genuinely out-of-sample track record, reported next to each factor's
+own stitched returns. Folds where the metric is undefined (NaN) for every
+strategy cannot select anything and are left out of the stitched returns.
+"""
+
+import numpy as np
+import pandas as pd
+
+from backtest.batch import calculate_metrics_matrix
+from utils.profiler import profiled
+
+
+SELECTED = 'selected'
+
+
+def walk_forward_folds(n_obs, n_folds=10, train_days=252, expanding=False):
+    """
+    Split a series into consecutive test windows, each preceded by a training window.
+
+    Args:
+        n_obs: Number of observations (trading days)
+        n_folds: Number of test windows
+        train_days: Length of the first training window (every training
+            window in rolling mode)
+        expanding: Grow the training window from the start of the series
+            instead of rolling it forward
+
+    Returns:
+        List of (train_start, train_end, test_start, test_end) positions,
+        end-exclusive
+    """
+    test_days = (n_obs - train_days) // n_folds if n_folds > 0 else 0
+    if test_days < 1:
+        raise ValueError(
+            f"{n_obs} days cannot hold a {train_days}-day training window and {n_folds} test windows; "
+            f"use fewer folds or a shorter training window"
+        )
+
+    folds = []
+    for k in range(n_folds):
+        test_start = train_days + k * test_days
+        test_end = n_obs if k == n_folds - 1 else test_start + test_days
+        train_start = 0 if expanding else test_start - train_days
+        folds.append((train_start, test_start, test_start, test_end))
+    return folds
+
+
+@profiled('backtest.walk_forward')
+def walk_forward(returns, n_folds=10, train_days=252, expanding=False, metric='sharpe_ratio'):
+    """
+    Walk-forward evaluation of strategy returns.
+
+    Args:
+        returns: DataFrame of daily returns (dates x strategies), e.g.
+            ``BatchBacktester.portfolio_returns``
+        n_folds: Number of test windows
+        train_days: Training window length in trading days (first window in
+            expanding mode)
+        expanding: Use expanding instead of rolling training windows
+        metric: Training-window metric used to select a strategy per fold
+            (any ``calculate_metrics_matrix`` key; higher is better)
+
+    Returns:
+        Dictionary with:
+            'folds': DataFrame, one row per fold and strategy, with the window
+                dates and train/test Sharpe ratio, total return and max drawdown
+            'selection': Series of the strategy selected in each fold
+                (skipped folds are left out)
+            'skipped': List of folds skipped because ``metric`` was NaN for
+                every strategy in the training window
+            'returns': Stitched out-of-sample daily returns of the folds that
+                were not skipped, one column per strategy plus 'selected'
+            'metrics': Metrics of the stitched returns (strategies x metrics)
+
+    Raises:
+        ValueError: If the folds do not fit, or every fold is skipped
+    """
+    returns = returns.dropna(how='all').fillna(0.0)
+    values = returns.to_numpy(dtype=float)
+    names = list(returns.columns)
+    folds = walk_forward_folds(len(values), n_folds, train_days, expanding)
+
+    rows = []
+    selection = {}
+    skipped = []
+    pieces = []
+    piece_rows = []
+    for k, (train_start, train_end, test_start, test_end) in enumerate(folds):
+        train = calculate_metrics_matrix(values[train_start:train_end])
+        test = calculate_metrics_matrix(values[test_start:test_end])
+        if np.isnan(train[metric]).all():
+            skipped.append(k + 1)
+            best = None
+        else:
+            best = int(np.nanargmax(train[metric]))
+            selection[k + 1] = names[best]
+            pieces.append(np.column_stack([values[test_start:test_end], values[test_start:test_end, best]]))
+            piece_rows.append(np.arange(test_start, test_end))
+
+        for i, name in enumerate(names):
+            rows.append({
+                'fold': k + 1,
+                'strategy': name,
+                'train_start': returns.index[train_start],
+                'test_start': returns.index[test_start],
+                'test_end': returns.index[test_end - 1],
+                'train_sharpe': train['sharpe_ratio'][i],
+                'test_sharpe': test['sharpe_ratio'][i],
+                'test_total_return': test['total_return'][i],
+                'test_max_drawdown': test['max_drawdown'][i],
+                'selected': i == best
+            })
+
+    if not pieces:
+        raise ValueError(f"Training-window {metric} is undefined for every strategy in every fold")
+
+    oos_index = returns.index[np.concatenate(piece_rows)]
+    oos = pd.DataFrame(np.concatenate(pieces), index=oos_index, columns=names + [SELECTED])
+    return {
+        'folds': pd.DataFrame(rows),
+        'selection': pd.Series(selection, dtype=object).rename_axis('fold'),
+        'skipped': skipped,
+        'returns': oos,
+        'metrics': pd.DataFrame(calculate_metrics_matrix(oos.to_numpy()), index=oos.columns)
+    }
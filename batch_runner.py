@@ -0,0 +1,43 @@
+"""
+Batch Runner
+Run the Factor Momentum Visualizer pipeline headlessly over a list of
+configurations (see backtest/pipeline.py for the config keys).
+
+Usage:
+    python batch_runner.py configs/example_batch.json --output results/
+    python batch_runner.py nightly.yaml --output results/ --workers 8
+    FMV_DATA_PROVIDER=synthetic python batch_runner.py configs/example_batch.json
+"""
+
+import argparse
+import sys
+
+from backtest.pipeline import load_configs, run_batch
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run factor backtests for a list of configurations")
+    parser.add_argument('config', help="JSON or YAML file with the configurations")
+    parser.add_argument('--output', default='batch_results', help="Output directory")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument('--provider', default=None, help="Data provider: yahoo or synthetic")
+    parser.add_argument('--cache-dir', default=None, help="Shared price cache directory")
+    args = parser.parse_args(argv)
+
+    configs = load_configs(args.config)
+    if not configs:
+        print(f"No configurations in {args.config}")
+        return 1
+
+    metrics, summary = run_batch(
+        configs,
+        args.output,
+        max_workers=args.workers,
+        provider=args.provider,
+        cache_dir=args.cache_dir
+    )
+    return 1 if summary['failed'] == summary['configs'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,128 @@
+"""
+Import Budget
+Cold-start import time of app.py, with a budget that fails on regressions.
+
+The top-level imports of app.py are what every page load pays before the
+welcome screen appears. This script runs them in fresh interpreters and
+reports the best time of several runs, after subtracting the cost of
+``import streamlit`` alone (the project does not control that part). It also
+lists heavy modules the app imports up front.
+
+Usage:
+    python benchmarks/import_budget.py
+    python benchmarks/import_budget.py --budget 0.25 --repeat 7
+
+Exits with status 1 when the app's own import time is over budget or a heavy
+module is imported at startup.
+"""
+
+import argparse
+import ast
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP = os.path.join(ROOT, "app.py")
+HEAVY_MODULES = ("pandas", "numpy", "plotly", "pyarrow", "yfinance", "scipy", "sklearn")
+
+# Runs in a fresh interpreter: time the given import statements and list
+# which heavy modules ended up in sys.modules
+_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+exec(compile(sys.argv[1], "<imports>", "exec"), {})
+seconds = time.perf_counter() - started
+heavy = sorted(name for name in json.loads(sys.argv[2]) if name in sys.modules)
+print(json.dumps({"seconds": seconds, "heavy": heavy}))
+"""
+
+
+def top_level_imports(path=APP):
+    """
+    Source of the module-level import statements of a script.
+
+    Imports nested in functions or ``if`` blocks are deferred and excluded.
+
+    Args:
+        path: Python file to parse
+
+    Returns:
+        List of import statements as source strings
+    """
+    with open(path) as f:
+        source = f.read()
+    return [
+        ast.get_source_segment(source, node)
+        for node in ast.parse(source).body
+        if isinstance(node, (ast.Import, ast.ImportFrom))
+    ]
+
+
+def _has_module(name):
+    """Whether a top-level module can be found without importing it."""
+    return importlib.util.find_spec(name) is not None
+
+
+def measure(statements, repeat=5):
+    """
+    Time import statements in fresh interpreters.
+
+    Args:
+        statements: List of import statements
+        repeat: Number of interpreters to start
+
+    Returns:
+        Dictionary with the best 'seconds' and the 'heavy' modules loaded
+    """
+    runs = []
+    for _ in range(repeat):
+        result = subprocess.run(
+            [sys.executable, "-c", _PROBE, "\n".join(statements), json.dumps(HEAVY_MODULES)],
+            cwd=ROOT, capture_output=True, text=True
+        )
+        if result.returncode != 0:
+            raise RuntimeError(f"Import failed: {result.stderr.strip().splitlines()[-1]}")
+        runs.append(json.loads(result.stdout.strip().splitlines()[-1]))
+    return {'seconds': min(run['seconds'] for run in runs), 'heavy': runs[0]['heavy']}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget", type=float, default=0.25,
+                        help="Allowed import time of app.py beyond streamlit, in seconds (default 0.25)")
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters per measurement (default 5)")
+    args = parser.parse_args()
+
+    statements = top_level_imports()
+    framework = ["import streamlit"]
+    if not _has_module("streamlit"):
+        print("streamlit is not installed; measuring the app's own imports only")
+        statements = [s for s in statements if "streamlit" not in s]
+        framework = []
+
+    baseline = measure(framework, args.repeat)
+    app = measure(statements, args.repeat)
+    app_seconds = max(app['seconds'] - baseline['seconds'], 0.0)
+    heavy = sorted(set(app['heavy']) - set(baseline['heavy']))
+
+    print(f"{'Statement count':<24}{len(statements)}")
+    print(f"{'Baseline (streamlit)' if framework else 'Baseline':<24}{baseline['seconds'] * 1000:8.1f} ms")
+    print(f"{'app.py (own imports)':<24}{app_seconds * 1000:8.1f} ms  (budget {args.budget * 1000:.0f} ms)")
+    print(f"{'Heavy modules at start':<24}{', '.join(heavy) or 'none'}")
+
+    failures = []
+    if app_seconds > args.budget:
+        failures.append(f"import time {app_seconds * 1000:.0f} ms is over the {args.budget * 1000:.0f} ms budget")
+    if heavy:
+        failures.append(f"heavy modules imported at startup: {', '.join(heavy)}")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
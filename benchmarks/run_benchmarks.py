@@ -0,0 +1,356 @@
+"""
+Pipeline Benchmarks
+Time and peak memory for each stage of the app.py pipeline on fixed-seed
+synthetic data, with JSON baselines and regression checks.
+
+Usage:
+    python benchmarks/run_benchmarks.py                       # small + medium scales
+    python benchmarks/run_benchmarks.py --scales all          # include 3000 x 25y
+    python benchmarks/run_benchmarks.py --save-baseline       # record a baseline
+    python benchmarks/run_benchmarks.py --check --threshold 0.25
+
+``--check`` exits with status 1 when any stage is slower than its baseline
+by more than the threshold (default 25%).
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data.synthetic import SyntheticDataFetcher  # noqa: E402
+
+
+SCALES = {
+    'small': (50, 3),
+    'medium': (500, 10),
+    'large': (3000, 25)
+}
+FACTORS = ["Momentum", "Value", "Size", "Quality"]
+SEED = 7
+END_DATE = "2024-12-31"
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+
+class StageSkipped(Exception):
+    """Raised when a stage's module is not importable in this environment."""
+
+
+def _import(module, name):
+    try:
+        return getattr(__import__(module, fromlist=[name]), name)
+    except ImportError as e:
+        raise StageSkipped(f"{module}.{name} unavailable ({e})")
+
+
+def load_dataset(n_tickers, years):
+    """Generate the fixed-seed price panel and fundamentals for one scale."""
+    fetcher = SyntheticDataFetcher(seed=SEED, universe_size=max(n_tickers * 2, 1000))
+    tickers = fetcher.constituents[:n_tickers]
+    start = (pd.Timestamp(END_DATE) - pd.DateOffset(years=years)).strftime('%Y-%m-%d')
+    price_data = fetcher.fetch_data(tickers, start, END_DATE)
+    fundamental_data = fetcher.fetch_fundamentals(list(price_data.columns))
+    return price_data, fundamental_data
+
+
+def _factor_scores(ctx):
+    """FactorCalculator output, falling back to the array factors in the same format."""
+    if 'factor_scores' not in ctx:
+        try:
+            calculator_cls = _import('factors.factor_calculator', 'FactorCalculator')
+            ctx['factor_scores'] = calculator_cls(ctx['price_data'], ctx['fundamental_data']) \
+                .calculate_all_factors(FACTORS)
+        except StageSkipped:
+            from data.panel import PricePanel
+            from factors.array_factors import calculate_factor_stack, stack_to_frame
+            names = [f.lower() for f in FACTORS]
+            panel = PricePanel.from_frame(ctx['price_data'])
+            stack = calculate_factor_stack(panel, names, ctx['fundamental_data'])
+            ctx['factor_scores'] = stack_to_frame(stack, panel.index, panel.columns, names)
+    return ctx['factor_scores']
+
+
+def _backtesters(ctx, run=False):
+    backtester_cls = _import('backtest.backtester', 'Backtester')
+    backtesters = [
+        backtester_cls(
+            factor_scores=_factor_scores(ctx),
+            price_data=ctx['price_data'],
+            factor_name=factor.lower(),
+            top_pct=20,
+            bottom_pct=20,
+            rebalance_freq='monthly'
+        )
+        for factor in FACTORS
+    ]
+    if run:
+        for backtester in backtesters:
+            backtester.run_backtest()
+    return backtesters
+
+
+def _returns_dict(ctx):
+    if 'returns_dict' not in ctx:
+        from backtest.batch import BatchBacktester
+        engine = BatchBacktester.from_factor_scores(
+            _factor_scores(ctx), ctx['price_data'], [f.lower() for f in FACTORS]
+        )
+        returns = engine.run_backtest()
+        ctx['returns_dict'] = {factor: returns[factor.lower()] for factor in FACTORS}
+    return ctx['returns_dict']
+
+
+# Each stage takes the shared context and returns the zero-argument callable to time
+def stage_calculate_all_factors(ctx):
+    calculator_cls = _import('factors.factor_calculator', 'FactorCalculator')
+    return lambda: calculator_cls(ctx['price_data'], ctx['fundamental_data']).calculate_all_factors(FACTORS)
+
+
+def stage_array_factors(ctx):
+    from data.panel import PricePanel
+    from factors.array_factors import calculate_factor_stack
+    names = [f.lower() for f in FACTORS]
+    return lambda: calculate_factor_stack(PricePanel.from_frame(ctx['price_data']), names, ctx['fundamental_data'])
+
+
+def stage_run_backtest(ctx):
+    backtesters = _backtesters(ctx)
+    return lambda: [b.run_backtest() for b in backtesters]
+
+
+def stage_calculate_metrics(ctx):
+    backtesters = _backtesters(ctx, run=True)
+    return lambda: [b.calculate_metrics() for b in backtesters]
+
+
+def stage_calculate_rolling_sharpe(ctx):
+    backtesters = _backtesters(ctx, run=True)
+    return lambda: [b.calculate_rolling_sharpe(window=252) for b in backtesters]
+
+
+def stage_rolling_stats(ctx):
+    from backtest.rolling import RollingStats
+    returns = pd.DataFrame(_returns_dict(ctx))
+    return lambda: RollingStats(returns).compute()
+
+
+def stage_batch_backtest(ctx):
+    from backtest.batch import BatchBacktester
+    scores = _factor_scores(ctx)
+    names = [f.lower() for f in FACTORS]
+
+    def run():
+        engine = BatchBacktester.from_factor_scores(scores, ctx['price_data'], names)
+        engine.run_backtest()
+        return engine.calculate_metrics()
+    return run
+
+
+def stage_composites(ctx):
+    from factors.composite import backtest_composites
+    scores = _factor_scores(ctx)
+    names = [f.lower() for f in FACTORS]
+
+    def run():
+        engine, _ = backtest_composites(scores, ctx['price_data'], names, step=0.1)
+        engine.run_backtest()
+        return engine.calculate_metrics()
+    return run
+
+
+def stage_bootstrap(ctx):
+    from backtest.bootstrap import bootstrap_metrics
+    returns = pd.DataFrame(_returns_dict(ctx))
+    return lambda: bootstrap_metrics(returns, n_resamples=10000, seed=0)
+
+
+def stage_walk_forward(ctx):
+    from backtest.walk_forward import walk_forward
+    returns = pd.DataFrame(_returns_dict(ctx))
+    return lambda: walk_forward(returns, n_folds=40, train_days=126)
+
+
+def stage_run_long_short(ctx):
+    engine_cls = _import('backtest.engine', 'FactorBacktest')
+    momentum = _factor_scores(ctx)['momentum_score'].unstack(level=-1)
+    return lambda: engine_cls(rebalance_frequency='M').run_long_short(
+        momentum, ctx['price_data'], top_pct=0.2, bottom_pct=0.2
+    )
+
+
+def stage_create_performance_chart(ctx):
+    create = _import('plots.visualizations', 'create_performance_chart')
+    returns_dict = _returns_dict(ctx)
+    return lambda: create(returns_dict, None)
+
+
+def stage_create_drawdown_chart(ctx):
+    create = _import('plots.visualizations', 'create_drawdown_chart')
+    returns_dict = _returns_dict(ctx)
+    return lambda: create(returns_dict)
+
+
+def stage_create_correlation_heatmap(ctx):
+    create = _import('plots.visualizations', 'create_correlation_heatmap')
+    returns_df = pd.DataFrame(_returns_dict(ctx))
+    return lambda: create(returns_df, title="Factor Returns Correlation")
+
+
+def stage_create_factor_scatter(ctx):
+    create = _import('plots.visualizations', 'create_factor_scatter')
+    scores = _factor_scores(ctx)
+    return lambda: create(factor_scores=scores, price_data=ctx['price_data'], factor_name='momentum')
+
+
+STAGES = [
+    ('factors.calculate_all_factors', stage_calculate_all_factors),
+    ('factors.array_factor_stack', stage_array_factors),
+    ('backtest.run_backtest', stage_run_backtest),
+    ('backtest.calculate_metrics', stage_calculate_metrics),
+    ('backtest.calculate_rolling_sharpe', stage_calculate_rolling_sharpe),
+    ('backtest.rolling_stats', stage_rolling_stats),
+    ('backtest.batch_backtest', stage_batch_backtest),
+    ('factors.composites', stage_composites),
+    ('backtest.bootstrap', stage_bootstrap),
+    ('backtest.walk_forward', stage_walk_forward),
+    ('engine.run_long_short', stage_run_long_short),
+    ('plots.create_performance_chart', stage_create_performance_chart),
+    ('plots.create_drawdown_chart', stage_create_drawdown_chart),
+    ('plots.create_correlation_heatmap', stage_create_correlation_heatmap),
+    ('plots.create_factor_scatter', stage_create_factor_scatter)
+]
+
+
+def measure(fn, repeat):
+    """
+    Time a callable and record its peak traced memory.
+
+    Returns:
+        Tuple of (best wall time in seconds, peak allocated bytes)
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return min(times), peak
+
+
+def run_benchmarks(scales, repeat=3, stage_filter=None):
+    """
+    Run every stage at every scale.
+
+    Args:
+        scales: Scale names from SCALES
+        repeat: Timed repetitions per stage (best is reported)
+        stage_filter: Optional substring; only matching stages run
+
+    Returns:
+        Dictionary keyed by "<scale>/<stage>" with seconds, peak_mb and status
+    """
+    results = {}
+    for scale in scales:
+        n_tickers, years = SCALES[scale]
+        price_data, fundamental_data = load_dataset(n_tickers, years)
+        ctx = {'price_data': price_data, 'fundamental_data': fundamental_data}
+        print(f"\n[{scale}] {price_data.shape[1]} tickers x {price_data.shape[0]} days")
+
+        for name, stage in STAGES:
+            if stage_filter and stage_filter not in name:
+                continue
+            key = f"{scale}/{name}"
+            try:
+                seconds, peak = measure(stage(ctx), repeat)
+            except StageSkipped as e:
+                results[key] = {'status': 'skipped', 'reason': str(e)}
+                print(f"  {name:<40} skipped: {e}")
+                continue
+            results[key] = {'status': 'ok', 'seconds': seconds, 'peak_mb': peak / 1e6}
+            print(f"  {name:<40} {seconds * 1000:>10.1f} ms {peak / 1e6:>10.1f} MB")
+    return results
+
+
+def compare_to_baseline(results, baseline, threshold):
+    """
+    Find stages that regressed past the threshold.
+
+    Returns:
+        List of (key, baseline seconds, current seconds) tuples
+    """
+    regressions = []
+    for key, current in results.items():
+        base = baseline.get('results', {}).get(key)
+        if current.get('status') != 'ok' or not base or base.get('status') != 'ok':
+            continue
+        if current['seconds'] > base['seconds'] * (1 + threshold):
+            regressions.append((key, base['seconds'], current['seconds']))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the factor pipeline stages")
+    parser.add_argument('--scales', default='small,medium',
+                        help="Comma-separated scales (small, medium, large) or 'all'")
+    parser.add_argument('--repeat', type=int, default=3, help="Timed repetitions per stage")
+    parser.add_argument('--stage', default=None, help="Only run stages containing this text")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="Baseline JSON path")
+    parser.add_argument('--save-baseline', action='store_true', help="Write results as the new baseline")
+    parser.add_argument('--check', action='store_true', help="Fail on regressions against the baseline")
+    parser.add_argument('--threshold', type=float, default=0.25, help="Allowed slowdown (0.25 = 25%%)")
+    parser.add_argument('--output', default=None, help="Also write results to this JSON path")
+    args = parser.parse_args(argv)
+
+    scales = list(SCALES) if args.scales == 'all' else args.scales.split(',')
+    results = run_benchmarks(scales, repeat=args.repeat, stage_filter=args.stage)
+
+    report = {
+        'created': pd.Timestamp.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'results': results
+    }
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nBaseline written to {args.baseline}")
+
+    if args.check:
+        if not os.path.exists(args.baseline):
+            print(f"\nNo baseline at {args.baseline}; run with --save-baseline first")
+            return 1
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n❌ {len(regressions)} stage(s) regressed by more than {args.threshold:.0%}:")
+            for key, base, current in regressions:
+                print(f"  {key:<50} {base * 1000:.1f} ms -> {current * 1000:.1f} ms ({current / base - 1:+.0%})")
+            return 1
+        print(f"\n✅ No stage regressed by more than {args.threshold:.0%}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
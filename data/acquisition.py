@@ -0,0 +1,215 @@
+"""
+Acquisition Module
+Overlapped fetching of prices, fundamentals and benchmark data.
+
+``DataAcquisition`` starts every fetch as soon as it is requested and
+returns immediately. Prices are downloaded in one batched request on a
+price lane (the benchmark is queued on the same lane); fundamentals run on
+their own lane with per-ticker progress. Callers collect each result when they need
+it, so work that only needs prices can run while fundamentals are still
+downloading, and total wait approaches the slowest fetch rather than the
+sum of all of them.
+
+Results are collected by polling (``result(name, on_progress)``) so
+progress can be drawn from the calling thread; Streamlit elements cannot
+be updated from worker threads. Work is submitted with a copy of the
+caller's context, so profiler stages inside the fetches are still recorded.
+"""
+
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import pandas as pd
+
+
+class DataAcquisition:
+    """
+    Concurrent acquisition of the data for one analysis run.
+    """
+
+    def __init__(self, fetcher, chunk_size=None, price_workers=1):
+        """
+        Initialize the acquisition.
+
+        Args:
+            fetcher: Object with the DataFetcher interface
+            chunk_size: Tickers per price request (default: all tickers in one
+                request). One request lets the price cache group missing date
+                ranges and keeps upstream calls to a minimum; set a large
+                chunk size only to get intermediate price progress.
+            price_workers: Concurrent price requests. The default of 1 keeps
+                yfinance downloads sequential, since ``yf.download`` is not
+                safe to call from several threads at once.
+        """
+        self.fetcher = fetcher
+        self.chunk_size = chunk_size
+        self._price_lane = ThreadPoolExecutor(max_workers=price_workers, thread_name_prefix="fmv-prices")
+        self._fundamentals_lane = ThreadPoolExecutor(max_workers=1, thread_name_prefix="fmv-fundamentals")
+        self._lock = threading.Lock()
+        self._tasks = {}
+
+    def _start(self, name, lane, calls, total, combine):
+        """Register a task, then submit its calls in copies of the caller's context."""
+        task = {'futures': [], 'total': total, 'done': 0, 'combine': combine}
+        with self._lock:
+            self._tasks[name] = task
+        task['futures'] = [
+            lane.submit(contextvars.copy_context().run, fn, *args) for fn, *args in calls
+        ]
+
+    def _advance(self, name, count=1):
+        with self._lock:
+            task = self._tasks[name]
+            task['done'] = min(task['done'] + count, task['total'])
+
+    def fetch_prices(self, tickers, start_date, end_date):
+        """
+        Start downloading prices.
+
+        Args:
+            tickers: List of ticker symbols
+            start_date: Start date (YYYY-MM-DD)
+            end_date: End date (YYYY-MM-DD)
+
+        Returns:
+            self
+        """
+        tickers = list(tickers)
+        size = self.chunk_size or max(len(tickers), 1)
+        chunks = [tickers[i:i + size] for i in range(0, len(tickers), size)]
+
+        def fetch_chunk(chunk):
+            prices = self.fetcher.fetch_data(chunk, start_date, end_date)
+            self._advance('prices', len(chunk))
+            return prices
+
+        def combine(frames):
+            frames = [frame for frame in frames if frame is not None and not frame.empty]
+            if not frames:
+                return pd.DataFrame()
+            prices = pd.concat(frames, axis=1).sort_index()
+            return prices[[ticker for ticker in tickers if ticker in prices.columns]]
+
+        self._start('prices', self._price_lane, [(fetch_chunk, chunk) for chunk in chunks], len(tickers), combine)
+        return self
+
+    def fetch_fundamentals(self, fundamentals_fetcher, tickers):
+        """
+        Start fetching fundamentals.
+
+        Args:
+            fundamentals_fetcher: FundamentalsFetcher instance
+            tickers: List of ticker symbols
+
+        Returns:
+            self
+        """
+        tickers = list(tickers)
+
+        def fetch():
+            result = fundamentals_fetcher.fetch(tickers, progress=lambda ticker: self._advance('fundamentals'))
+            # Cache hits complete without a progress callback
+            self._advance('fundamentals', len(tickers))
+            return result
+
+        self._start('fundamentals', self._fundamentals_lane, [(fetch,)], len(tickers), lambda results: results[0])
+        return self
+
+    def fetch_benchmark(self, ticker, start_date, end_date):
+        """
+        Queue the benchmark download on the price lane.
+
+        Args:
+            ticker: Benchmark symbol (e.g. 'SPY')
+            start_date: Start date (YYYY-MM-DD)
+            end_date: End date (YYYY-MM-DD)
+
+        Returns:
+            self
+        """
+        def fetch():
+            prices = self.fetcher.fetch_data([ticker], start_date, end_date)
+            self._advance('benchmark')
+            return prices
+
+        self._start('benchmark', self._price_lane, [(fetch,)], 1, lambda results: results[0])
+        return self
+
+    def progress(self):
+        """
+        Completion of every started fetch.
+
+        Returns:
+            Dictionary of name -> (items done, items total)
+        """
+        with self._lock:
+            return {name: (task['done'], task['total']) for name, task in self._tasks.items()}
+
+    def fraction(self):
+        """Overall completion in [0, 1], weighting each item equally."""
+        progress = self.progress()
+        total = sum(total for _, total in progress.values())
+        return sum(done for done, _ in progress.values()) / total if total else 1.0
+
+    def done(self, name):
+        """Whether a fetch has finished (successfully or not)."""
+        return all(future.done() for future in self._tasks[name]['futures'])
+
+    def result(self, name, on_progress=None, interval=0.1):
+        """
+        Wait for a fetch and return its result.
+
+        Args:
+            name: 'prices', 'fundamentals' or 'benchmark'
+            on_progress: Optional callable ``on_progress(acquisition)`` invoked
+                from the calling thread while waiting
+            interval: Seconds between progress updates
+
+        Returns:
+            The fetch result (prices DataFrame, fundamentals ``(data, failures)``
+            tuple, or benchmark DataFrame); None if the fetch was never started
+        """
+        task = self._tasks.get(name)
+        if task is None:
+            return None
+        futures = task['futures']
+        while True:
+            if on_progress is not None:
+                on_progress(self)
+            pending = wait(futures, timeout=interval if on_progress is not None else None)[1]
+            if not pending:
+                break
+        if on_progress is not None:
+            on_progress(self)
+        return task['combine']([future.result() for future in futures])
+
+    def shutdown(self):
+        """Stop the worker lanes (fetches already running are finished)."""
+        self._price_lane.shutdown(wait=False, cancel_futures=True)
+        self._fundamentals_lane.shutdown(wait=False, cancel_futures=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.shutdown()
+
+
+def describe_progress(acquisition, labels=None):
+    """
+    One-line progress summary, e.g. 'Prices 40/50 • Fundamentals 12/50 • Benchmark ✓'.
+
+    Args:
+        acquisition: DataAcquisition instance
+        labels: Optional mapping of fetch name to display label
+
+    Returns:
+        String
+    """
+    labels = labels or {}
+    parts = []
+    for name, (done, total) in acquisition.progress().items():
+        label = labels.get(name, name.title())
+        parts.append(f"{label} ✓" if done >= total else f"{label} {done}/{total}")
+    return " • ".join(parts)
@@ -0,0 +1,286 @@
+"""
+Fundamentals Module
+Concurrent, rate-limited fetching of per-ticker fundamental data.
+
+Requests run on a bounded thread pool behind a shared token-bucket rate
+limiter. Each ticker is retried with jittered exponential backoff, and
+failures are reported alongside the partial results instead of raising.
+The transport is pluggable so the fetcher can run offline against a fixture
+or a local stub server.
+
+Raw responses (e.g. ``yfinance.Ticker.info``, well over a hundred keys of
+mixed types) are mapped onto the fixed ``DataFetcher.fetch_fundamentals``
+schema that the factor code reads: one row per ticker, ``sector`` plus
+float columns, NaN where a value is missing.
+"""
+
+import json
+import math
+import random
+import threading
+import time
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from utils.profiler import profiled
+
+
+# Output columns and the info keys tried for each, in order
+FUNDAMENTAL_SCHEMA = {
+    'sector': ('sector',),
+    'currentPrice': ('currentPrice', 'regularMarketPrice', 'previousClose'),
+    'marketCap': ('marketCap',),
+    'sharesOutstanding': ('sharesOutstanding', 'impliedSharesOutstanding'),
+    'bookValue': ('bookValue',),
+    'priceToBook': ('priceToBook',),
+    'trailingPE': ('trailingPE',),
+    'returnOnEquity': ('returnOnEquity',),
+    'returnOnAssets': ('returnOnAssets',),
+    'profitMargins': ('profitMargins',),
+    'debtToEquity': ('debtToEquity',)
+}
+FUNDAMENTAL_FIELDS = tuple(FUNDAMENTAL_SCHEMA)
+TEXT_FIELDS = ('sector',)
+
+
+def _as_float(value):
+    """Finite float, or NaN for missing, non-numeric or infinite values."""
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return math.nan
+    return value if math.isfinite(value) else math.nan
+
+
+def to_schema(info, fields=FUNDAMENTAL_FIELDS):
+    """
+    Map a raw info dict onto the fundamentals schema.
+
+    Args:
+        info: Dict returned by a transport
+        fields: Output fields; names outside ``FUNDAMENTAL_SCHEMA`` are read
+            from the info key of the same name
+
+    Returns:
+        Dict of field -> value (float, or str/None for text fields)
+    """
+    record = {}
+    for field in fields:
+        value = None
+        for key in FUNDAMENTAL_SCHEMA.get(field, (field,)):
+            value = info.get(key)
+            if value is not None:
+                break
+        record[field] = value if field in TEXT_FIELDS else _as_float(value)
+    return record
+
+
+class TokenBucket:
+    """
+    Thread-safe token-bucket rate limiter.
+
+    Allows bursts of up to ``capacity`` requests and a sustained rate of
+    ``rate`` requests per second.
+    """
+
+    def __init__(self, rate=5.0, capacity=10):
+        """
+        Initialize the bucket.
+
+        Args:
+            rate: Tokens added per second (sustained requests per second)
+            capacity: Maximum number of stored tokens (burst size)
+        """
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self._tokens = float(capacity)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available, then consume it."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class YFinanceTransport:
+    """Fetch fundamentals from Yahoo Finance (``yfinance.Ticker(...).info``)."""
+
+    def __call__(self, ticker):
+        import yfinance as yf
+        return yf.Ticker(ticker).info
+
+
+class FixtureTransport:
+    """
+    Serve fundamentals from an in-memory dict or a JSON fixture file.
+
+    Tickers missing from the fixture raise KeyError, like a failed request.
+    """
+
+    def __init__(self, fixture):
+        """
+        Args:
+            fixture: Dict mapping ticker -> info dict, or path to a JSON file
+                with the same structure
+        """
+        if isinstance(fixture, str):
+            with open(fixture) as f:
+                fixture = json.load(f)
+        self.fixture = fixture
+
+    def __call__(self, ticker):
+        return dict(self.fixture[ticker])
+
+
+class HTTPTransport:
+    """
+    Fetch fundamentals as JSON from ``<base_url>/<ticker>``.
+
+    Useful for testing against a local stub server.
+    """
+
+    def __init__(self, base_url, timeout=10):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+
+    def __call__(self, ticker):
+        url = f"{self.base_url}/{urllib.parse.quote(ticker)}"
+        with urllib.request.urlopen(url, timeout=self.timeout) as response:
+            return json.loads(response.read().decode('utf-8'))
+
+
+class FundamentalsFetcher:
+    """
+    Concurrent fundamentals fetcher with rate limiting and retries.
+    """
+
+    def __init__(self, transport=None, max_workers=8, rate=5.0, burst=10,
+                 max_retries=3, backoff_base=0.5, backoff_max=8.0, fields=None, cache=None):
+        """
+        Initialize the fetcher.
+
+        Args:
+            transport: Callable ``transport(ticker) -> dict`` (default: yfinance)
+            max_workers: Maximum concurrent requests
+            rate: Sustained requests per second across all workers
+            burst: Maximum burst of requests
+            max_retries: Retries per ticker after the first attempt
+            backoff_base: Base delay in seconds for exponential backoff
+            backoff_max: Maximum backoff delay in seconds
+            fields: Output fields (default: ``FUNDAMENTAL_FIELDS``)
+            cache: SharedDataCache to serve and store results across fetchers
+                (default: no caching)
+        """
+        self.transport = transport or YFinanceTransport()
+        self.max_workers = max_workers
+        self.rate_limiter = TokenBucket(rate, burst)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.fields = tuple(fields) if fields is not None else FUNDAMENTAL_FIELDS
+        self.cache = cache
+
+    def _fetch_one(self, ticker):
+        """
+        Fetch one ticker with retries.
+
+        An empty response, or one without any numeric field, is retried like
+        an error: Yahoo answers throttled requests that way.
+
+        Returns:
+            Tuple of (schema record or None, error message or None)
+        """
+        error = None
+        for attempt in range(self.max_retries + 1):
+            if attempt > 0:
+                # Full jitter keeps retrying workers from synchronizing
+                delay = min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1))
+                time.sleep(random.uniform(0, delay))
+
+            self.rate_limiter.acquire()
+            try:
+                info = self.transport(ticker)
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+                continue
+
+            record = to_schema(info or {}, self.fields)
+            if all(field in TEXT_FIELDS or math.isnan(value) for field, value in record.items()):
+                error = "No data returned"
+                continue
+            return record, None
+
+        return None, error
+
+    def _fetch_records(self, tickers, progress=None):
+        """
+        Fetch tickers on the thread pool.
+
+        Returns:
+            Tuple of (dict of ticker -> info, dict of ticker -> error message)
+        """
+        def fetch_one(ticker):
+            result = self._fetch_one(ticker)
+            if progress is not None:
+                progress(ticker)
+            return result
+
+        records = {}
+        failures = {}
+        if tickers:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(tickers))) as executor:
+                for ticker, (info, error) in zip(tickers, executor.map(fetch_one, tickers)):
+                    if info is None:
+                        failures[ticker] = error
+                    else:
+                        records[ticker] = info
+        return records, failures
+
+    @profiled('fundamentals.fetch')
+    def fetch(self, tickers, progress=None):
+        """
+        Fetch fundamentals for a list of tickers.
+
+        Args:
+            tickers: List of ticker symbols
+            progress: Optional callable ``progress(ticker)`` invoked from a
+                worker thread as each ticker finishes (success or failure)
+
+        Returns:
+            Tuple of (DataFrame indexed by ticker, dict of ticker -> error message
+            for tickers that could not be fetched)
+        """
+        tickers = list(dict.fromkeys(tickers))
+        if self.cache is None:
+            records, failures = self._fetch_records(tickers, progress)
+        else:
+            failures = {}
+
+            def fetch_missing(missing):
+                found, errors = self._fetch_records(missing, progress)
+                failures.update(errors)
+                return found
+
+            # Cache hits skip the rate limiter; concurrent sessions share in-flight requests
+            namespace = ('fundamentals', self.fields)
+            records = self.cache.get_items(namespace, tickers, fetch_missing)
+            for ticker in tickers:
+                if ticker not in records and ticker not in failures:
+                    failures[ticker] = "Failed in a concurrent request"
+
+        data = pd.DataFrame.from_dict({ticker: records[ticker] for ticker in tickers if ticker in records},
+                                      orient='index').reindex(columns=list(self.fields))
+        data.index.name = 'ticker'
+        return data, failures
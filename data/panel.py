@@ -0,0 +1,97 @@
+"""
+Price Panel Module
+Memory-compact (date x ticker) price panel backed by one contiguous array.
+
+A PricePanel holds a single C-contiguous float32 array plus date and ticker
+indexes. It exposes the small part of the DataFrame interface the backtest
+engine needs (``index``, ``columns``, ``shape``, ``to_numpy``), so it can be
+passed wherever a price DataFrame is expected by the array-based stages.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+class PricePanel:
+    """
+    Contiguous (date x ticker) panel of prices.
+    """
+
+    def __init__(self, values, dates, tickers, dtype=np.float32):
+        """
+        Initialize the panel.
+
+        Args:
+            values: 2D array (n_dates, n_tickers)
+            dates: Sequence of dates, one per row
+            tickers: Sequence of ticker symbols, one per column
+            dtype: Storage dtype (default float32)
+        """
+        values = np.ascontiguousarray(values, dtype=dtype)
+        if values.shape != (len(dates), len(tickers)):
+            raise ValueError(
+                f"values shape {values.shape} does not match ({len(dates)}, {len(tickers)})"
+            )
+        self.values = values
+        self.index = pd.DatetimeIndex(dates)
+        self.columns = pd.Index(tickers)
+
+    @classmethod
+    def from_frame(cls, price_data, dtype=np.float32):
+        """
+        Build a panel from a price DataFrame (dates x tickers).
+
+        Args:
+            price_data: DataFrame with dates as index and tickers as columns
+            dtype: Storage dtype (default float32)
+
+        Returns:
+            PricePanel instance
+        """
+        return cls(price_data.to_numpy(dtype=dtype), price_data.index, price_data.columns, dtype=dtype)
+
+    @property
+    def shape(self):
+        return self.values.shape
+
+    @property
+    def nbytes(self):
+        """Bytes used by the price array."""
+        return self.values.nbytes
+
+    def to_numpy(self, dtype=None):
+        """
+        Return the underlying array (no copy unless a different dtype is requested).
+        """
+        if dtype is None or np.dtype(dtype) == self.values.dtype:
+            return self.values
+        return self.values.astype(dtype)
+
+    def to_frame(self):
+        """
+        Wrap the panel in a DataFrame without copying the price array.
+
+        Returns:
+            Single-block DataFrame (dates x tickers) viewing ``values``
+        """
+        return pd.DataFrame(self.values, index=self.index, columns=self.columns, copy=False)
+
+    def returns(self):
+        """
+        Simple daily returns in the panel dtype.
+
+        Returns:
+            Array (n_dates, n_tickers); the first row and missing prices are NaN
+        """
+        out = np.full_like(self.values, np.nan)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            np.divide(self.values[1:], self.values[:-1], out=out[1:])
+        out[1:] -= 1
+        return out
+
+    def __len__(self):
+        return self.values.shape[0]
+
+    def __repr__(self):
+        return (f"PricePanel({self.shape[0]} dates x {self.shape[1]} tickers, "
+                f"{self.values.dtype}, {self.nbytes / 1e6:.1f} MB)")
@@ -0,0 +1,222 @@
+"""
+Panel Store Module
+On-disk, memory-mapped price panels shared between processes.
+
+A stored panel is a directory holding three files::
+
+    values.npy     contiguous (date x ticker) float array
+    dates.npy      datetime64[ns] row index
+    tickers.json   column index
+
+``open_panel`` maps ``values.npy`` read-only, so every process that opens
+the same panel (Streamlit server processes, sweep or batch workers) shares
+one copy of the prices through the OS page cache. The returned PricePanel
+reads the mapped array directly; factor and backtest code sees it as a
+plain NumPy array.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+from data.panel import PricePanel
+
+
+_VALUES = "values.npy"
+_DATES = "dates.npy"
+_TICKERS = "tickers.json"
+
+# Stored panels are not refreshed or checked for restatements; after this many
+# seconds they are dropped and rebuilt through the price cache
+DEFAULT_TTL = 6 * 3600
+
+# Least recently used panels are removed once the store grows past this size
+DEFAULT_MAX_BYTES = 4 * 1024 ** 3
+
+
+def write_panel(panel, path):
+    """
+    Write a panel to a directory.
+
+    The files are written to a temporary directory next to ``path`` and moved
+    into place in one rename, so readers never see a partial panel. If
+    another process stored the same panel first, its copy is kept.
+
+    Args:
+        panel: PricePanel to store
+        path: Target directory
+    """
+    parent = os.path.dirname(os.path.abspath(path))
+    os.makedirs(parent, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(dir=parent, prefix=".panel_")
+    try:
+        np.save(os.path.join(tmp_dir, _VALUES), panel.values)
+        np.save(os.path.join(tmp_dir, _DATES), panel.index.values.astype('datetime64[ns]'))
+        with open(os.path.join(tmp_dir, _TICKERS), "w") as f:
+            json.dump([str(ticker) for ticker in panel.columns], f)
+        try:
+            os.rename(tmp_dir, path)
+        except OSError:
+            if not os.path.exists(os.path.join(path, _VALUES)):
+                raise
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def open_panel(path, mmap=True):
+    """
+    Open a stored panel.
+
+    Args:
+        path: Directory written by ``write_panel``
+        mmap: Map the price array read-only instead of reading it into memory
+
+    Returns:
+        PricePanel whose ``values`` is the (read-only) mapped array
+    """
+    values = np.load(os.path.join(path, _VALUES), mmap_mode="r" if mmap else None)
+    dates = np.load(os.path.join(path, _DATES))
+    with open(os.path.join(path, _TICKERS)) as f:
+        tickers = json.load(f)
+    return PricePanel(values, dates, tickers, dtype=values.dtype)
+
+
+def panel_key(tickers, start_date, end_date, provider=None, dtype=np.float32):
+    """
+    Build a stable key for the panel of a ticker list and date range.
+
+    Args:
+        tickers: Ticker symbols (order matters: it is the column order)
+        start_date: Start date (YYYY-MM-DD)
+        end_date: End date (YYYY-MM-DD)
+        provider: Data provider name
+        dtype: Storage dtype
+
+    Returns:
+        Hex digest string
+    """
+    payload = json.dumps([list(tickers), str(start_date), str(end_date), provider, np.dtype(dtype).str])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:24]
+
+
+def _dir_size(path):
+    total = 0
+    for name in os.listdir(path):
+        try:
+            total += os.path.getsize(os.path.join(path, name))
+        except OSError:
+            pass
+    return total
+
+
+class PanelStore:
+    """
+    Directory of memory-mapped panels addressed by key (see ``panel_key``).
+
+    A panel expires ``ttl`` seconds after it was written, so a range ending
+    today is rebuilt from the price cache (picking up new bars and restated
+    history) instead of staying frozen at its first download. The store is
+    capped at ``max_bytes``; the least recently opened panels are removed
+    first. Processes that still map a removed panel keep reading it.
+    """
+
+    def __init__(self, root=None, ttl=DEFAULT_TTL, max_bytes=DEFAULT_MAX_BYTES):
+        """
+        Initialize the store.
+
+        Args:
+            root: Store directory (default: ``panels`` under the price cache
+                directory, $FMV_CACHE_DIR)
+            ttl: Seconds a stored panel stays valid (None: never expires)
+            max_bytes: Size cap for the whole store (None: unbounded)
+        """
+        if root is None:
+            from data.price_cache import DEFAULT_CACHE_DIR
+            root = os.path.join(DEFAULT_CACHE_DIR, "panels")
+        self.root = root
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        os.makedirs(self.root, exist_ok=True)
+
+    def path(self, key):
+        return os.path.join(self.root, key)
+
+    def get(self, key):
+        """
+        Open a stored panel.
+
+        Returns:
+            Memory-mapped PricePanel, or None if the key is not stored or
+            has expired
+        """
+        path = self.path(key)
+        try:
+            written = os.path.getmtime(os.path.join(path, _VALUES))
+        except OSError:
+            return None
+        if self.ttl is not None and time.time() - written > self.ttl:
+            shutil.rmtree(path, ignore_errors=True)
+            return None
+        try:
+            # The directory's mtime records the last use, for eviction
+            os.utime(path)
+            return open_panel(path)
+        except OSError:
+            # Evicted by another process in the meantime
+            return None
+
+    def put(self, key, panel):
+        """
+        Store a panel and return its memory-mapped replacement.
+
+        Callers should drop their in-memory panel and keep the returned one,
+        so the prices are held once in the shared page cache.
+
+        Args:
+            key: Panel key
+            panel: PricePanel to store
+
+        Returns:
+            Memory-mapped PricePanel
+        """
+        write_panel(panel, self.path(key))
+        self.evict(keep=key)
+        return open_panel(self.path(key))
+
+    def evict(self, keep=None):
+        """
+        Remove least recently used panels until the store fits ``max_bytes``.
+
+        Args:
+            keep: Key never to remove (the panel just stored)
+        """
+        if self.max_bytes is None:
+            return
+        entries = []
+        for name in os.listdir(self.root):
+            if name.startswith("."):
+                # Another process is still writing this one
+                continue
+            path = self.path(name)
+            try:
+                entries.append((os.path.getmtime(path), _dir_size(path), name))
+            except OSError:
+                continue
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if name == keep:
+                continue
+            shutil.rmtree(self.path(name), ignore_errors=True)
+            total -= size
+
+    def clear(self):
+        """Remove every stored panel."""
+        for name in os.listdir(self.root):
+            shutil.rmtree(self.path(name), ignore_errors=True)
@@ -0,0 +1,385 @@
+"""
+Price Cache Module
+Persistent on-disk price store with incremental (delta) fetching.
+
+Each ticker's history is stored once as a small Parquet file. Later requests
+only download the date ranges missing at either end of what is already on
+disk, and merge them into the stored history.
+
+Adjusted closes are restated backwards whenever a split or dividend occurs,
+so a stored history can go stale. Every delta download therefore also takes
+the stored bar next to the gap; if that bar's fresh value differs from the
+stored one, the ticker's whole history is downloaded again and rewritten.
+"""
+
+import os
+import re
+import tempfile
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from utils.profiler import profiled
+
+
+DEFAULT_CACHE_DIR = os.environ.get(
+    "FMV_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "factor_momentum_visualizer")
+)
+
+_COVERAGE_START = b"covered_start"
+_COVERAGE_END = b"covered_end"
+
+# Relative change of an overlapping bar taken as a new adjustment basis
+ADJUSTMENT_RTOL = 1e-4
+
+
+def _to_timestamp(value):
+    """Normalize a date-like value (str, date, datetime) to a midnight Timestamp."""
+    return pd.Timestamp(value).normalize()
+
+
+def _safe_filename(ticker):
+    """Map a ticker symbol to a filesystem-safe file stem."""
+    return re.sub(r"[^A-Za-z0-9._^=-]", "_", ticker)
+
+
+class PriceCache:
+    """
+    On-disk, per-ticker price store.
+
+    Files live under ``<cache_dir>/<series>/<TICKER>.parquet``. The series
+    name separates e.g. adjusted from unadjusted closes so the two never mix.
+    Each file records the date range it covers (half-open, ``[start, end)``)
+    so that ranges with no trading days (weekends, holidays, pre-IPO) are not
+    requested again.
+    """
+
+    def __init__(self, cache_dir=None, series="adjusted"):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir: Root cache directory (default: $FMV_CACHE_DIR or
+                ~/.cache/factor_momentum_visualizer)
+            series: Price series stored in this cache ('adjusted' or 'unadjusted')
+        """
+        self.cache_dir = cache_dir or DEFAULT_CACHE_DIR
+        self.series = series
+        self.series_dir = os.path.join(self.cache_dir, "prices", series)
+        os.makedirs(self.series_dir, exist_ok=True)
+
+    def _path(self, ticker):
+        return os.path.join(self.series_dir, f"{_safe_filename(ticker)}.parquet")
+
+    def load(self, ticker):
+        """
+        Load the stored history for a ticker.
+
+        Args:
+            ticker: Ticker symbol
+
+        Returns:
+            Tuple of (price Series, covered_start, covered_end), or
+            (None, None, None) if the ticker is not cached
+        """
+        path = self._path(ticker)
+        if not os.path.exists(path):
+            return None, None, None
+
+        try:
+            table = pq.read_table(path)
+        except (OSError, pa.ArrowInvalid):
+            # Corrupt or partially written file - treat as a cache miss
+            return None, None, None
+
+        metadata = table.schema.metadata or {}
+        covered_start = _to_timestamp(metadata[_COVERAGE_START].decode())
+        covered_end = _to_timestamp(metadata[_COVERAGE_END].decode())
+
+        frame = table.to_pandas()
+        series = pd.Series(
+            frame["close"].values,
+            index=pd.DatetimeIndex(frame["date"]),
+            name=ticker
+        )
+        return series, covered_start, covered_end
+
+    def store(self, ticker, prices, covered_start, covered_end):
+        """
+        Write a ticker's full history to disk.
+
+        The file is written to a temporary path and atomically renamed, so
+        concurrent readers (other sessions or worker processes) never see a
+        half-written file.
+
+        Args:
+            ticker: Ticker symbol
+            prices: Series of prices indexed by date
+            covered_start: First date covered by the history (inclusive)
+            covered_end: Last date covered by the history (exclusive)
+        """
+        prices = prices.dropna().sort_index()
+        table = pa.table({
+            "date": pa.array(pd.DatetimeIndex(prices.index).values, type=pa.timestamp("ns")),
+            "close": pa.array(prices.values.astype("float64"))
+        })
+        table = table.replace_schema_metadata({
+            _COVERAGE_START: str(covered_start.date()).encode(),
+            _COVERAGE_END: str(covered_end.date()).encode()
+        })
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.series_dir, suffix=".tmp")
+        os.close(fd)
+        try:
+            pq.write_table(table, tmp_path, compression="zstd")
+            os.replace(tmp_path, self._path(ticker))
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    @profiled('price_cache.get_prices')
+    def get_prices(self, tickers, start_date, end_date, fetch_fn):
+        """
+        Return prices for tickers over a date range, fetching only what is missing.
+
+        Tickers that need the same missing range are grouped into a single
+        call to ``fetch_fn`` to keep request volume low. Each missing range is
+        widened to include the nearest stored bar; tickers whose stored bar
+        no longer matches (a split or dividend since it was stored) are
+        downloaded again over their whole covered range and rewritten.
+
+        Args:
+            tickers: List of ticker symbols
+            start_date: Start date (inclusive)
+            end_date: End date (exclusive, as passed to yfinance)
+            fetch_fn: Callable ``fetch_fn(tickers, start_str, end_str)`` returning
+                a DataFrame of prices (dates x tickers)
+
+        Returns:
+            DataFrame with dates as index and tickers as columns
+        """
+        start = _to_timestamp(start_date)
+        end = _to_timestamp(end_date)
+        # Today's bar is still forming, so never treat it as covered
+        coverable_end = _to_timestamp(date.today())
+
+        cached = {}
+        missing_ranges = {}
+        for ticker in tickers:
+            prices, covered_start, covered_end = self.load(ticker)
+            cached[ticker] = (prices, covered_start, covered_end)
+
+            gaps = []
+            if prices is None:
+                gaps.append((start, end))
+            else:
+                # Reach one settled stored bar into the history to check its
+                # adjustment basis (bars from covered_end on may still have been forming)
+                stored = prices.dropna()
+                stored = stored[stored.index < covered_end]
+                if start < covered_start:
+                    anchor = stored.index[0] + pd.Timedelta(days=1) if not stored.empty else covered_start
+                    gaps.append((start, max(anchor, covered_start)))
+                if end > covered_end:
+                    anchor = stored.index[-1] if not stored.empty else covered_end
+                    gaps.append((min(anchor, covered_end), end))
+
+            for gap in gaps:
+                missing_ranges.setdefault(gap, []).append(ticker)
+
+        fetched = self._fetch_ranges(missing_ranges, fetch_fn)
+
+        # Tickers whose stored bars were restated since they were written
+        restated = {}
+        for ticker, pieces in fetched.items():
+            prices, covered_start, covered_end = cached[ticker]
+            ratio = self._restatement(prices, covered_end, pieces)
+            if ratio is not None:
+                restated[ticker] = ratio
+        refetch_ranges = {}
+        for ticker in restated:
+            _, covered_start, covered_end = cached[ticker]
+            refetch_ranges.setdefault((min(start, covered_start), max(end, covered_end)), []).append(ticker)
+        refetched = self._fetch_ranges(refetch_ranges, fetch_fn)
+
+        for ticker, ratio in restated.items():
+            prices, covered_start, covered_end = cached[ticker]
+            if ticker in refetched:
+                # Whole history on the current basis replaces the stored one
+                cached[ticker] = (None, None, None)
+                fetched[ticker] = refetched[ticker]
+            else:
+                # Full download failed: every stored bar predates the new
+                # adjustment, so scaling them by the anchor's ratio puts them on
+                # the current basis
+                cached[ticker] = (prices * ratio, covered_start, covered_end)
+
+        result = {}
+        for ticker in tickers:
+            prices, covered_start, covered_end = cached[ticker]
+            pieces = fetched.get(ticker, [])
+
+            if pieces:
+                frames = [p for _, p in pieces]
+                if prices is not None:
+                    frames.insert(0, prices)
+                merged = pd.concat(frames)
+                # Prefer freshly downloaded values where dates overlap
+                merged = merged[~merged.index.duplicated(keep="last")].sort_index()
+
+                starts = [gap[0] for gap, _ in pieces]
+                ends = [gap[1] for gap, _ in pieces]
+                if covered_start is not None:
+                    starts.append(covered_start)
+                    ends.append(covered_end)
+                new_start = min(starts)
+                new_end = max(min(max(ends), coverable_end), new_start)
+                self.store(ticker, merged, new_start, new_end)
+                prices = merged
+
+            if prices is not None:
+                window = prices[(prices.index >= start) & (prices.index < end)]
+                if not window.empty:
+                    result[ticker] = window
+
+        if not result:
+            return pd.DataFrame()
+        return pd.DataFrame(result).sort_index()
+
+    @staticmethod
+    def _fetch_ranges(ranges, fetch_fn):
+        """
+        Download grouped date ranges.
+
+        Args:
+            ranges: Dict of (start, end) -> list of tickers
+            fetch_fn: See ``get_prices``
+
+        Returns:
+            Dict of ticker -> list of ((start, end), price Series) pieces
+        """
+        fetched = {}
+        for (gap_start, gap_end), gap_tickers in ranges.items():
+            new_data = fetch_fn(
+                gap_tickers,
+                gap_start.strftime('%Y-%m-%d'),
+                gap_end.strftime('%Y-%m-%d')
+            )
+            if new_data is None or new_data.empty:
+                # Likely a network or provider failure - do not record coverage
+                continue
+            if isinstance(new_data, pd.Series):
+                new_data = new_data.to_frame(name=gap_tickers[0])
+
+            for ticker in gap_tickers:
+                if ticker in new_data.columns:
+                    fetched.setdefault(ticker, []).append(
+                        ((gap_start, gap_end), new_data[ticker].dropna())
+                    )
+        return fetched
+
+    @staticmethod
+    def _restatement(prices, covered_end, pieces):
+        """
+        Compare freshly downloaded bars with the stored settled ones on shared dates.
+
+        Returns:
+            Ratio of fresh to stored price on the first shared date that
+            differs by more than ``ADJUSTMENT_RTOL``, or None if they agree
+        """
+        if prices is None:
+            return None
+        for _, piece in pieces:
+            shared = piece.index.intersection(prices.index[prices.index < covered_end])
+            if shared.empty:
+                continue
+            fresh = piece.loc[shared].to_numpy(dtype=float)
+            stored = prices.loc[shared].to_numpy(dtype=float)
+            changed = np.flatnonzero(~np.isclose(fresh, stored, rtol=ADJUSTMENT_RTOL, atol=0.0))
+            if len(changed):
+                return fresh[changed[0]] / stored[changed[0]]
+        return None
+
+    def clear(self, tickers=None):
+        """
+        Remove cached history.
+
+        Args:
+            tickers: Tickers to remove (default: every ticker in this series)
+        """
+        if tickers is None:
+            names = [f for f in os.listdir(self.series_dir) if f.endswith(".parquet")]
+        else:
+            names = [f"{_safe_filename(t)}.parquet" for t in tickers]
+        for name in names:
+            path = os.path.join(self.series_dir, name)
+            if os.path.exists(path):
+                os.remove(path)
+
+
+class CachedDataFetcher:
+    """
+    Drop-in wrapper around DataFetcher that serves prices from a PriceCache.
+
+    Every attribute other than ``fetch_data`` is forwarded to the wrapped
+    fetcher, so ``get_sp500_tickers`` / ``fetch_fundamentals`` etc. keep working.
+    """
+
+    def __init__(self, fetcher, cache=None):
+        """
+        Initialize the cached fetcher.
+
+        Args:
+            fetcher: Object with ``fetch_data(tickers, start_date, end_date)``
+            cache: PriceCache instance (default: adjusted-price cache in the
+                default cache directory)
+        """
+        self.fetcher = fetcher
+        self.cache = cache or PriceCache()
+
+    def fetch_data(self, tickers, start_date, end_date):
+        """
+        Fetch price data, downloading only date ranges missing from the cache.
+
+        Args:
+            tickers: List of ticker symbols
+            start_date: Start date (YYYY-MM-DD)
+            end_date: End date (YYYY-MM-DD)
+
+        Returns:
+            DataFrame with dates as index and tickers as columns
+        """
+        return self.cache.get_prices(tickers, start_date, end_date, self.fetcher.fetch_data)
+
+    def __getattr__(self, name):
+        return getattr(self.fetcher, name)
+
+
+def cached_loader_prices(loader_cls, tickers, start_date, end_date, cache=None):
+    """
+    Fetch prices through a DataLoader-style class on top of a PriceCache.
+
+    DataLoader takes its date range in the constructor, so a fresh loader is
+    built for each missing range.
+
+    Args:
+        loader_cls: Class constructed as ``loader_cls(start, end)`` exposing
+            ``fetch_price_data(tickers)``
+        tickers: List of ticker symbols
+        start_date: Start date (YYYY-MM-DD)
+        end_date: End date (YYYY-MM-DD)
+        cache: PriceCache instance (default: adjusted-price cache)
+
+    Returns:
+        DataFrame with dates as index and tickers as columns
+    """
+    cache = cache or PriceCache()
+
+    def fetch_fn(missing_tickers, start, end):
+        return loader_cls(start, end).fetch_price_data(missing_tickers)
+
+    return cache.get_prices(tickers, start_date, end_date, fetch_fn)
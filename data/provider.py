@@ -0,0 +1,115 @@
+"""
+Provider Module
+Select the market-data provider (live Yahoo Finance or offline synthetic data).
+
+The provider is chosen by the ``FMV_DATA_PROVIDER`` environment variable
+('yahoo', the default, or 'synthetic') or by passing ``provider`` explicitly.
+Synthetic data is configured with ``FMV_SYNTHETIC_SEED`` and
+``FMV_SYNTHETIC_UNIVERSE`` (number of tickers).
+"""
+
+import os
+
+
+PROVIDERS = ("yahoo", "synthetic")
+
+
+def get_provider_name(provider=None):
+    """
+    Resolve the provider name.
+
+    Args:
+        provider: Explicit provider name (default: $FMV_DATA_PROVIDER or 'yahoo')
+
+    Returns:
+        Lower-case provider name
+    """
+    name = (provider or os.environ.get("FMV_DATA_PROVIDER", "yahoo")).lower()
+    if name not in PROVIDERS:
+        raise ValueError(f"Unknown data provider '{name}'. Choose one of: {', '.join(PROVIDERS)}")
+    return name
+
+
+def _synthetic_settings():
+    seed = int(os.environ.get("FMV_SYNTHETIC_SEED", "42"))
+    universe_size = int(os.environ.get("FMV_SYNTHETIC_UNIVERSE", "5000"))
+    return seed, universe_size
+
+
+def get_data_fetcher(provider=None, cache_dir=None):
+    """
+    Build the DataFetcher for the selected provider.
+
+    Yahoo prices are served through the process-wide in-memory cache shared
+    by all sessions, backed by the on-disk price cache; synthetic data is
+    generated on demand and never cached.
+
+    Args:
+        provider: Explicit provider name (default: from the environment)
+        cache_dir: Price cache directory (default: $FMV_CACHE_DIR or ~/.cache)
+
+    Returns:
+        Object with the DataFetcher interface
+    """
+    if get_provider_name(provider) == "synthetic":
+        from data.synthetic import SyntheticDataFetcher
+        seed, universe_size = _synthetic_settings()
+        return SyntheticDataFetcher(seed=seed, universe_size=universe_size)
+
+    from data.data_fetcher import DataFetcher
+    from data.price_cache import CachedDataFetcher, PriceCache
+    from data.shared_cache import SharedCacheFetcher
+    return SharedCacheFetcher(CachedDataFetcher(DataFetcher(), PriceCache(cache_dir)))
+
+
+def get_fundamentals_fetcher(provider=None, fetcher=None, **kwargs):
+    """
+    Build a FundamentalsFetcher for the selected provider.
+
+    Yahoo fundamentals are shared across sessions through the process-wide
+    in-memory cache.
+
+    Args:
+        provider: Explicit provider name (default: from the environment)
+        fetcher: Existing synthetic fetcher to serve fundamentals from
+        **kwargs: Passed to FundamentalsFetcher
+
+    Returns:
+        FundamentalsFetcher instance
+    """
+    from data.fundamentals import FundamentalsFetcher
+
+    if get_provider_name(provider) == "synthetic":
+        if fetcher is None or not hasattr(fetcher, "fundamentals_transport"):
+            fetcher = get_data_fetcher("synthetic")
+        # Local generation needs no rate limiting
+        kwargs.setdefault("rate", 1e6)
+        kwargs.setdefault("burst", 1e6)
+        return FundamentalsFetcher(transport=fetcher.fundamentals_transport(), **kwargs)
+
+    from data.shared_cache import get_shared_cache
+    kwargs.setdefault("cache", get_shared_cache())
+    return FundamentalsFetcher(**kwargs)
+
+
+def load_price_data(tickers, start_date, end_date, provider=None):
+    """
+    Load prices through the DataLoader interface of the selected provider.
+
+    Args:
+        tickers: List of ticker symbols
+        start_date: Start date (YYYY-MM-DD)
+        end_date: End date (YYYY-MM-DD)
+        provider: Explicit provider name (default: from the environment)
+
+    Returns:
+        DataFrame with dates as index and tickers as columns
+    """
+    if get_provider_name(provider) == "synthetic":
+        from data.synthetic import SyntheticDataLoader
+        seed, _ = _synthetic_settings()
+        return SyntheticDataLoader(start_date, end_date, seed=seed).fetch_price_data(tickers)
+
+    from utils.data_loader import DataLoader
+    from data.price_cache import cached_loader_prices
+    return cached_loader_prices(DataLoader, tickers, start_date, end_date)
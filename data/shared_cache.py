@@ -0,0 +1,353 @@
+"""
+Shared Cache Module
+Process-wide in-memory cache of market data shared by all app sessions.
+
+Streamlit serves every session from threads of one process, so prices,
+fundamentals and index constituents fetched for one user can be reused by
+the next. Price entries record the date range they cover, so any request
+inside that range is a hit. Concurrent requests for the same data are
+coalesced: the first request fetches, the others wait for its result.
+
+The cache is bounded by ``max_bytes`` (least recently used entries are
+evicted first) and entries expire after ``ttl`` seconds so prices and
+fundamentals are refreshed periodically. The defaults can be set with
+``FMV_SHARED_CACHE_MB`` and ``FMV_SHARED_CACHE_TTL``.
+"""
+
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+
+
+DEFAULT_MAX_BYTES = int(float(os.environ.get("FMV_SHARED_CACHE_MB", "512")) * 1024 ** 2)
+DEFAULT_TTL = float(os.environ.get("FMV_SHARED_CACHE_TTL", "3600"))
+
+_SHARED = None
+_SHARED_LOCK = threading.Lock()
+
+
+def _sizeof(value):
+    """Approximate memory held by a cached value, in bytes."""
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True, deep=True))
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+class _Entry:
+    """A cached value with the date range it covers (None for undated data)."""
+
+    __slots__ = ("value", "start", "end", "nbytes", "stored_at")
+
+    def __init__(self, value, start, end, stored_at):
+        self.value = value
+        self.start = start
+        self.end = end
+        self.nbytes = _sizeof(value)
+        self.stored_at = stored_at
+
+    def covers(self, start, end):
+        return self.start is None or (self.start <= start and end <= self.end)
+
+
+class _Flight:
+    """An upstream fetch in progress that other requests can wait on."""
+
+    def __init__(self, start=None, end=None):
+        self.start = start
+        self.end = end
+        self.values = {}
+        self.done = threading.Event()
+
+    def covers(self, start, end):
+        return self.start is None or (self.start <= start and end <= self.end)
+
+
+class SharedDataCache:
+    """
+    Thread-safe, memory-bounded LRU cache with TTL and request coalescing.
+
+    Keys are ``(namespace, item)`` tuples, e.g. ``('prices', 'AAPL')`` or
+    ``('fundamentals', 'AAPL')``.
+    """
+
+    def __init__(self, max_bytes=None, ttl=None, clock=time.monotonic):
+        """
+        Initialize the cache.
+
+        Args:
+            max_bytes: Memory ceiling in bytes (default: $FMV_SHARED_CACHE_MB, 512 MB)
+            ttl: Seconds before an entry expires (default: $FMV_SHARED_CACHE_TTL,
+                one hour; None or 0 disables expiry)
+            clock: Monotonic clock, replaceable for testing
+        """
+        self.max_bytes = DEFAULT_MAX_BYTES if max_bytes is None else max_bytes
+        self.ttl = DEFAULT_TTL if ttl is None else ttl
+        self.clock = clock
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self._counters = dict.fromkeys(
+            ("hits", "misses", "coalesced", "evictions", "expirations", "upstream_calls"), 0
+        )
+
+    def _lookup(self, key, start, end):
+        """Return the live entry covering a range, or None (lock held)."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if self.ttl and self.clock() - entry.stored_at > self.ttl:
+            self._remove(key)
+            self._counters["expirations"] += 1
+            return None
+        if not entry.covers(start, end):
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        self._bytes -= entry.nbytes
+
+    def _store(self, key, value, start=None, end=None):
+        """Insert a value, merging price history with what is cached (lock held)."""
+        old = self._entries.get(key)
+        if (old is not None and start is not None and old.start is not None
+                and start <= old.end and old.start <= end):
+            merged = pd.concat([old.value, value])
+            value = merged[~merged.index.duplicated(keep="last")].sort_index()
+            start, end = min(start, old.start), max(end, old.end)
+        if old is not None:
+            self._remove(key)
+
+        entry = _Entry(value, start, end, self.clock())
+        self._entries[key] = entry
+        self._bytes += entry.nbytes
+        while self._bytes > self.max_bytes and len(self._entries) > 1:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self._counters["evictions"] += 1
+
+    def _claim(self, namespace, items, start=None, end=None):
+        """
+        Split requested items into hits, items to wait for and items to fetch.
+
+        Items to fetch are registered as in flight so concurrent requests wait
+        for this one instead of fetching them again.
+
+        Returns:
+            Tuple of (hits dict, list of (item, flight) to wait on, items to
+            fetch, flight for the items to fetch)
+        """
+        hits, waits, fetch = {}, [], []
+        flight = _Flight(start, end)
+        with self._lock:
+            for item in items:
+                key = (namespace, item)
+                entry = self._lookup(key, start, end)
+                if entry is not None:
+                    hits[item] = entry.value
+                    self._counters["hits"] += 1
+                    continue
+                pending = self._inflight.get(key)
+                if pending is not None and pending.covers(start, end):
+                    waits.append((item, pending))
+                    self._counters["coalesced"] += 1
+                else:
+                    fetch.append(item)
+                    self._inflight[key] = flight
+                    self._counters["misses"] += 1
+            if fetch:
+                self._counters["upstream_calls"] += 1
+        return hits, waits, fetch, flight
+
+    def _settle(self, namespace, items, flight, values, start=None, end=None):
+        """Store fetched values and release requests waiting on the flight."""
+        with self._lock:
+            for item, value in values.items():
+                self._store((namespace, item), value, start, end)
+            for item in items:
+                if self._inflight.get((namespace, item)) is flight:
+                    del self._inflight[(namespace, item)]
+        flight.values = values
+        flight.done.set()
+
+    def get_items(self, namespace, items, fetch_fn):
+        """
+        Return cached values for items, fetching the missing ones once.
+
+        Args:
+            namespace: Key namespace, e.g. 'fundamentals'
+            items: Hashable item identifiers
+            fetch_fn: Callable ``fetch_fn(missing_items) -> dict`` of item -> value;
+                items left out of the dict are treated as failures and not cached
+
+        Returns:
+            Dictionary of item -> value for the items that could be served
+        """
+        items = list(dict.fromkeys(items))
+        result, waits, fetch, flight = self._claim(namespace, items)
+
+        if fetch:
+            values = {}
+            try:
+                values = fetch_fn(fetch) or {}
+            finally:
+                self._settle(namespace, fetch, flight, values)
+            result.update(values)
+
+        for item, pending in waits:
+            pending.done.wait()
+            if item in pending.values:
+                result[item] = pending.values[item]
+        return {item: result[item] for item in items if item in result}
+
+    def get_prices(self, tickers, start_date, end_date, fetch_fn):
+        """
+        Return prices for tickers over a date range, fetching only cache misses.
+
+        Args:
+            tickers: List of ticker symbols
+            start_date: Start date (inclusive)
+            end_date: End date (exclusive)
+            fetch_fn: Callable ``fetch_fn(tickers, start_str, end_str)`` returning
+                a DataFrame of prices (dates x tickers)
+
+        Returns:
+            DataFrame with dates as index and tickers as columns
+        """
+        start = pd.Timestamp(start_date).normalize()
+        end = pd.Timestamp(end_date).normalize()
+        tickers = list(dict.fromkeys(tickers))
+        series, waits, fetch, flight = self._claim("prices", tickers, start, end)
+
+        if fetch:
+            values = {}
+            try:
+                new_data = fetch_fn(fetch, start.strftime('%Y-%m-%d'), end.strftime('%Y-%m-%d'))
+                if isinstance(new_data, pd.Series):
+                    new_data = new_data.to_frame(name=fetch[0])
+                if new_data is not None and not new_data.empty:
+                    # Tickers absent from the response are not cached, like the disk cache
+                    values = {
+                        ticker: new_data[ticker].dropna().rename(ticker)
+                        for ticker in fetch if ticker in new_data.columns
+                    }
+            finally:
+                self._settle("prices", fetch, flight, values, start, end)
+            series.update(values)
+
+        for ticker, pending in waits:
+            pending.done.wait()
+            if ticker in pending.values:
+                series[ticker] = pending.values[ticker]
+
+        result = {}
+        for ticker in tickers:
+            prices = series.get(ticker)
+            if prices is not None:
+                window = prices[(prices.index >= start) & (prices.index < end)]
+                if not window.empty:
+                    result[ticker] = window
+        if not result:
+            return pd.DataFrame()
+        return pd.DataFrame(result).sort_index()
+
+    def stats(self):
+        """
+        Cache counters and size.
+
+        Returns:
+            Dictionary with hits, misses, coalesced (requests that waited on
+            another fetch), evictions, expirations, upstream_calls, entries,
+            bytes and max_bytes
+        """
+        with self._lock:
+            return {
+                **self._counters,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes
+            }
+
+    def clear(self):
+        """Remove all entries (in-flight fetches and counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SharedCacheFetcher:
+    """
+    DataFetcher wrapper that serves prices and constituents from a SharedDataCache.
+
+    Every other attribute is forwarded to the wrapped fetcher.
+    """
+
+    def __init__(self, fetcher, shared_cache=None):
+        """
+        Initialize the wrapper.
+
+        Args:
+            fetcher: Object with the DataFetcher interface
+            shared_cache: SharedDataCache (default: the process-wide cache)
+        """
+        self.fetcher = fetcher
+        self.shared_cache = get_shared_cache() if shared_cache is None else shared_cache
+
+    def fetch_data(self, tickers, start_date, end_date):
+        """
+        Fetch price data, going upstream only for tickers and ranges not in memory.
+
+        Args:
+            tickers: List of ticker symbols
+            start_date: Start date (YYYY-MM-DD)
+            end_date: End date (YYYY-MM-DD)
+
+        Returns:
+            DataFrame with dates as index and tickers as columns
+        """
+        return self.shared_cache.get_prices(tickers, start_date, end_date, self.fetcher.fetch_data)
+
+    def _constituents(self, index_name, fetch):
+        def fetch_list(names):
+            tickers = list(fetch())
+            # An empty list is a failed lookup (e.g. a blocked scrape); leave it uncached
+            return {index_name: tickers} if tickers else {}
+
+        lists = self.shared_cache.get_items("constituents", [index_name], fetch_list)
+        return list(lists.get(index_name, []))
+
+    def get_sp500_tickers(self):
+        """S&P 500 constituents, fetched once per TTL for all sessions."""
+        return self._constituents("sp500", self.fetcher.get_sp500_tickers)
+
+    def get_russell1000_tickers(self):
+        """Russell 1000 constituents, fetched once per TTL for all sessions."""
+        return self._constituents("russell1000", self.fetcher.get_russell1000_tickers)
+
+    def __getattr__(self, name):
+        return getattr(self.fetcher, name)
+
+
+def get_shared_cache():
+    """
+    Get (or create) the process-wide SharedDataCache.
+
+    Returns:
+        SharedDataCache instance
+    """
+    global _SHARED
+    with _SHARED_LOCK:
+        if _SHARED is None:
+            _SHARED = SharedDataCache()
+        return _SHARED
@@ -0,0 +1,384 @@
+"""
+Synthetic Data Module
+Deterministic, offline market data with the DataFetcher / DataLoader interface.
+
+Prices follow a market + sector + idiosyncratic factor model under a shared
+stochastic-volatility regime (fat-tailed, clustered returns), with staggered
+listings and delistings. Every value is a pure function of
+(seed, ticker, date), so the same ticker returns the same history no matter
+which date range or which other tickers are requested. This makes runs
+reproducible for benchmarks and load tests without network access.
+
+Generation cost follows the requested range, not the calendar. Idiosyncratic
+shocks come in fixed blocks of days: each block's total is drawn up front
+(a few dozen draws per ticker cover the whole calendar), so the price level
+at the start of any block is a short sum, and only the blocks inside the
+range are simulated day by day, conditioned on their totals. Fundamentals
+and index constituents are taken as of a fixed date, not the wall clock.
+"""
+
+import zlib
+
+import numpy as np
+import pandas as pd
+
+
+CALENDAR_START = "1990-01-01"
+CALENDAR_END = "2035-12-31"
+# Date that fundamentals and index constituents describe by default
+AS_OF_DATE = "2025-12-31"
+# Expected daily market return
+MARKET_DRIFT = 0.00025
+# Days per idiosyncratic shock block (even, so Box-Muller pairs stay inside a block)
+BLOCK_DAYS = 256
+
+N_SECTORS = 11
+SECTOR_NAMES = [
+    "Technology", "Healthcare", "Financials", "Consumer Discretionary",
+    "Consumer Staples", "Industrials", "Energy", "Utilities",
+    "Materials", "Real Estate", "Communication Services"
+]
+
+
+def _ticker_id(ticker):
+    """Stable 32-bit id for any ticker string."""
+    return zlib.crc32(ticker.encode("utf-8"))
+
+
+class SyntheticMarket:
+    """
+    Seeded generator of correlated daily price panels and fundamentals.
+    """
+
+    def __init__(self, seed=42, delisting_rate=0.01, listing_rate=0.03, as_of=AS_OF_DATE):
+        """
+        Initialize the market.
+
+        Args:
+            seed: Random seed; identical seeds give identical data
+            delisting_rate: Annual probability that a listed name delists
+            listing_rate: Annual rate at which names list after the calendar start
+            as_of: Default date for ``fundamentals``
+        """
+        self.seed = seed
+        self.delisting_rate = delisting_rate
+        self.listing_rate = listing_rate
+        self.as_of = pd.Timestamp(as_of).normalize()
+        self.calendar = pd.bdate_range(CALENDAR_START, CALENDAR_END)
+
+        rng = np.random.default_rng([seed, 0])
+        n_days = len(self.calendar)
+        # Persistent volatility regime shared by all names gives fat-tailed,
+        # clustered returns without per-name heavy-tailed draws
+        log_regime = np.zeros(n_days)
+        innovations = rng.normal(0.0, 0.04, n_days)
+        for t in range(1, n_days):
+            log_regime[t] = 0.98 * log_regime[t - 1] + innovations[t]
+        self.vol_regime = np.exp(log_regime - log_regime.var() / 2)
+        self.market_returns = rng.normal(MARKET_DRIFT, 0.009, n_days) * self.vol_regime
+        self.sector_returns = rng.normal(0.0, 0.005, (N_SECTORS, n_days)) * self.vol_regime
+
+        # Running sums give the common part of any day's log price in O(1)
+        self._market_cum = np.concatenate([[0.0], np.cumsum(self.market_returns)])
+        self._sector_cum = np.concatenate(
+            [np.zeros((N_SECTORS, 1)), np.cumsum(self.sector_returns, axis=1)], axis=1
+        )
+        n_blocks = -(-n_days // BLOCK_DAYS)
+        regime = np.zeros(n_blocks * BLOCK_DAYS)
+        regime[:n_days] = self.vol_regime
+        self._block_regime = regime.reshape(n_blocks, BLOCK_DAYS)
+        self._block_var = (self._block_regime ** 2).sum(axis=1)
+
+    def _ticker_params(self, ids):
+        """Per-ticker loadings, volatility, listing window and fundamentals seeds."""
+        n_days = len(self.calendar)
+        years = n_days / 252
+        params = {key: np.empty(len(ids)) for key in
+                  ("beta", "sector_beta", "vol", "drift", "start_price", "listed", "delisted", "shares")}
+        params["sector"] = np.empty(len(ids), dtype=int)
+
+        for i, tid in enumerate(ids):
+            rng = np.random.default_rng([self.seed, 1, tid])
+            params["sector"][i] = tid % N_SECTORS
+            params["beta"][i] = rng.uniform(0.6, 1.5)
+            params["sector_beta"][i] = rng.uniform(0.5, 1.2)
+            params["vol"][i] = rng.uniform(0.008, 0.022)
+            params["drift"][i] = rng.normal(0.0, 0.0002)
+            params["shares"][i] = np.exp(rng.normal(20.0, 1.2))
+            params["start_price"][i] = np.exp(rng.uniform(np.log(5), np.log(100)))
+
+            listed_after = rng.exponential(1 / self.listing_rate) if self.listing_rate else np.inf
+            params["listed"][i] = 0 if listed_after > years or rng.random() < 0.7 else int(listed_after * 252)
+            delist_after = rng.exponential(1 / self.delisting_rate) if self.delisting_rate else np.inf
+            params["delisted"][i] = n_days if delist_after > years else params["listed"][i] + int(delist_after * 252)
+        return params
+
+    def _idiosyncratic(self, ids, first_block, end_block):
+        """
+        Cumulative regime-scaled idiosyncratic shocks per ticker (before
+        multiplying by the ticker's volatility) over a run of blocks.
+
+        Every block's total is drawn from one short per-ticker stream. Daily
+        shocks come from a second stream that is advanced straight to the
+        first block (Box-Muller uses exactly one uniform per shock) and are
+        conditioned to add up to their block's total, which leaves them
+        i.i.d. standard normal. A ticker's path therefore does not depend on
+        the requested range.
+
+        Args:
+            ids: Ticker ids
+            first_block: First block to simulate
+            end_block: Block after the last one to simulate
+
+        Returns:
+            Array (n_blocks_in_range * BLOCK_DAYS, n_tickers); row k holds the
+            sum of all shocks up to and including day first_block * BLOCK_DAYS + k
+        """
+        n_blocks = end_block - first_block
+        weights = self._block_regime[first_block:end_block]
+        block_var = self._block_var[first_block:end_block]
+        out = np.empty((n_blocks, BLOCK_DAYS, len(ids)))
+        for i, tid in enumerate(ids):
+            totals = np.random.default_rng([self.seed, 2, tid]).standard_normal(len(self._block_var))
+            totals *= np.sqrt(self._block_var)
+            levels = np.cumsum(totals) - totals  # sum of all earlier blocks
+
+            bit_generator = np.random.PCG64([self.seed, 4, tid])
+            bit_generator.advance(first_block * BLOCK_DAYS)
+            u = np.random.Generator(bit_generator).random(n_blocks * BLOCK_DAYS).reshape(-1, 2)
+            radius = np.sqrt(-2.0 * np.log1p(-u[:, 0]))
+            angle = 2 * np.pi * u[:, 1]
+            z = np.column_stack([radius * np.cos(angle), radius * np.sin(angle)]).reshape(n_blocks, BLOCK_DAYS)
+
+            shocks = weights * z
+            gap = totals[first_block:end_block] - shocks.sum(axis=1)
+            shocks += weights ** 2 * (gap / block_var)[:, None]
+            out[:, :, i] = levels[first_block:end_block, None] + np.cumsum(shocks, axis=1)
+        return out.reshape(n_blocks * BLOCK_DAYS, len(ids))
+
+    def is_listed(self, tickers, date):
+        """
+        Check which tickers are listed on a date.
+
+        Args:
+            tickers: List of ticker symbols
+            date: Date to check
+
+        Returns:
+            Boolean array, one entry per ticker
+        """
+        p = self._ticker_params([_ticker_id(t) for t in tickers])
+        pos = int(self.calendar.searchsorted(pd.Timestamp(date)))
+        return (p["listed"] <= pos) & (pos < p["delisted"])
+
+    def prices(self, tickers, start_date, end_date):
+        """
+        Generate daily close prices.
+
+        Args:
+            tickers: List of ticker symbols
+            start_date: Start date (inclusive)
+            end_date: End date (exclusive)
+
+        Returns:
+            DataFrame with dates as index and tickers as columns; names not
+            listed anywhere in the range are dropped
+        """
+        tickers = list(dict.fromkeys(tickers))
+        end_pos = int(self.calendar.searchsorted(pd.Timestamp(end_date)))
+        start_pos = int(self.calendar.searchsorted(pd.Timestamp(start_date)))
+        if not tickers or end_pos <= start_pos:
+            return pd.DataFrame()
+
+        ids = [_ticker_id(t) for t in tickers]
+        prices = self._price_array(ids, self._ticker_params(ids), start_pos, end_pos)
+        frame = pd.DataFrame(prices, index=self.calendar[start_pos:end_pos], columns=tickers)
+        frame.index.name = "Date"
+        return frame.dropna(axis=1, how="all")
+
+    def _price_array(self, ids, p, start_pos, end_pos):
+        """Close prices on calendar rows [start_pos, end_pos), NaN while not listed."""
+        first_block = start_pos // BLOCK_DAYS
+        idiosyncratic = self._idiosyncratic(ids, first_block, -(-end_pos // BLOCK_DAYS))
+        idiosyncratic = idiosyncratic[start_pos - first_block * BLOCK_DAYS:end_pos - first_block * BLOCK_DAYS]
+
+        # Log price on day t adds up every return through t
+        through = np.arange(start_pos + 1, end_pos + 1)
+        log_prices = (
+            np.log(p["start_price"])[None, :]
+            + through[:, None] * p["drift"][None, :]
+            + self._market_cum[through, None] * p["beta"][None, :]
+            + self._sector_cum[p["sector"][:, None], through[None, :]].T * p["sector_beta"][None, :]
+            + idiosyncratic * p["vol"][None, :]
+        )
+        prices = np.exp(log_prices)
+
+        rows = np.arange(start_pos, end_pos)[:, None]
+        alive = (rows >= p["listed"][None, :]) & (rows < p["delisted"][None, :])
+        prices[~alive] = np.nan
+        return prices
+
+    def fundamentals(self, tickers, as_of=None):
+        """
+        Generate fundamentals consistent with each ticker's price on a date.
+
+        Args:
+            tickers: List of ticker symbols
+            as_of: Date the fundamentals describe (default: the market's
+                ``as_of``); names not listed then are left out
+
+        Returns:
+            DataFrame indexed by ticker with yfinance-style info fields
+        """
+        records = self._fundamental_records(list(dict.fromkeys(tickers)), as_of)
+        if not records:
+            return pd.DataFrame()
+        frame = pd.DataFrame.from_dict(records, orient="index")
+        frame.index.name = "ticker"
+        return frame
+
+    def _fundamental_records(self, tickers, as_of=None):
+        """Fundamentals as a dict of ticker -> info fields (see ``fundamentals``)."""
+        if not tickers:
+            return {}
+        ids = [_ticker_id(t) for t in tickers]
+        p = self._ticker_params(ids)
+        as_of = self.as_of if as_of is None else pd.Timestamp(as_of).normalize()
+        # Latest close in the ten days up to the as-of date (names delisted earlier have none)
+        end_pos = int(self.calendar.searchsorted(as_of + pd.Timedelta(days=1)))
+        start_pos = int(self.calendar.searchsorted(as_of - pd.Timedelta(days=10)))
+        window = self._price_array(ids, p, start_pos, end_pos)
+        last_price = pd.DataFrame(window).ffill().to_numpy()[-1] if len(window) else np.full(len(ids), np.nan)
+        expected_price = p["start_price"] * np.exp(
+            end_pos * (p["drift"] + p["beta"] * MARKET_DRIFT)
+        )
+
+        records = {}
+        for i, (ticker, tid) in enumerate(zip(tickers, ids)):
+            rng = np.random.default_rng([self.seed, 3, tid])
+            price = last_price[i]
+            if np.isnan(price):
+                continue
+            # Book value per share follows the name's expected price path, never a
+            # realized close: deriving it from the as-of price would make
+            # book-to-price a forecast of the returns the Value factor is scored on
+            book_value = expected_price[i] / float(np.exp(rng.normal(1.0, 0.6)))
+            roe = float(rng.normal(0.14, 0.08))
+            price_to_book = float(price / book_value)
+            eps = book_value * roe
+            records[ticker] = {
+                "sector": SECTOR_NAMES[p["sector"][i]],
+                "currentPrice": float(price),
+                "marketCap": float(price * p["shares"][i]),
+                "sharesOutstanding": float(p["shares"][i]),
+                "bookValue": float(book_value),
+                "priceToBook": price_to_book,
+                "trailingPE": float(price / eps) if eps > 0 else None,
+                "returnOnEquity": roe,
+                "returnOnAssets": float(roe * rng.uniform(0.2, 0.6)),
+                "profitMargins": float(rng.normal(0.12, 0.07)),
+                "debtToEquity": float(abs(rng.normal(80, 50)))
+            }
+        return records
+
+
+class SyntheticDataFetcher:
+    """
+    Offline drop-in for DataFetcher backed by a SyntheticMarket.
+    """
+
+    def __init__(self, seed=42, universe_size=5000, as_of=AS_OF_DATE):
+        """
+        Initialize the fetcher.
+
+        Args:
+            seed: Random seed
+            universe_size: Number of tickers in the synthetic universe
+            as_of: Date for fundamentals and index constituents
+        """
+        self.market = SyntheticMarket(seed=seed, as_of=as_of)
+        self.universe = [f"SYN{i:04d}" for i in range(universe_size)]
+        # Index lists hold the constituents on the as-of date, like the live
+        # provider's current lists; delisted names stay reachable through
+        # get_universe_tickers
+        listed = self.market.is_listed(self.universe, self.market.as_of)
+        self.constituents = [t for t, ok in zip(self.universe, listed) if ok]
+
+    def get_sp500_tickers(self):
+        """First 500 currently listed tickers of the synthetic universe."""
+        return self.constituents[:500]
+
+    def get_russell1000_tickers(self):
+        """First 1000 currently listed tickers of the synthetic universe."""
+        return self.constituents[:1000]
+
+    def get_universe_tickers(self, n=None):
+        """
+        First ``n`` tickers of the full synthetic universe, including names
+        that listed late or delisted (all by default).
+        """
+        return self.universe[:n] if n else list(self.universe)
+
+    def fetch_data(self, tickers, start_date, end_date):
+        """
+        Fetch synthetic price data.
+
+        Args:
+            tickers: List of ticker symbols
+            start_date: Start date (YYYY-MM-DD)
+            end_date: End date (YYYY-MM-DD)
+
+        Returns:
+            DataFrame with dates as index and tickers as columns
+        """
+        return self.market.prices(tickers, start_date, end_date)
+
+    def fetch_fundamentals(self, tickers):
+        """
+        Fetch synthetic fundamentals.
+
+        Args:
+            tickers: List of ticker symbols
+
+        Returns:
+            DataFrame indexed by ticker
+        """
+        return self.market.fundamentals(tickers)
+
+    def fundamentals_transport(self):
+        """
+        Transport for FundamentalsFetcher serving synthetic fundamentals.
+
+        Returns:
+            Callable ``transport(ticker) -> dict``
+        """
+        def transport(ticker):
+            return self.market._fundamental_records([ticker]).get(ticker, {})
+        return transport
+
+
+class SyntheticDataLoader:
+    """
+    Offline drop-in for DataLoader backed by a SyntheticMarket.
+    """
+
+    def __init__(self, start_date, end_date, seed=42):
+        """
+        Initialize the loader.
+
+        Args:
+            start_date: Start date (YYYY-MM-DD)
+            end_date: End date (YYYY-MM-DD)
+            seed: Random seed
+        """
+        self.start_date = start_date
+        self.end_date = end_date
+        self.market = SyntheticMarket(seed=seed)
+
+    def fetch_price_data(self, tickers):
+        """Fetch synthetic prices for the loader's date range."""
+        return self.market.prices(tickers, self.start_date, self.end_date)
+
+    def fetch_fundamental_data(self, tickers):
+        """Fetch synthetic fundamentals as of the last day of the loader's range."""
+        return self.market.fundamentals(tickers, as_of=pd.Timestamp(self.end_date) - pd.Timedelta(days=1))
@@ -4,14 +4,16 @@ Demonstrates how to use the Factor Momentum Visualizer components programmatical
 """
 
 from datetime import datetime, timedelta
+import numpy as np
 import pandas as pd
 
 # Import components
-from utils.data_loader import DataLoader
+from data.provider import load_price_data, get_fundamentals_fetcher
 from factors.momentum import MomentumFactor
 from factors.value import ValueFactor
 from factors.size import SizeFactor
 from factors.quality import QualityFactor
+from factors.composite import normalize_stack, combine
 from backtest.engine import FactorBacktest
 from plots.visualizations import FactorVisualizer
 
@@ -33,8 +35,7 @@ def example_momentum_analysis():
     
     # Load data
     print("\n1. Loading data...")
-    loader = DataLoader(start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d'))
-    price_data = loader.fetch_price_data(tickers)
+    price_data = load_price_data(tickers, start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d'))
     print(f"   Loaded {len(price_data.columns)} stocks with {len(price_data)} days of data")
     
     # Calculate momentum
@@ -93,9 +94,8 @@ def example_multi_factor_comparison():
     
     # Load data
     print("\n1. Loading data...")
-    loader = DataLoader(start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d'))
-    price_data = loader.fetch_price_data(tickers)
-    fundamental_data = loader.fetch_fundamental_data(price_data.columns.tolist())
+    price_data = load_price_data(tickers, start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d'))
+    fundamental_data, _ = get_fundamentals_fetcher().fetch(price_data.columns.tolist())
     
     # Calculate all factors
     print("\n2. Calculating factors...")
@@ -184,9 +184,8 @@ def example_custom_portfolio():
     
     # Load data
     print("\n1. Loading data...")
-    loader = DataLoader(start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d'))
-    price_data = loader.fetch_price_data(tickers)
-    fundamental_data = loader.fetch_fundamental_data(price_data.columns.tolist())
+    price_data = load_price_data(tickers, start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d'))
+    fundamental_data, _ = get_fundamentals_fetcher().fetch(price_data.columns.tolist())
     
     # Calculate factors
     print("\n2. Calculating factors...")
@@ -199,14 +198,14 @@ def example_custom_portfolio():
     # Normalize and combine (equal weight)
     print("\n3. Creating composite score (50% Momentum + 50% Value)...")
     
-    # Z-score normalization
-    momentum_z = (momentum_scores - momentum_scores.mean(axis=1, skipna=True).values.reshape(-1, 1)) / \
-                 momentum_scores.std(axis=1, skipna=True).values.reshape(-1, 1)
-    value_z = (value_scores - value_scores.mean(axis=1, skipna=True).values.reshape(-1, 1)) / \
-              value_scores.std(axis=1, skipna=True).values.reshape(-1, 1)
-    
-    # Composite score
-    composite_scores = 0.5 * momentum_z + 0.5 * value_z
+    # Cross-sectional z-scores (1% winsorized) of both factors, combined in one pass
+    value_scores = value_scores.reindex_like(momentum_scores)
+    normalized = normalize_stack(np.stack([momentum_scores.to_numpy(), value_scores.to_numpy()]))
+    composite_scores = pd.DataFrame(
+        combine(normalized, [0.5, 0.5])[0],
+        index=momentum_scores.index,
+        columns=momentum_scores.columns
+    )
     
     # Run backtest
     print("\n4. Running backtest...")
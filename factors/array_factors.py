@@ -0,0 +1,166 @@
+"""
+Array Factors Module
+Factor scores computed directly on contiguous (date x ticker) arrays.
+
+Used by the full-universe mode, where prices are held in a float32
+PricePanel rather than in per-factor DataFrames. Every function returns an
+array with the same shape and dtype as the price array.
+"""
+
+import numpy as np
+import pandas as pd
+
+from utils.profiler import profiled
+
+
+TRADING_DAYS_PER_MONTH = 21
+
+# Factors computed from prices alone; everything else needs fundamentals
+PRICE_FACTORS = ('momentum',)
+
+
+def _field(fundamental_data, tickers, name, dtype):
+    """Align one fundamentals column to the panel's tickers (NaN where missing)."""
+    if fundamental_data is None or name not in fundamental_data.columns:
+        return np.full(len(tickers), np.nan, dtype=dtype)
+    column = fundamental_data[name].reindex(tickers)
+    return np.asarray(column.astype(float).to_numpy(), dtype=dtype)
+
+
+def shares_outstanding(fundamental_data, tickers, dtype=float):
+    """
+    Shares outstanding per ticker, implied from ``marketCap / currentPrice``
+    where ``sharesOutstanding`` is missing (NaN where neither is available).
+    """
+    shares = _field(fundamental_data, tickers, 'sharesOutstanding', dtype)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        implied = _field(fundamental_data, tickers, 'marketCap', dtype) / \
+            _field(fundamental_data, tickers, 'currentPrice', dtype)
+    return np.where(np.isnan(shares), implied, shares).astype(dtype)
+
+
+def momentum_scores(prices, lookback_months=12, skip_months=1):
+    """
+    Momentum: return from ``lookback_months`` ago to ``skip_months`` ago.
+
+    Args:
+        prices: Array (n_dates, n_tickers) of prices
+        lookback_months: Lookback window in months
+        skip_months: Most recent months excluded (short-term reversal)
+
+    Returns:
+        Array of momentum scores; NaN until enough history is available
+    """
+    lookback = lookback_months * TRADING_DAYS_PER_MONTH
+    skip = skip_months * TRADING_DAYS_PER_MONTH
+
+    scores = np.full_like(prices, np.nan)
+    if prices.shape[0] > lookback:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            recent = prices[lookback - skip:prices.shape[0] - skip]
+            past = prices[:prices.shape[0] - lookback]
+            scores[lookback:] = recent / past - 1
+    return scores
+
+
+def value_scores(prices, fundamental_data, tickers):
+    """
+    Value: book-to-price, using the latest book value per share.
+
+    Falls back to the inverse of ``priceToBook`` (held constant) for names
+    without ``bookValue``.
+    """
+    book = _field(fundamental_data, tickers, 'bookValue', prices.dtype)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        scores = book[None, :] / prices
+        inverse_pb = 1 / _field(fundamental_data, tickers, 'priceToBook', prices.dtype)
+    return np.where(np.isnan(book)[None, :], inverse_pb[None, :], scores).astype(prices.dtype)
+
+
+def size_scores(prices, fundamental_data, tickers):
+    """
+    Size: negative log market cap on each date, shares outstanding times that
+    date's price (smaller companies score higher).
+
+    Uses ``sharesOutstanding``, or ``marketCap / currentPrice`` for names
+    without it, so no date depends on a later price.
+    """
+    shares = shares_outstanding(fundamental_data, tickers, prices.dtype)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return -np.log(shares[None, :] * prices)
+
+
+def quality_scores(prices, fundamental_data, tickers):
+    """
+    Quality: return on equity (held constant through time).
+    """
+    roe = _field(fundamental_data, tickers, 'returnOnEquity', prices.dtype)
+    return np.broadcast_to(roe[None, :], prices.shape).copy()
+
+
+@profiled('factors.array_factor_stack')
+def calculate_factor_stack(panel, factor_names, fundamental_data=None):
+    """
+    Compute a (factor x date x ticker) score stack from a PricePanel.
+
+    Args:
+        panel: PricePanel (or any object with ``to_numpy()`` and ``columns``)
+        factor_names: Lower-case factor names ('momentum', 'value', 'size', 'quality')
+        fundamental_data: DataFrame of fundamentals indexed by ticker, or a
+            callable returning it. A callable is only invoked once the
+            price-only factors (``PRICE_FACTORS``) are scored, so they can be
+            computed while fundamentals are still loading.
+
+    Returns:
+        Array (n_factors, n_dates, n_tickers) in the panel dtype
+    """
+    prices = panel.to_numpy()
+    tickers = panel.columns
+    fundamentals = {}
+
+    def fields():
+        if 'data' not in fundamentals:
+            fundamentals['data'] = fundamental_data() if callable(fundamental_data) else fundamental_data
+        return fundamentals['data']
+
+    builders = {
+        'momentum': lambda: momentum_scores(prices),
+        'value': lambda: value_scores(prices, fields(), tickers),
+        'size': lambda: size_scores(prices, fields(), tickers),
+        'quality': lambda: quality_scores(prices, fields(), tickers)
+    }
+    for name in factor_names:
+        if name not in builders:
+            raise ValueError(f"Unknown factor: {name}")
+
+    stack = np.empty((len(factor_names),) + prices.shape, dtype=prices.dtype)
+    order = sorted(range(len(factor_names)), key=lambda i: factor_names[i] not in PRICE_FACTORS)
+    for i in order:
+        stack[i] = builders[factor_names[i]]()
+    return stack
+
+
+def stack_to_frame(stack, dates, tickers, factor_names, rows=None):
+    """
+    Convert a score stack to the long format produced by FactorCalculator.
+
+    Args:
+        stack: Array (n_factors, n_dates, n_tickers)
+        dates: Date index of the stack
+        tickers: Ticker index of the stack
+        factor_names: Factor names, one per leading slice
+        rows: Optional row positions to keep (e.g. rebalance dates only)
+
+    Returns:
+        DataFrame indexed by (date, ticker) with ``<factor>_score`` columns
+    """
+    if rows is not None:
+        stack = stack[:, rows, :]
+        dates = pd.DatetimeIndex(dates)[rows]
+
+    index = pd.MultiIndex.from_product([pd.DatetimeIndex(dates), pd.Index(tickers)], names=['date', 'ticker'])
+    frame = pd.DataFrame(
+        {f"{name}_score": stack[i].reshape(-1) for i, name in enumerate(factor_names)},
+        index=index
+    )
+    return frame.dropna(how='all')
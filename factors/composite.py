@@ -0,0 +1,225 @@
+"""
+Composite Module
+Multi-factor composite scores built on (factor x date x ticker) stacks.
+
+Every transform works on the whole stack at once and is NaN-aware: missing
+scores stay missing and are left out of cross-sectional statistics. A batch
+of weight vectors is applied with one tensor product, so hundreds of
+composites are scored together and backtested in a single BatchBacktester
+pass.
+"""
+
+import itertools
+
+import numpy as np
+import pandas as pd
+
+from backtest.batch import BatchBacktester, rebalance_positions, stack_factor_scores
+from utils.profiler import profiled
+
+
+NORMALIZERS = ('zscore', 'rank')
+
+# Composite score cells (composites x rebalances x tickers) held at once; about
+# 160 MB per float64 copy, and the engine makes one on top of the stack itself
+MAX_COMPOSITE_CELLS = 20_000_000
+
+
+def winsorize(stack, limit=0.01):
+    """
+    Clip each cross-section to its ``limit`` and ``1 - limit`` quantiles.
+
+    Args:
+        stack: Array (..., n_tickers); NaN marks missing scores
+        limit: Fraction clipped at each tail
+
+    Returns:
+        Float array shaped like ``stack``
+    """
+    values = np.asarray(stack, dtype=float)
+    ordered = np.sort(values, axis=-1)  # NaNs sort last
+    last = np.sum(~np.isnan(values), axis=-1, keepdims=True) - 1
+    low = np.take_along_axis(ordered, np.maximum(np.ceil(limit * last), 0).astype(int), axis=-1)
+    high = np.take_along_axis(ordered, np.maximum(np.floor((1 - limit) * last), 0).astype(int), axis=-1)
+    return np.clip(values, low, high)
+
+
+def zscore(stack):
+    """
+    Cross-sectional z-scores (sample standard deviation).
+
+    Cross-sections with fewer than two names or no dispersion score 0.
+
+    Args:
+        stack: Array (..., n_tickers); NaN marks missing scores
+
+    Returns:
+        Float array shaped like ``stack``
+    """
+    values = np.asarray(stack, dtype=float)
+    valid = ~np.isnan(values)
+    n = valid.sum(axis=-1, keepdims=True)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = np.where(valid, values, 0).sum(axis=-1, keepdims=True) / n
+        deviation = np.where(valid, values - mean, 0)
+        std = np.sqrt((deviation ** 2).sum(axis=-1, keepdims=True) / (n - 1))
+        z = np.where(std > 0, deviation / std, 0.0)
+    return np.where(valid, z, np.nan)
+
+
+def rank_normalize(stack):
+    """
+    Cross-sectional ranks mapped uniformly onto (-1, 1).
+
+    Tied scores keep their column order, so the mapping is deterministic.
+
+    Args:
+        stack: Array (..., n_tickers); NaN marks missing scores
+
+    Returns:
+        Float array shaped like ``stack``
+    """
+    values = np.asarray(stack, dtype=float)
+    valid = ~np.isnan(values)
+    n = valid.sum(axis=-1, keepdims=True)
+    # NaNs sort last, so the rank of each valid name is its position among valid names
+    ranks = np.argsort(np.argsort(values, axis=-1, kind='stable'), axis=-1, kind='stable')
+    with np.errstate(divide='ignore', invalid='ignore'):
+        scaled = 2 * (ranks + 0.5) / n - 1
+    return np.where(valid, scaled, np.nan)
+
+
+def normalize_stack(stack, method='zscore', winsor=0.01):
+    """
+    Put every factor on a common cross-sectional scale.
+
+    Args:
+        stack: Array (n_factors, n_dates, n_tickers) of raw scores
+        method: 'zscore' or 'rank'
+        winsor: Tail fraction clipped before z-scoring (None to skip; ranks
+            are not affected by outliers and are never winsorized)
+
+    Returns:
+        Float array shaped like ``stack``
+    """
+    if method == 'rank':
+        return rank_normalize(stack)
+    if method != 'zscore':
+        raise ValueError(f"Unknown normalization '{method}'. Choose from: {', '.join(NORMALIZERS)}")
+    if winsor:
+        stack = winsorize(stack, winsor)
+    return zscore(stack)
+
+
+def weight_grid(n_factors, step=0.1):
+    """
+    Every long-only weight vector on a grid that sums to one.
+
+    Args:
+        n_factors: Number of factors
+        step: Grid step (1 / step must be a whole number)
+
+    Returns:
+        Array (n_combinations, n_factors); e.g. 286 rows for 4 factors at 10%
+    """
+    units = int(round(1 / step))
+    if not np.isclose(units * step, 1):
+        raise ValueError(f"1 / step must be a whole number, got step={step}")
+
+    # Stars and bars: choose where the n_factors - 1 dividers go among the units
+    rows = []
+    for bars in itertools.combinations(range(units + n_factors - 1), n_factors - 1):
+        edges = (-1,) + bars + (units + n_factors - 1,)
+        rows.append([edges[i + 1] - edges[i] - 1 for i in range(n_factors)])
+    return np.asarray(rows, dtype=float) / units
+
+
+def cap_weights(weights, max_composites):
+    """
+    Thin a weight grid down to at most ``max_composites`` rows.
+
+    The single-factor portfolios are always kept; the remaining rows are
+    taken evenly spaced through the grid.
+
+    Args:
+        weights: Array (n_composites, n_factors)
+        max_composites: Largest number of rows to keep
+
+    Returns:
+        Array (<= max_composites, n_factors), in grid order
+    """
+    if len(weights) <= max_composites:
+        return weights
+    pure = np.flatnonzero(np.isclose(weights.max(axis=1), 1))[:max_composites]
+    spread = np.linspace(0, len(weights) - 1, max(max_composites - len(pure), 0)).round().astype(int)
+    return weights[np.union1d(pure, spread)]
+
+
+def combine(normalized, weights):
+    """
+    Weighted sums of normalized factor scores for a batch of weight vectors.
+
+    A name missing some factors is scored on the factors it has, with their
+    weights rescaled; a name missing every weighted factor is NaN.
+
+    Args:
+        normalized: Array (n_factors, n_dates, n_tickers)
+        weights: Array (n_composites, n_factors) or a single weight vector
+
+    Returns:
+        Array (n_composites, n_dates, n_tickers)
+    """
+    weights = np.atleast_2d(np.asarray(weights, dtype=float))
+    valid = ~np.isnan(normalized)
+    total = np.tensordot(weights, np.where(valid, normalized, 0), axes=(1, 0))
+    coverage = np.tensordot(np.abs(weights), valid.astype(float), axes=(1, 0))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(coverage > 0, total / coverage, np.nan)
+
+
+def composite_label(weights, factor_names):
+    """Readable name of a composite, e.g. '60% Momentum + 40% Value'."""
+    return " + ".join(
+        f"{weight:.0%} {name.title()}" for weight, name in zip(weights, factor_names) if weight
+    )
+
+
+@profiled('factors.composites')
+def backtest_composites(scores, price_data, factor_names, weights=None, step=0.1,
+                        method='zscore', winsor=0.01, max_cells=MAX_COMPOSITE_CELLS, **engine_options):
+    """
+    Build a batch of composites and load them into one backtest engine.
+
+    Only rebalance dates are normalized and combined, since the engine reads
+    scores on those dates alone. When composites x rebalances x tickers
+    exceeds ``max_cells`` the weights are thinned with ``cap_weights``;
+    compare the returned weights with the requested ones to detect this.
+
+    Args:
+        scores: Score stack (n_factors, n_dates, n_tickers) aligned to
+            ``price_data``, or FactorCalculator output (see ``stack_factor_scores``)
+        price_data: DataFrame of prices (dates x tickers) or a PricePanel
+        factor_names: Lower-case factor names, one per leading slice of the stack
+        weights: Array (n_composites, n_factors) (default: ``weight_grid``)
+        step: Grid step used when ``weights`` is None
+        method: 'zscore' or 'rank'
+        winsor: Tail fraction clipped before z-scoring
+        max_cells: Most composite score cells to build (None for no cap)
+        **engine_options: top_pct, bottom_pct, rebalance_freq for BatchBacktester
+
+    Returns:
+        Tuple of (BatchBacktester with one strategy per composite, weights
+        DataFrame indexed by composite label)
+    """
+    if not isinstance(scores, np.ndarray):
+        scores = stack_factor_scores(scores, price_data, factor_names)
+    weights = weight_grid(len(factor_names), step) if weights is None else np.atleast_2d(weights)
+
+    rows = rebalance_positions(price_data.index, engine_options.get('rebalance_freq', 'monthly'))
+    if max_cells is not None:
+        weights = cap_weights(weights, max(max_cells // max(len(rows) * scores.shape[2], 1), 1))
+    composites = combine(normalize_stack(scores[:, rows, :], method, winsor), weights)
+    labels = [composite_label(w, factor_names) for w in weights]
+
+    engine = BatchBacktester(composites, price_data, labels, score_rows=rows, **engine_options)
+    return engine, pd.DataFrame(weights, index=labels, columns=list(factor_names))
@@ -0,0 +1,259 @@
+"""
+Rendering Module
+Keep large Plotly figures light enough for the browser.
+
+``optimize_figure`` applies one rendering policy to any figure built by the
+chart functions:
+
+- Line traces longer than ``max_points`` are downsampled with
+  largest-triangle-three-buckets (LTTB). The point budget is doubled until
+  the visual error (see ``downsample_error``) is within ``tolerance`` of the
+  y-range.
+- Marker traces above ``webgl_threshold`` points are drawn with WebGL
+  (``Scattergl``).
+- Marker traces above ``density_threshold`` points are binned into a 2D
+  density heatmap.
+"""
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+from utils.profiler import profiled
+
+
+def lttb(x, y, n_out):
+    """
+    Largest-triangle-three-buckets downsampling.
+
+    Args:
+        x: Monotonic numeric x values
+        y: y values (finite)
+        n_out: Number of points to keep (at least 3)
+
+    Returns:
+        Sorted integer positions of the kept points
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    # Bucket i covers positions edges[i]:edges[i + 1] of the interior points
+    edges = (np.arange(n_out - 1) * (n - 2) / (n_out - 2)).astype(int) + 1
+    edges[-1] = n - 1
+
+    # Third vertex for bucket i: average of bucket i + 1 (the last point for the final bucket)
+    bounds = np.append(edges, n)
+    sum_x = np.concatenate(([0.0], np.cumsum(x)))
+    sum_y = np.concatenate(([0.0], np.cumsum(y)))
+    sizes = np.diff(bounds)[1:]
+    avg_x = (sum_x[bounds[2:]] - sum_x[bounds[1:-1]]) / sizes
+    avg_y = (sum_y[bounds[2:]] - sum_y[bounds[1:-1]]) / sizes
+
+    keep = np.empty(n_out, dtype=int)
+    keep[0] = 0
+    keep[-1] = n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        xa, ya = x[a], y[a]
+        area = np.abs((xa - avg_x[i]) * (y[lo:hi] - ya) - (xa - x[lo:hi]) * (avg_y[i] - ya))
+        a = lo + area.argmax()
+        keep[i + 1] = a
+    return keep
+
+
+def downsample_error(x, y, keep, width_px=1200):
+    """
+    Visual error of a downsampled line, as a fraction of the y-range.
+
+    The x-axis is split into ``width_px`` pixel columns. In each column the
+    full line covers the span from its lowest to its highest point. The error
+    is the largest difference between that span and the span covered by the
+    downsampled line.
+
+    Args:
+        x: Numeric x values of the full series
+        y: y values of the full series
+        keep: Positions kept by the downsampler
+        width_px: Assumed plot width in pixels
+
+    Returns:
+        Float in [0, 1]
+    """
+    y_range = np.ptp(y)
+    x_range = x[-1] - x[0]
+    if len(keep) == len(y) or y_range == 0 or x_range == 0:
+        return 0.0
+    approx = np.interp(x, x[keep], y[keep])
+    column = ((x - x[0]) / x_range * (width_px - 1)).astype(int)
+    starts = np.flatnonzero(np.r_[True, np.diff(column) > 0])
+    error = max(
+        np.max(np.abs(np.maximum.reduceat(y, starts) - np.maximum.reduceat(approx, starts))),
+        np.max(np.abs(np.minimum.reduceat(y, starts) - np.minimum.reduceat(approx, starts)))
+    )
+    return float(error / y_range)
+
+
+def _numeric_x(x, n):
+    """Trace x values as floats (datetimes as nanoseconds), or None if unusable."""
+    if x is None:
+        return np.arange(n, dtype=float)
+    x = np.asarray(x)
+    if x.dtype.kind in 'iuf':
+        values = x.astype(float)
+    else:
+        try:
+            values = pd.to_datetime(x).asi8.astype(float)
+        except (TypeError, ValueError):
+            return None
+    if len(values) != n or np.any(np.diff(values) < 0):
+        return None
+    return values
+
+
+def downsample_trace(trace, max_points=2000, tolerance=0.02):
+    """
+    Downsample a line trace in place with LTTB, within an error tolerance.
+
+    Args:
+        trace: Plotly Scatter/Scattergl trace drawn with lines
+        max_points: Initial point budget
+        tolerance: Allowed visual error as a fraction of the y-range
+
+    Returns:
+        Tuple of (points before, points after, max error) or None if unchanged
+    """
+    if trace.y is None:
+        return None
+    y = np.asarray(trace.y, dtype=float)
+    n = len(y)
+    if n <= max_points:
+        return None
+    x = _numeric_x(trace.x, n)
+    if x is None:
+        return None
+
+    finite = np.flatnonzero(np.isfinite(y))
+    xf, yf = x[finite], y[finite]
+    budget = max_points
+    while True:
+        keep = lttb(xf, yf, budget)
+        error = downsample_error(xf, yf, keep)
+        if error <= tolerance or len(keep) == len(yf):
+            break
+        budget *= 2
+
+    rows = finite[keep]
+    if trace.x is not None:
+        trace.x = np.asarray(trace.x)[rows]
+    trace.y = y[rows]
+    return n, len(rows), error
+
+
+def density_trace(trace, nbins=60):
+    """
+    Bin a marker trace into a 2D density heatmap.
+
+    The counts are computed here so only the bin grid is sent to the browser.
+
+    Args:
+        trace: Plotly Scatter/Scattergl trace drawn with markers
+        nbins: Bins per axis
+
+    Returns:
+        go.Heatmap trace of point counts
+    """
+    x = np.asarray(trace.x, dtype=float)
+    y = np.asarray(trace.y, dtype=float)
+    finite = np.isfinite(x) & np.isfinite(y)
+    counts, x_edges, y_edges = np.histogram2d(x[finite], y[finite], bins=nbins)
+    counts[counts == 0] = np.nan
+    return go.Heatmap(
+        x=(x_edges[:-1] + x_edges[1:]) / 2,
+        y=(y_edges[:-1] + y_edges[1:]) / 2,
+        z=counts.T,
+        name=trace.name,
+        colorscale='Blues',
+        colorbar=dict(title="Count"),
+        hovertemplate="x: %{x:.3g}<br>y: %{y:.3g}<br>Points: %{z}<extra></extra>"
+    )
+
+
+def figure_payload_bytes(fig):
+    """
+    Size of the JSON sent to the browser for a figure.
+
+    Args:
+        fig: Plotly figure
+
+    Returns:
+        Number of bytes
+    """
+    return len(fig.to_json().encode('utf-8'))
+
+
+def _to_webgl(trace):
+    """Copy a Scatter trace as Scattergl, dropping properties WebGL does not support."""
+    props = trace.to_plotly_json()
+    props.pop('type', None)
+    return go.Scattergl(props, skip_invalid=True)
+
+
+@profiled('plots.optimize_figure')
+def optimize_figure(fig, max_points=2000, tolerance=0.02, webgl_threshold=5000,
+                    density_threshold=50000):
+    """
+    Apply the rendering policy to a figure in place.
+
+    Args:
+        fig: Plotly figure
+        max_points: Point budget per line trace before downsampling
+        tolerance: Allowed visual error of downsampled lines as a fraction of the
+            y-range (0.02 is about 8 px on a 400 px tall chart)
+        webgl_threshold: Traces still longer than this are drawn with Scattergl
+        density_threshold: Marker traces longer than this become a density heatmap
+
+    Returns:
+        Tuple of (figure, report dict with points_before, points_after,
+        max_error, webgl_traces, density_traces, payload_bytes)
+    """
+    report = {
+        'points_before': 0,
+        'points_after': 0,
+        'max_error': 0.0,
+        'webgl_traces': 0,
+        'density_traces': 0
+    }
+    traces = []
+    for trace in fig.data:
+        if trace.type not in ('scatter', 'scattergl') or trace.y is None:
+            traces.append(trace)
+            continue
+
+        n = len(trace.y)
+        report['points_before'] += n
+        # Plotly's default mode: lines only for traces of more than 20 points
+        mode = trace.mode or ('lines' if n > 20 else 'lines+markers')
+
+        if 'lines' in mode:
+            result = downsample_trace(trace, max_points, tolerance)
+            if result is not None:
+                report['max_error'] = max(report['max_error'], result[2])
+        elif n > density_threshold:
+            traces.append(density_trace(trace))
+            report['density_traces'] += 1
+            continue
+
+        if len(trace.y) > webgl_threshold and trace.type == 'scatter':
+            trace = _to_webgl(trace)
+            report['webgl_traces'] += 1
+        report['points_after'] += len(trace.y)
+        traces.append(trace)
+
+    fig.data = []
+    fig.add_traces(traces)
+    report['payload_bytes'] = figure_payload_bytes(fig)
+    return fig, report
@@ -0,0 +1,43 @@
+"""
+Sweep Charts Module
+Heatmaps for parameter sweep surfaces.
+"""
+
+import plotly.graph_objects as go
+
+
+def create_sweep_heatmap(surface, title="Sharpe Ratio Surface", value_format=".2f",
+                         colorscale='RdYlGn', zmid=0):
+    """
+    Create a heatmap of a parameter sweep surface.
+
+    Args:
+        surface: DataFrame with lookbacks as index and percentiles as columns
+            (see ``backtest.sweep.sweep_surface``)
+        title: Chart title
+        value_format: d3 format string for cell labels
+        colorscale: Plotly colorscale name
+        zmid: Value at the colorscale midpoint (None to span the data range,
+            e.g. for drawdowns, which are never positive)
+
+    Returns:
+        Plotly figure
+    """
+    fig = go.Figure(data=go.Heatmap(
+        z=surface.values,
+        x=[f"{p}%" for p in surface.columns],
+        y=[f"{lb}M" for lb in surface.index],
+        colorscale=colorscale,
+        zmid=zmid,
+        texttemplate=f"%{{z:{value_format}}}",
+        hovertemplate="Lookback: %{y}<br>Percentile: %{x}<br>Value: %{z:" + value_format + "}<extra></extra>"
+    ))
+
+    fig.update_layout(
+        title=title,
+        xaxis_title="Long/Short Percentile",
+        yaxis_title="Momentum Lookback",
+        template='plotly_white',
+        height=400
+    )
+    return fig
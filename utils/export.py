@@ -0,0 +1,170 @@
+"""
+Export Module
+Columnar and streaming exports of analysis results.
+
+Tables are written as compressed Parquet or Arrow IPC files, or as CSV
+generated in row chunks so the full text never exists as one string. All
+tables for a run are bundled into a single zip archive, written through a
+temporary file so the archive is never grown in memory.
+"""
+
+import io
+import tempfile
+import time
+import zipfile
+
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+
+
+FORMATS = {
+    'parquet': '.parquet',
+    'arrow': '.arrow',
+    'csv': '.csv'
+}
+
+
+def _to_table(df):
+    """Convert a DataFrame to an Arrow table, keeping its index as columns."""
+    return pa.Table.from_pandas(df, preserve_index=True)
+
+
+def write_parquet(df, sink, compression='zstd'):
+    """
+    Write a DataFrame as Parquet.
+
+    Args:
+        df: DataFrame to write
+        sink: Path or writable binary file object
+        compression: Parquet codec ('zstd', 'snappy', 'gzip', or None)
+    """
+    pq.write_table(_to_table(df), sink, compression=compression)
+
+
+def write_arrow_ipc(df, sink, compression='zstd'):
+    """
+    Write a DataFrame as an Arrow IPC (Feather v2) file.
+
+    Args:
+        df: DataFrame to write
+        sink: Path or writable binary file object
+        compression: IPC buffer codec ('zstd', 'lz4', or None)
+    """
+    table = _to_table(df)
+    options = pa.ipc.IpcWriteOptions(compression=compression)
+    with pa.ipc.new_file(sink, table.schema, options=options) as writer:
+        writer.write_table(table)
+
+
+def _csv_schema(df, index=True):
+    """
+    Arrow schema shared by every CSV chunk, fixed from the whole frame.
+
+    Typed columns take their type from the dtype. Object columns, which an
+    empty or all-null first chunk would leave untyped, take it from their
+    first non-null value anywhere in the frame (string if there is none).
+    """
+    empty = df.iloc[:0]
+    schema = pa.Schema.from_pandas(empty.reset_index() if index else empty, preserve_index=False)
+    n_index = df.index.nlevels if index else 0
+    for i, field in enumerate(schema):
+        if not pa.types.is_null(field.type):
+            continue
+        column = df.index.get_level_values(i) if i < n_index else df.iloc[:, i - n_index]
+        values = column[column.notna()]
+        value_type = pa.array(values[:1], from_pandas=True).type if len(values) else pa.string()
+        schema = schema.set(i, field.with_type(value_type))
+    return schema
+
+
+def iter_csv_chunks(df, chunk_rows=100_000, index=True):
+    """
+    Generate CSV text for a DataFrame in row chunks.
+
+    Args:
+        df: DataFrame to write
+        chunk_rows: Rows per chunk
+        index: Whether to include the index
+
+    Yields:
+        UTF-8 encoded CSV chunks (the first chunk carries the header)
+    """
+    def chunk_frame(start):
+        chunk = df.iloc[start:start + chunk_rows]
+        return chunk.reset_index() if index else chunk
+
+    # Each chunk is converted to Arrow on its own, so only one chunk is copied at a time
+    schema = _csv_schema(df, index)
+    buffer = io.BytesIO()
+    with pacsv.CSVWriter(buffer, schema) as writer:
+        for start in range(0, max(len(df), 1), chunk_rows):
+            writer.write_table(pa.Table.from_pandas(chunk_frame(start), schema=schema, preserve_index=False))
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+
+def write_csv(df, sink, chunk_rows=100_000):
+    """
+    Stream a DataFrame as CSV into a binary file object.
+
+    Args:
+        df: DataFrame to write
+        sink: Writable binary file object
+        chunk_rows: Rows per chunk
+    """
+    for chunk in iter_csv_chunks(df, chunk_rows):
+        sink.write(chunk)
+
+
+def build_export_archive(tables, fmt='parquet', compression='zstd', chunk_rows=100_000):
+    """
+    Bundle several tables into one zip archive.
+
+    Parquet and Arrow files are compressed internally and stored as-is. CSV
+    files are streamed into deflate-compressed entries chunk by chunk.
+
+    Args:
+        tables: Dictionary mapping file stem to DataFrame (None entries are skipped)
+        fmt: 'parquet', 'arrow' or 'csv'
+        compression: Codec for Parquet / Arrow ('zstd', 'snappy', 'lz4', None)
+        chunk_rows: Rows per CSV chunk
+
+    Returns:
+        Tuple of (archive bytes, report dict with seconds, bytes and a
+        per-file list of (name, rows, bytes))
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format '{fmt}'. Choose from: {', '.join(FORMATS)}")
+
+    started = time.perf_counter()
+    files = []
+    entry_compression = zipfile.ZIP_DEFLATED if fmt == 'csv' else zipfile.ZIP_STORED
+
+    # Entries are streamed to disk and the finished archive is read back once
+    with tempfile.TemporaryFile(prefix="fmv_export_") as sink:
+        # Fast deflate: CSV exports are large and mostly numeric text
+        with zipfile.ZipFile(sink, 'w', compression=entry_compression, compresslevel=1) as archive:
+            for stem, df in tables.items():
+                if df is None:
+                    continue
+                name = f"{stem}{FORMATS[fmt]}"
+                with archive.open(name, 'w', force_zip64=True) as entry:
+                    if fmt == 'parquet':
+                        write_parquet(df, entry, compression)
+                    elif fmt == 'arrow':
+                        write_arrow_ipc(df, entry, compression)
+                    else:
+                        write_csv(df, entry, chunk_rows)
+                files.append((name, len(df), archive.getinfo(name).compress_size))
+        sink.seek(0)
+        data = sink.read()
+
+    report = {
+        'format': fmt,
+        'seconds': time.perf_counter() - started,
+        'bytes': len(data),
+        'files': files
+    }
+    return data, report
@@ -0,0 +1,204 @@
+"""
+Profiler Module
+Lightweight per-stage instrumentation for the analysis pipeline.
+
+Stages record wall time, CPU time of the thread running the stage, rows
+processed and RSS change. Modules
+instrument their work with ``profile_stage``. It returns a shared no-op
+context manager unless a profiler is active, so disabled profiling costs one
+context-variable lookup per stage.
+"""
+
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+
+import pandas as pd
+
+from utils.resources import current_rss_bytes
+
+
+_ACTIVE = contextvars.ContextVar("fmv_active_profiler", default=None)
+
+
+class _NullStage:
+    """No-op stage used when profiling is disabled."""
+
+    rows = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    """A running stage; set ``rows`` inside the block to record rows processed."""
+
+    def __init__(self, profiler, name, rows):
+        self.profiler = profiler
+        self.name = name
+        self.rows = rows
+
+    def __enter__(self):
+        self._rss = current_rss_bytes()
+        # Per-thread CPU, so stages running concurrently on other threads (e.g.
+        # fetch lanes) are not charged to this one; BLAS worker threads are not
+        # counted either
+        self._cpu = time.thread_time()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter()
+        cpu = time.thread_time() - self._cpu
+        rss = current_rss_bytes()
+        self.profiler.records.append({
+            'stage': self.name,
+            'start': self._start - self.profiler.origin,
+            'wall_time': end - self._start,
+            'cpu_time': cpu,
+            'rows': self.rows,
+            'memory_delta': (rss - self._rss) if rss is not None and self._rss is not None else None,
+            'thread': threading.get_ident(),
+            'error': exc_type.__name__ if exc_type else None
+        })
+        return False
+
+
+class PipelineProfiler:
+    """
+    Collects stage records for one pipeline run.
+    """
+
+    def __init__(self, enabled=True):
+        """
+        Initialize the profiler.
+
+        Args:
+            enabled: When False, ``stage`` returns a no-op and nothing is recorded
+        """
+        self.enabled = enabled
+        self.origin = time.perf_counter()
+        self.records = []
+        self._token = None
+
+    def stage(self, name, rows=None):
+        """
+        Context manager timing one stage.
+
+        Args:
+            name: Stage name (e.g. 'fetch.prices')
+            rows: Rows processed, if known up front
+
+        Returns:
+            Context manager yielding the stage (set ``.rows`` to record rows later)
+        """
+        if not self.enabled:
+            return _NULL_STAGE
+        return _Stage(self, name, rows)
+
+    def activate(self):
+        """Make this profiler receive ``profile_stage`` calls in the current context."""
+        if self.enabled:
+            self._token = _ACTIVE.set(self)
+        return self
+
+    def deactivate(self):
+        """Stop receiving ``profile_stage`` calls."""
+        if self._token is not None:
+            _ACTIVE.reset(self._token)
+            self._token = None
+
+    def __enter__(self):
+        return self.activate()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.deactivate()
+        return False
+
+    def to_frame(self):
+        """
+        Stage records as a DataFrame, in start order.
+
+        Returns:
+            DataFrame with stage, start, wall_time, cpu_time (CPU seconds of the
+            thread that ran the stage), rows, memory_delta
+        """
+        if not self.records:
+            return pd.DataFrame(columns=['stage', 'start', 'wall_time', 'cpu_time', 'rows', 'memory_delta'])
+        frame = pd.DataFrame(self.records).sort_values('start')
+        return frame[['stage', 'start', 'wall_time', 'cpu_time', 'rows', 'memory_delta']].reset_index(drop=True)
+
+    def to_chrome_trace(self):
+        """
+        Export records in Chrome trace-event format (chrome://tracing, Perfetto).
+
+        Returns:
+            JSON string
+        """
+        pid = os.getpid()
+        events = []
+        for record in self.records:
+            events.append({
+                'name': record['stage'],
+                'cat': record['stage'].split('.')[0],
+                'ph': 'X',
+                'ts': record['start'] * 1e6,
+                'dur': record['wall_time'] * 1e6,
+                'pid': pid,
+                'tid': record['thread'],
+                'args': {
+                    'cpu_time_ms': record['cpu_time'] * 1e3,
+                    'rows': record['rows'],
+                    'memory_delta_bytes': record['memory_delta'],
+                    'error': record['error']
+                }
+            })
+        return json.dumps({'traceEvents': events, 'displayTimeUnit': 'ms'})
+
+
+def profile_stage(name, rows=None):
+    """
+    Time a stage on the active profiler, if any.
+
+    Args:
+        name: Stage name
+        rows: Rows processed, if known up front
+
+    Returns:
+        Context manager (a shared no-op when no profiler is active)
+    """
+    profiler = _ACTIVE.get()
+    if profiler is None:
+        return _NULL_STAGE
+    return profiler.stage(name, rows)
+
+
+def profiled(name):
+    """
+    Decorator timing every call of a function as a stage on the active profiler.
+
+    Args:
+        name: Stage name
+
+    Returns:
+        Decorator
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            profiler = _ACTIVE.get()
+            if profiler is None:
+                return func(*args, **kwargs)
+            with profiler.stage(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,135 @@
+"""
+Resources Module
+Wall-time and memory measurement for pipeline runs.
+"""
+
+import sys
+import threading
+import time
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def peak_rss_bytes():
+    """
+    Peak resident set size of the current process in bytes.
+
+    Returns:
+        Peak RSS in bytes, or None where it cannot be measured
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def current_rss_bytes():
+    """
+    Current resident set size of the current process in bytes.
+
+    Returns:
+        Current RSS in bytes, or None where it cannot be measured
+    """
+    try:
+        with open('/proc/self/statm') as f:
+            pages = int(f.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    return pages * resource.getpagesize() if resource is not None else None
+
+
+class ResourceMonitor:
+    """
+    Context manager recording wall time and memory for a block of work.
+
+    ``peak_rss`` is the highest RSS sampled while the block runs (every
+    ``interval`` seconds on a background thread, plus at start and stop).
+    ``process_peak_rss`` is the operating system's peak over the whole
+    process lifetime, which includes anything earlier runs allocated.
+
+    Example:
+        with ResourceMonitor() as monitor:
+            run_pipeline()
+        print(monitor.summary())
+    """
+
+    def __init__(self, interval=0.05):
+        """
+        Initialize the monitor.
+
+        Args:
+            interval: Seconds between RSS samples
+        """
+        self.interval = interval
+        self.wall_time = None
+        self.peak_rss = None
+        self.process_peak_rss = None
+        self.rss_delta = None
+        self._stop = threading.Event()
+        self._sampler = None
+        self._running = False
+
+    def _sample(self, rss):
+        if rss is not None and (self.peak_rss is None or rss > self.peak_rss):
+            self.peak_rss = rss
+
+    def _run_sampler(self):
+        while not self._stop.wait(self.interval):
+            self._sample(current_rss_bytes())
+
+    def start(self):
+        """Start measuring. Returns the monitor for chaining."""
+        self._running = True
+        self._start_time = time.perf_counter()
+        self._start_rss = current_rss_bytes()
+        self.peak_rss = None
+        self._sample(self._start_rss)
+        if self._start_rss is not None:
+            self._stop.clear()
+            self._sampler = threading.Thread(target=self._run_sampler, name="fmv-rss-sampler", daemon=True)
+            self._sampler.start()
+        return self
+
+    def stop(self):
+        """Stop measuring and record wall time and memory (no-op if not running)."""
+        if not self._running:
+            return self
+        self._running = False
+        self.wall_time = time.perf_counter() - self._start_time
+        if self._sampler is not None:
+            self._stop.set()
+            self._sampler.join()
+            self._sampler = None
+        end_rss = current_rss_bytes()
+        self._sample(end_rss)
+        self.process_peak_rss = peak_rss_bytes()
+        if end_rss is not None and self._start_rss is not None:
+            self.rss_delta = end_rss - self._start_rss
+        return self
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+        return False
+
+    def summary(self):
+        """
+        Human-readable summary of the measurements.
+
+        Returns:
+            String such as "12.3s wall, 640 MB peak RSS"
+        """
+        parts = [f"{self.wall_time:.1f}s wall"]
+        if self.peak_rss is not None:
+            parts.append(f"{self.peak_rss / 1e6:,.0f} MB peak RSS")
+        elif self.process_peak_rss is not None:
+            parts.append(f"{self.process_peak_rss / 1e6:,.0f} MB process peak RSS")
+        if self.rss_delta is not None:
+            parts.append(f"{self.rss_delta / 1e6:+,.0f} MB RSS change")
+        return ", ".join(parts)
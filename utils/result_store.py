@@ -0,0 +1,96 @@
+"""
+Result Store Module
+Session-scoped cache of analysis results keyed by configuration.
+
+Streamlit reruns the whole script on every widget change. Keeping the
+computed results here lets widgets below the Run button re-render from
+stored results instead of refetching and recomputing everything.
+"""
+
+import hashlib
+import json
+from collections import OrderedDict
+
+
+def config_hash(config):
+    """
+    Build a stable hash for an analysis configuration.
+
+    Args:
+        config: Dictionary of configuration values (universe, tickers, factors,
+            dates, percentiles, rebalance frequency, benchmark flag, ...)
+
+    Returns:
+        Hex digest string identifying the configuration
+    """
+    payload = json.dumps(config, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResultStore:
+    """
+    Bounded LRU store for analysis results.
+
+    Only the most recently used ``max_entries`` configurations are kept; older
+    ones are evicted so session memory stays bounded.
+    """
+
+    def __init__(self, max_entries=5):
+        """
+        Initialize the store.
+
+        Args:
+            max_entries: Maximum number of configurations kept in memory
+        """
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        """
+        Return stored results for a configuration key, or None on a miss.
+
+        A hit marks the entry as most recently used.
+        """
+        if key not in self._entries:
+            return None
+        self._entries.move_to_end(key)
+        return self._entries[key]
+
+    def put(self, key, results):
+        """
+        Store results for a configuration key, evicting the oldest if full.
+
+        Args:
+            key: Configuration key from ``config_hash``
+            results: Results object to store
+        """
+        self._entries[key] = results
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        """Remove all stored results."""
+        self._entries.clear()
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def get_result_store(session_state, max_entries=5):
+    """
+    Get (or create) the ResultStore held in a Streamlit session.
+
+    Args:
+        session_state: ``st.session_state``
+        max_entries: Maximum number of configurations kept per session
+
+    Returns:
+        ResultStore instance
+    """
+    if "result_store" not in session_state:
+        session_state["result_store"] = ResultStore(max_entries=max_entries)
+    return session_state["result_store"]